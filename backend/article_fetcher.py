@@ -3,198 +3,532 @@
 """
 import os
 import re
-import feedparser
+import codecs
+import asyncio
+import threading
 import requests
-from bs4 import BeautifulSoup
-from typing import List, Dict, Optional
+from requests.compat import chardet
+from typing import List, Dict, Optional, Iterator, Tuple
 from datetime import datetime
 from urllib.parse import urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import zip_longest
 import time
+from cache_store import FeedCache, FeedWatermarks, PageCache, get_feed_cache, get_page_cache, get_feed_watermarks
+from html_extractor import SoupExtractor, clean_html_batch, get_extractor, trim_to_sentences
+from rate_limiter import HostRateLimiter
+from http_transport import create_session
+from robots_cache import RobotsCache, get_robots_cache
+from feed_scheduler import FeedPollScheduler
+from feed_parser import parse_feed
+
+# 記事ページのダウンロード上限（バイト）
+FETCH_MAX_PAGE_BYTES = int(os.getenv("FETCH_MAX_PAGE_BYTES", str(2 * 1024 * 1024)))
+
+_CONTENT_TYPE_CHARSET = re.compile(r'charset=["\']?([\w.:-]+)', re.IGNORECASE)
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.IGNORECASE)
 
 
 class ArticleFetcher:
     """記事取得クラス"""
     
-    def __init__(self, user_agent: str = None):
+    def __init__(self, user_agent: str = None, timeout: float = 10,
+                 feed_cache: Optional[FeedCache] = None, page_cache: Optional[PageCache] = None,
+                 extractor=None, max_page_bytes: int = None, host_interval: float = 1.0,
+                 watermarks: Optional[FeedWatermarks] = None, robots: Optional[RobotsCache] = None):
         """
         初期化
         
         Args:
             user_agent: リクエスト時のUser-Agent
+            timeout: HTTPリクエストのタイムアウト（秒）
+            feed_cache: RSSフィードの条件付きGET用キャッシュ（Noneの場合はプロセス共通のキャッシュ）
+            page_cache: 記事ページの本文キャッシュ（Noneの場合はプロセス共通のキャッシュ）
+            extractor: HTML本文抽出バックエンド（Noneの場合はHTML_EXTRACTORの設定）
+            max_page_bytes: 記事ページのダウンロード上限（バイト、Noneの場合はFETCH_MAX_PAGE_BYTES）
+            host_interval: 同一ホストへのリクエスト間隔（秒）
+            watermarks: 差分取得用のフィードごとの既読位置（Noneの場合は差分取得時にプロセス共通のものを使用）
+            robots: 記事ページ取得前に確認するrobots.txtのキャッシュ（Noneの場合はプロセス共通のキャッシュ）
         """
+        self.timeout = timeout
+        self.feed_cache = feed_cache or get_feed_cache()
+        self.page_cache = page_cache or get_page_cache()
+        self.extractor = extractor or get_extractor()
+        self.max_page_bytes = max_page_bytes or FETCH_MAX_PAGE_BYTES
+        self.rate_limiter = HostRateLimiter(host_interval)
+        self.watermarks = watermarks
+        self.robots = robots or get_robots_cache()
         self.user_agent = user_agent or "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.session = create_session({
             'User-Agent': self.user_agent
         })
     
-    def fetch_from_rss(self, rss_url: str, max_items: int = 10) -> List[Dict]:
+    def fetch_from_rss(self, rss_url: str, max_items: int = 10, incremental: bool = False,
+                       timeout: Optional[float] = None) -> List[Dict]:
         """
         RSSフィードから記事を取得
         
         Args:
             rss_url: RSSフィードのURL
             max_items: 取得する最大記事数
+            incremental: Trueの場合は前回の取得以降の新着エントリのみ返す（差分取得）
+            timeout: フィード取得のタイムアウト（秒、Noneの場合はself.timeout）
         
         Returns:
             記事のリスト（url, title, content, published_atを含む）
         """
-        articles = []
+        return list(self.iter_rss(rss_url, max_items, incremental, timeout))
+    
+    def iter_rss(self, rss_url: str, max_items: int = 10, incremental: bool = False,
+                 timeout: Optional[float] = None) -> Iterator[Dict]:
+        """
+        RSSフィードから記事を取得し、エントリを解析するたびに返す
+        
+        キャッシュへの保存とウォーターマークの更新は最後まで読み進めた時点で行う
+        （途中でやめた場合、差分取得では残りのエントリを次回も新着として扱う）。
+        
+        Args:
+            rss_url: RSSフィードのURL
+            max_items: 取得する最大記事数
+            incremental: Trueの場合は前回の取得以降の新着エントリのみ返す（差分取得）
+            timeout: フィード取得のタイムアウト（秒、Noneの場合はself.timeout）
         
+        Yields:
+            記事の辞書（url, title, content, published_atを含む）
+        """
         try:
             print(f"📡 RSSフィードを取得中: {rss_url}")
-            feed = feedparser.parse(rss_url)
-            
-            if feed.bozo and feed.bozo_exception:
-                print(f"⚠️ RSS解析エラー: {feed.bozo_exception}")
-                return articles
+            result = self._fetch_feed(rss_url, max_items, incremental, lazy=True, timeout=timeout)
+        except Exception as e:
+            print(f"⚠️ RSS取得エラー: {e}")
+            return
+        
+        if result['error']:
+            print(f"⚠️ RSS解析エラー: {result['error']}")
+            return
+    
+        count = 0
+        for article in result['articles']:
+            count += 1
+            yield article
+        print(f"✅ {count}件の記事を取得")
+    
+    def _fetch_feed(self, rss_url: str, max_items: int = 10, incremental: bool = False,
+                    lazy: bool = False, timeout: Optional[float] = None) -> Dict:
+        """
+        RSSフィードをダウンロードして解析（ネットワークエラーは呼び出し側へ送出）
+        
+        Args:
+            rss_url: RSSフィードのURL
+            max_items: 取得する最大記事数
+            incremental: Trueの場合は前回の取得以降の新着エントリのみ返す（差分取得）
+            lazy: Trueの場合は"articles"をイテレータで返し、読み進めたときにエントリを解析する
+                 （parse_timeはフィード全体の解析時間のみ）
+            timeout: ダウンロードのタイムアウト（秒、Noneの場合はself.timeout）
+        
+        Returns:
+            {"articles": 記事のリスト, "download_time": 秒, "parse_time": 秒,
+             "error": 解析エラーまたはNone, "cached": 304でキャッシュを返したか,
+             "skipped": 既読のためスキップしたエントリ数}
+        """
+        if incremental:
+            if self.watermarks is None:
+                self.watermarks = get_feed_watermarks()
+            if self.watermarks:
+                return self._fetch_feed_incremental(rss_url, max_items, lazy, timeout)
+        
+        started = time.perf_counter()
+        
+        # キャッシュがあれば条件付きGET（If-None-Match / If-Modified-Since）
+        cached = self.feed_cache.get(rss_url, max_items) if self.feed_cache else None
+        headers = self.feed_cache.conditional_headers(cached) if cached else {}
+        
+        response = self.session.get(
+            rss_url, timeout=self.timeout if timeout is None else timeout, headers=headers
+        )
+        downloaded = time.perf_counter()
+        
+        # 304 Not Modified: 解析せずにキャッシュ済みのエントリを返す
+        if response.status_code == 304 and cached:
+            self.feed_cache.record_hit()
+            print(f"♻️ フィード未更新（304）: キャッシュを使用 ({len(cached['articles'])}件)")
+            return {
+                'articles': cached['articles'],
+                'download_time': downloaded - started,
+                'parse_time': 0.0,
+                'error': None,
+                'cached': True,
+                'skipped': 0
+            }
+        
+        response.raise_for_status()
+        if self.feed_cache:
+            self.feed_cache.record_miss()
+        
+        feed = parse_feed(response.content, max_items)
+        error = None
+        articles = []
+        if feed.bozo and feed.bozo_exception:
+            error = str(feed.bozo_exception)
+        else:
+            def store(parsed: List[Dict]):
+                self.feed_cache.put(
+                    rss_url,
+                    max_items,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified'),
+                    parsed
+                )
             
+            articles = self._iter_entries(feed.entries[:max_items], store if self.feed_cache else None)
+            if not lazy:
+                articles = list(articles)
+        
+        return {
+            'articles': articles,
+            'download_time': downloaded - started,
+            'parse_time': time.perf_counter() - downloaded,
+            'error': error,
+            'cached': False,
+            'skipped': 0
+        }
+    
+    def _fetch_feed_incremental(self, rss_url: str, max_items: int, lazy: bool = False,
+                                timeout: Optional[float] = None) -> Dict:
+        """
+        ウォーターマークより新しいエントリのみ解析して返す（差分取得）
+        
+        既読のエントリはHTMLの除去や辞書の作成を行わない。ウォーターマークに保存した
+        ETag / Last-Modified で条件付きGETを行い、304の場合は新着なしとして空のリストを返す。
+        
+        Args:
+            rss_url: RSSフィードのURL
+            max_items: 確認する最大エントリ数
+            lazy: Trueの場合は"articles"をイテレータで返す（ウォーターマークは読み終えた時点で更新）
+            timeout: ダウンロードのタイムアウト（秒、Noneの場合はself.timeout）
+        
+        Returns:
+            _fetch_feed と同じ形式の辞書
+        """
+        started = time.perf_counter()
+        mark = self.watermarks.get(rss_url)
+        headers = self.watermarks.conditional_headers(mark)
+        
+        response = self.session.get(
+            rss_url, timeout=self.timeout if timeout is None else timeout, headers=headers
+        )
+        downloaded = time.perf_counter()
+        
+        if response.status_code == 304 and mark:
+            print(f"♻️ フィード未更新（304）: 新着なし")
+            return {
+                'articles': [],
+                'download_time': downloaded - started,
+                'parse_time': 0.0,
+                'error': None,
+                'cached': True,
+                'skipped': 0
+            }
+        
+        response.raise_for_status()
+        
+        feed = parse_feed(response.content, max_items)
+        error = None
+        articles = []
+        skipped = 0
+        if feed.bozo and feed.bozo_exception:
+            error = str(feed.bozo_exception)
+        else:
             entries = feed.entries[:max_items]
+            seen = [(_entry_guid(entry), _entry_published_at(entry)) for entry in entries]
+            new_entries = [
+                entry for entry, (guid, published_at) in zip(entries, seen)
+                if self.watermarks.is_new(mark, guid, published_at)
+            ]
+            skipped = len(entries) - len(new_entries)
+            if skipped:
+                print(f"⏭️  既読のエントリをスキップ: {skipped}件")
             
-            for entry in entries:
-                try:
-                    # 公開日時の取得
-                    published_at = None
-                    if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                        published_at = datetime(*entry.published_parsed[:6])
-                    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                        published_at = datetime(*entry.updated_parsed[:6])
-                    
-                    # コンテンツの取得
-                    content = ""
-                    if hasattr(entry, 'content'):
-                        content = entry.content[0].value if entry.content else ""
-                    elif hasattr(entry, 'summary'):
-                        content = entry.summary
-                    elif hasattr(entry, 'description'):
-                        content = entry.description
-                    
-                    # HTMLタグを除去
-                    content = self._clean_html(content)
-                    
-                    article = {
-                        'url': entry.link,
-                        'title': entry.title,
-                        'content': content[:5000] if content else None,  # 最初の5000文字
-                        'published_at': published_at
-                    }
-                    articles.append(article)
-                    print(f"  ✓ {entry.title[:50]}...")
-                    
-                except Exception as e:
-                    print(f"  ⚠️ エントリ処理エラー: {e}")
-                    continue
+            def advance(parsed: List[Dict]):
+                self.watermarks.advance(
+                    rss_url,
+                    seen,
+                    response.headers.get('ETag'),
+                    response.headers.get('Last-Modified')
+                )
             
-            print(f"✅ {len(articles)}件の記事を取得")
-            
-        except Exception as e:
-            print(f"⚠️ RSS取得エラー: {e}")
+            articles = self._iter_entries(new_entries, advance)
+            if not lazy:
+                articles = list(articles)
+        
+        return {
+            'articles': articles,
+            'download_time': downloaded - started,
+            'parse_time': time.perf_counter() - downloaded,
+            'error': error,
+            'cached': False,
+            'skipped': skipped
+        }
+    
+    def _parse_entries(self, entries) -> List[Dict]:
+        """
+        feedparserのエントリを記事の辞書に変換
+        
+        Args:
+            entries: フィードのエントリのリスト（feedparser / parse_feed の結果）
+        
+        Returns:
+            記事のリスト
+        """
+        return list(self._iter_entries(entries))
+    
+    def _iter_entries(self, entries, on_complete=None) -> Iterator[Dict]:
+        """
+        feedparserのエントリを1件ずつ記事の辞書に変換して返す
+        
+        Args:
+            entries: フィードのエントリのリスト（feedparser / parse_feed の結果）
+            on_complete: すべてのエントリを変換した後に、記事のリストを渡して呼ぶ関数
+        
+        Yields:
+            記事の辞書
+        """
+        # エントリから必要な項目を取り出す（HTMLの除去は後でまとめて行う）
+        pending = []
+        for entry in entries:
+            try:
+                # 公開日時の取得
+                published_at = _entry_published_at(entry)
+                
+                # コンテンツの取得
+                content = ""
+                if hasattr(entry, 'content'):
+                    content = entry.content[0].value if entry.content else ""
+                elif hasattr(entry, 'summary'):
+                    content = entry.summary
+                elif hasattr(entry, 'description'):
+                    content = entry.description
+                
+                pending.append((entry.link, entry.title, content, published_at))
+                
+            except Exception as e:
+                print(f"  ⚠️ エントリ処理エラー: {e}")
+                continue
+        
+        # HTMLタグを除去（エントリが多い場合はプロセスプールで並列処理）
+        cleaned = self._clean_html_batch([content for _, _, content, _ in pending])
         
-        return articles
+        articles = []
+        for (url, title, _, published_at), content in zip(pending, cleaned):
+            article = {
+                'url': url,
+                'title': title,
+                'content': trim_to_sentences(content, 5000) if content else None,  # 最初の5000文字（文単位）
+                'published_at': published_at
+            }
+            print(f"  ✓ {title[:50]}...")
+            articles.append(article)
+            yield article
+        
+        if on_complete:
+            try:
+                on_complete(articles)
+            except Exception as e:
+                print(f"⚠️ 取得結果の保存エラー: {e}")
     
-    def fetch_from_url(self, url: str) -> Optional[Dict]:
+    def fetch_from_url(self, url: str, interval: Optional[float] = None,
+                       timeout: Optional[float] = None) -> Optional[Dict]:
         """
         単一URLから記事を取得（Webスクレイピング）
         
+        ページキャッシュが有効期限内ならネットワークなしで返し、期限切れの場合は
+        条件付きGETで再検証する（304ならキャッシュを返す）。
+        ネットワークアクセスの前にrobots.txtを確認し（禁止されているURLは取得しない）、
+        ホストごとのトークンバケットで間隔を空ける（Crawl-delayがあればその間隔）。
+        
         Args:
             url: 記事のURL
+            interval: 同一ホストへのリクエスト間隔（秒、Noneの場合はhost_interval）
+            timeout: リクエストのタイムアウト（秒、Noneの場合はself.timeout）
         
         Returns:
             記事の辞書（url, title, content, published_atを含む）またはNone
         """
         try:
-            print(f"🌐 記事を取得中: {url}")
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            response.encoding = response.apparent_encoding
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # タイトルの取得
-            title = None
-            if soup.find('title'):
-                title = soup.find('title').get_text().strip()
-            elif soup.find('h1'):
-                title = soup.find('h1').get_text().strip()
-            elif soup.find('meta', property='og:title'):
-                title = soup.find('meta', property='og:title').get('content', '').strip()
-            
-            # 本文の取得
-            content = None
-            
-            # articleタグを優先
-            article_tag = soup.find('article')
-            if article_tag:
-                content = self._extract_text(article_tag)
-            else:
-                # mainタグ
-                main_tag = soup.find('main')
-                if main_tag:
-                    content = self._extract_text(main_tag)
-                else:
-                    # body全体から不要な要素を除去
-                    body = soup.find('body')
-                    if body:
-                        # スクリプト、スタイル、ナビゲーションなどを除去
-                        for tag in body.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside']):
-                            tag.decompose()
-                        content = self._extract_text(body)
-            
-            # 公開日時の取得
-            published_at = None
-            time_tag = soup.find('time')
-            if time_tag:
-                datetime_attr = time_tag.get('datetime') or time_tag.get_text()
-                try:
-                    published_at = datetime.fromisoformat(datetime_attr.replace('Z', '+00:00'))
-                except:
-                    pass
+            cached = self.page_cache.get(url) if self.page_cache else None
+            if cached and cached['fresh']:
+                self.page_cache.record_hit()
+                print(f"♻️ キャッシュから記事を取得: {url}")
+                return dict(cached['article'], url=url)
             
-            if not title:
-                print(f"⚠️ タイトルが見つかりません: {url}")
+            if self.robots and not self._allowed_by_robots(url):
                 return None
             
-            if not content or len(content) < 100:
-                print(f"⚠️ コンテンツが短すぎます: {url}")
-                return None
+            self.rate_limiter.acquire(url, interval)
+            print(f"🌐 記事を取得中: {url}")
+            headers = self.page_cache.conditional_headers(cached) if cached else {}
+            timeout = self.timeout if timeout is None else timeout
+            with self.session.get(url, timeout=timeout, headers=headers, stream=True) as response:
+                # 304 Not Modified: 再検証済みのキャッシュを返す（有効期限を更新）
+                if response.status_code == 304 and cached:
+                    self.page_cache.record_revalidated()
+                    self._save_page(url, cached['article'], cached['etag'], cached['last_modified'])
+                    print(f"♻️ 記事未更新（304）: キャッシュを使用")
+                    return dict(cached['article'], url=url)
+                
+                response.raise_for_status()
+                html = self._read_page(response)
             
-            article = {
-                'url': url,
-                'title': title,
-                'content': content[:5000],  # 最初の5000文字
-                'published_at': published_at
-            }
+            if self.page_cache:
+                self.page_cache.record_miss()
             
-            print(f"✅ 記事取得完了: {title[:50]}...")
+            article = self._parse_article_html(html, url)
+            if article:
+                self._save_page(url, article, response.headers.get('ETag'), response.headers.get('Last-Modified'))
             return article
             
         except Exception as e:
             print(f"⚠️ 記事取得エラー ({url}): {e}")
             return None
     
-    def fetch_from_urls(self, urls: List[str], delay: float = 1.0) -> List[Dict]:
+    def _save_page(self, url: str, article: Dict, etag: Optional[str], last_modified: Optional[str]):
+        """ページキャッシュに保存（保存に失敗しても取得した記事は返せるよう、エラーはログのみ）"""
+        if not self.page_cache:
+            return
+        try:
+            self.page_cache.put(url, article, etag, last_modified)
+        except Exception as e:
+            print(f"⚠️ ページキャッシュの保存エラー ({url}): {e}")
+    
+    def _allowed_by_robots(self, url: str) -> bool:
+        """
+        robots.txtで取得が許可されているかを確認し、Crawl-delayをホストの間隔に設定
+        
+        Args:
+            url: 記事のURL
+        
+        Returns:
+            許可されている場合True
+        """
+        allowed, delay = self.robots.check(url, self.session)
+        if delay:
+            self.rate_limiter.set_interval(urlparse(url).netloc, delay)
+        if not allowed:
+            print(f"🚫 robots.txtで禁止されているためスキップ: {url}")
+        return allowed
+    
+    def _read_page(self, response) -> str:
+        """
+        レスポンス本文をチャンク単位で読み込んでデコード
+        
+        max_page_bytes に達した時点で読み込みを打ち切る（本文の候補を採点する抽出器のため、
+        ページ全体を読み込む。最初の<article>要素が関連記事などの場合もある）。
+        文字コードはContent-Typeヘッダー → <meta charset> → 自動判定の順で決定する。
+        
+        Args:
+            response: stream=Trueで取得したレスポンス
+        
+        Returns:
+            デコードされたHTML
+        """
+        buffer = bytearray()
+        for chunk in response.iter_content(chunk_size=16384):
+            buffer.extend(chunk)
+            if len(buffer) >= self.max_page_bytes:
+                print(f"  ✂️ 上限{self.max_page_bytes}バイトで読み込みを打ち切り")
+                del buffer[self.max_page_bytes:]
+                break
+        
+        data = bytes(buffer)
+        return data.decode(_detect_encoding(response, data), errors='replace')
+    
+    def _parse_article_html(self, html: str, url: str) -> Optional[Dict]:
+        """
+        記事ページのHTMLからタイトル・本文・公開日時を抽出
+        
+        Args:
+            html: ページのHTML
+            url: 記事のURL
+        
+        Returns:
+            記事の辞書（url, title, content, published_atを含む）またはNone
+        """
+        extracted = self.extractor.extract_page(html, max_chars=5000)
+        title = extracted['title']
+        content = extracted['content']
+        published_at = extracted['published_at']
+        
+        if not title:
+            print(f"⚠️ タイトルが見つかりません: {url}")
+            return None
+        
+        if not content or len(content) < 100:
+            print(f"⚠️ コンテンツが短すぎます: {url}")
+            return None
+        
+        article = {
+            'url': url,
+            'title': title,
+            'content': content,  # 最初の5000文字（文単位）
+            'published_at': published_at
+        }
+        
+        print(f"✅ 記事取得完了: {title[:50]}...")
+        return article
+    
+    def fetch_from_urls(self, urls: List[str], delay: float = 1.0, max_workers: int = 8) -> List[Dict]:
         """
-        複数URLから記事を取得
+        複数URLから記事を取得（異なるホストは並行取得）
         
         Args:
             urls: URLのリスト
-            delay: リクエスト間の遅延（秒）
+            delay: 同一ホストへのリクエスト間隔（秒）
+            max_workers: 同時に取得するURL数の上限
         
         Returns:
-            記事のリスト
+            記事のリスト（入力順、取得できなかったURLは除く）
         """
-        articles = []
+        results: List[Optional[Dict]] = [None] * len(urls)
+        for index, article in self._fetch_urls_concurrently(urls, delay, max_workers):
+            results[index] = article
+        return [article for article in results if article]
+    
+    def iter_urls(self, urls: List[str], delay: float = 1.0, max_workers: int = 8) -> Iterator[Dict]:
+        """
+        複数URLから記事を並行取得し、取得できた順に返す
+        
+        Args:
+            urls: URLのリスト
+            delay: 同一ホストへのリクエスト間隔（秒）
+            max_workers: 同時に取得するURL数の上限
         
-        for i, url in enumerate(urls):
-            article = self.fetch_from_url(url)
+        Yields:
+            記事の辞書（取得完了順）
+        """
+        for _, article in self._fetch_urls_concurrently(urls, delay, max_workers):
             if article:
-                articles.append(article)
-            
-            # 最後のリクエスト以外は遅延
-            if i < len(urls) - 1:
-                time.sleep(delay)
+                yield article
+    
+    def _fetch_urls_concurrently(self, urls: List[str], delay: float,
+                                 max_workers: int) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """
+        スレッドプールでURLを取得し、(入力位置, 記事またはNone) を完了順に返す
+        
+        同一ホストのURLが待機でワーカーを占有しないよう、ホストを交互に並べて投入する。
+        """
+        if not urls:
+            return
         
-        return articles
+        executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))))
+        try:
+            futures = {
+                executor.submit(self.fetch_from_url, urls[index], delay): index
+                for index in _interleave_by_host(urls)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
     
     def _extract_text(self, element) -> str:
         """
@@ -206,24 +540,7 @@ class ArticleFetcher:
         Returns:
             抽出されたテキスト
         """
-        if not element:
-            return ""
-        
-        # コピーを作成して操作
-        element = element.__copy__()
-        
-        # 不要なタグを除去
-        for tag in element.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe']):
-            tag.decompose()
-        
-        # テキストを取得
-        text = element.get_text(separator='\n', strip=True)
-        
-        # 余分な空白を整理
-        text = re.sub(r'\n\s*\n', '\n\n', text)
-        text = re.sub(r' +', ' ', text)
-        
-        return text.strip()
+        return SoupExtractor().extract_text(element)
     
     def _clean_html(self, html: str) -> str:
         """
@@ -235,19 +552,44 @@ class ArticleFetcher:
         Returns:
             クリーンなテキスト
         """
-        if not html:
-            return ""
+        return self.extractor.clean_html(html)
+    
+    def _clean_html_batch(self, htmls: List[str]) -> List[str]:
+        """
+        複数のHTMLからタグを除去してテキストのみを抽出
         
-        soup = BeautifulSoup(html, 'html.parser')
-        return self._extract_text(soup)
+        Args:
+            htmls: HTML文字列のリスト
+        
+        Returns:
+            クリーンなテキストのリスト（入力と同じ順序）
+        """
+        return clean_html_batch(htmls, self.extractor)
 
 
 class RSSFeedManager:
     """RSSフィード管理クラス"""
     
-    def __init__(self):
-        self.fetcher = ArticleFetcher()
+    def __init__(self, max_concurrency: int = 8, per_host_concurrency: int = 2,
+                 incremental: bool = False, poll_scheduler: Optional[FeedPollScheduler] = None,
+                 fetcher: Optional[ArticleFetcher] = None):
+        """
+        初期化
+        
+        Args:
+            max_concurrency: 全体の同時ダウンロード数の上限
+            per_host_concurrency: 同一ホストへの同時ダウンロード数の上限
+            incremental: Trueの場合は各フィードの新着エントリのみ取得（差分取得）
+            poll_scheduler: フィードごとの更新頻度を記録し、ポーリング時期を判断するスケジューラー
+            fetcher: フィードの取得に使うArticleFetcher（Noneの場合は新しく作成）
+        """
+        self.fetcher = fetcher or ArticleFetcher()
         self.feeds = []  # デフォルトのフィードリスト
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.incremental = incremental
+        self.poll_scheduler = poll_scheduler
+        self.last_feed_stats: List[Dict] = []  # 直近の取得結果（フィードごとの所要時間・エラー）
     
     def add_feed(self, rss_url: str, max_items: int = 10):
         """
@@ -264,24 +606,246 @@ class RSSFeedManager:
     
     def fetch_all_feeds(self) -> List[Dict]:
         """
-        登録されているすべてのRSSフィードから記事を取得
+        登録されているすべてのRSSフィードから記事を取得（全フィードを並行取得）
         
         Returns:
-            記事のリスト
+            記事のリスト（登録順）
+        """
+        return self.fetch_all_feeds_with_stats()['articles']
+    
+    def fetch_all_feeds_with_stats(self) -> Dict:
+        """
+        登録されているすべてのRSSフィードを並行取得し、フィードごとの計測結果も返す
+        
+        Returns:
+            {"articles": 記事のリスト, "feeds": フィードごとの結果, "elapsed": 全体の所要時間（秒）}
         """
+        started = time.perf_counter()
+        feed_results = _run_coroutine_sync(self.fetch_all_feeds_async())
+        
         all_articles = []
+        for feed_result in feed_results:
+            all_articles.extend(feed_result.pop('articles'))
+        
+        self.last_feed_stats = feed_results
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for r in feed_results if r['error'])
+        print(f"✅ {len(feed_results)}フィードから{len(all_articles)}件の記事を取得 "
+              f"({elapsed:.2f}秒, 失敗: {failed}件)")
+        
+        return {
+            'articles': all_articles,
+            'feeds': feed_results,
+            'elapsed': elapsed
+        }
+    
+    async def fetch_all_feeds_async(self) -> List[Dict]:
+        """
+        登録されているすべてのRSSフィードを非同期で並行取得
         
+        全体の同時実行数と、ホストごとの同時実行数をそれぞれ制限する。
+        
+        Returns:
+            フィードごとの結果のリスト（登録順、url, articles, count, elapsed,
+            download_time, parse_time, error, cached, skippedを含む）
+        """
+        global_limit = asyncio.Semaphore(max(1, self.max_concurrency))
+        host_limits: Dict[str, asyncio.Semaphore] = {}
         for feed_config in self.feeds:
-            articles = self.fetcher.fetch_from_rss(
-                feed_config['url'],
-                feed_config['max_items']
-            )
-            all_articles.extend(articles)
-            
-            # フィード間の遅延
-            time.sleep(1.0)
+            host = urlparse(feed_config['url']).netloc
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(max(1, self.per_host_concurrency))
+        
+        async def fetch_one(feed_config: Dict) -> Dict:
+            async with host_limits[urlparse(feed_config['url']).netloc], global_limit:
+                return await asyncio.to_thread(self._fetch_one_feed, feed_config)
+        
+        return list(await asyncio.gather(*(fetch_one(f) for f in self.feeds)))
+    
+    def iter_due_feeds(self) -> Iterator[Dict]:
+        """
+        ポーリング時期になったフィードのみ取得し、取得できたフィードから順に記事を返す
+        
+        poll_scheduler が設定されていない場合は iter_all_feeds と同じ。
+        
+        Yields:
+            記事の辞書（フィードの取得完了順）
+        """
+        if self.poll_scheduler is None:
+            yield from self.iter_all_feeds()
+            return
+        
+        due = self.poll_scheduler.due_feeds(self.feeds)
+        print(f"🗓️ ポーリング対象: {len(due)}/{len(self.feeds)}フィード")
+        yield from self.iter_all_feeds(due)
+    
+    def iter_all_feeds(self, feeds: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """
+        登録されているすべてのRSSフィードを並行取得し、取得できたフィードから順に記事を返す
+        
+        最も遅いフィードを待たずに後続の処理（DB保存・分析など）を始められる。
+        同時実行数の制限は fetch_all_feeds_async と同じ。読み終えた時点で last_feed_stats を更新する。
+        
+        Args:
+            feeds: 取得するフィード設定のリスト（Noneの場合は登録済みのすべてのフィード）
+        
+        Yields:
+            記事の辞書（フィードの取得完了順）
+        """
+        feeds = self.feeds if feeds is None else feeds
+        if not feeds:
+            return
+        
+        started = time.perf_counter()
+        host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        for feed_config in feeds:
+            host = urlparse(feed_config['url']).netloc
+            if host not in host_limits:
+                host_limits[host] = threading.BoundedSemaphore(max(1, self.per_host_concurrency))
+        
+        def fetch_one(feed_config: Dict) -> Dict:
+            with host_limits[urlparse(feed_config['url']).netloc]:
+                return self._fetch_one_feed(feed_config)
+        
+        feed_results: List[Optional[Dict]] = [None] * len(feeds)
+        total = 0
+        urls = [feed_config['url'] for feed_config in feeds]
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(feeds))))
+        try:
+            futures = {
+                executor.submit(fetch_one, feeds[index]): index
+                for index in _interleave_by_host(urls)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                articles = result.pop('articles')
+                feed_results[futures[future]] = result
+                total += len(articles)
+                yield from articles
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        self.last_feed_stats = feed_results
+        elapsed = time.perf_counter() - started
+        failed = sum(1 for r in feed_results if r['error'])
+        print(f"✅ {len(feed_results)}フィードから{total}件の記事を取得 "
+              f"({elapsed:.2f}秒, 失敗: {failed}件)")
+    
+    def _fetch_one_feed(self, feed_config: Dict) -> Dict:
+        """
+        1つのフィードを取得し、所要時間・エラーを含む結果を返す（例外は送出しない）
+        
+        Args:
+            feed_config: add_feed で登録したフィード設定
         
-        return all_articles
+        Returns:
+            url, articles, count, elapsed, download_time, parse_time, error, cached, skippedを含む辞書
+        """
+        url = feed_config['url']
+        result = {
+            'url': url,
+            'articles': [],
+            'count': 0,
+            'elapsed': 0.0,
+            'download_time': None,
+            'parse_time': None,
+            'error': None,
+            'cached': False,
+            'skipped': 0
+        }
+        started = time.perf_counter()
+        print(f"📡 RSSフィードを取得中: {url}")
+        try:
+            fetched = self.fetcher._fetch_feed(url, feed_config['max_items'], self.incremental)
+            result.update(fetched)
+            result['count'] = len(fetched['articles'])
+        except Exception as e:
+            result['error'] = str(e)
+        result['elapsed'] = time.perf_counter() - started
+            
+        if result['error']:
+            print(f"⚠️ RSS取得エラー ({url}): {result['error']}")
+        else:
+            print(f"✅ {result['count']}件の記事を取得 ({url}, {result['elapsed']:.2f}秒)")
+            if self.poll_scheduler:
+                try:
+                    self.poll_scheduler.record_poll(url, [a['published_at'] for a in result['articles']])
+                except Exception as e:
+                    print(f"⚠️ ポーリング間隔の更新エラー ({url}): {e}")
+        return result
+
+
+def _detect_encoding(response, data: bytes) -> str:
+    """
+    文字コードを決定（Content-Typeヘッダー → <meta charset> → 自動判定）
+    
+    Args:
+        response: レスポンス
+        data: 本文のバイト列
+    
+    Returns:
+        文字コード名
+    """
+    candidates = []
+    match = _CONTENT_TYPE_CHARSET.search(response.headers.get('Content-Type', ''))
+    if match:
+        candidates.append(match.group(1))
+    match = _META_CHARSET.search(data[:8192])
+    if match:
+        candidates.append(match.group(1).decode('ascii', errors='ignore'))
+    
+    for encoding in candidates:
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except LookupError:
+            continue
+    
+    # 宣言がない場合のみ自動判定（先頭64KBのみ）
+    return chardet.detect(data[:65536]).get('encoding') or 'utf-8'
+
+
+def _interleave_by_host(urls: List[str]) -> List[int]:
+    """URLの入力位置を、ホストが交互になる順に並べ替える"""
+    by_host: Dict[str, List[int]] = {}
+    for index, url in enumerate(urls):
+        by_host.setdefault(urlparse(url).netloc, []).append(index)
+    return [
+        index
+        for group in zip_longest(*by_host.values())
+        for index in group
+        if index is not None
+    ]
+
+
+def _entry_guid(entry) -> Optional[str]:
+    """feedparserのエントリのGUID（ない場合はリンク）"""
+    return entry.get('id') or entry.get('link')
+
+
+def _entry_published_at(entry) -> Optional[datetime]:
+    """feedparserのエントリの公開日時（ない場合は更新日時）"""
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        return datetime(*entry.published_parsed[:6])
+    if hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+        return datetime(*entry.updated_parsed[:6])
+    return None
+
+
+def _run_coroutine_sync(coro):
+    """
+    同期コードからコルーチンを実行
+    
+    FastAPIのエンドポイントなど、既にイベントループが動いているスレッドから
+    呼ばれた場合は別スレッドで実行する。
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
 
 
 # デフォルトのRSSフィード（例）
@@ -295,9 +859,16 @@ DEFAULT_FEEDS = [
 ]
 
 
-def get_default_feed_manager() -> RSSFeedManager:
-    """デフォルト設定のRSSフィードマネージャーを取得"""
-    manager = RSSFeedManager()
+def get_default_feed_manager(incremental: bool = False,
+                             poll_scheduler: Optional[FeedPollScheduler] = None) -> RSSFeedManager:
+    """
+    デフォルト設定のRSSフィードマネージャーを取得
+    
+    Args:
+        incremental: Trueの場合は各フィードの新着エントリのみ取得（差分取得）
+        poll_scheduler: フィードごとのポーリング時期を判断するスケジューラー（オプション）
+    """
+    manager = RSSFeedManager(incremental=incremental, poll_scheduler=poll_scheduler)
     for feed in DEFAULT_FEEDS:
         manager.add_feed(feed['url'], feed['max_items'])
     return manager
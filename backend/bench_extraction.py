@@ -0,0 +1,104 @@
+"""
+HTML本文抽出のベンチマーク（BeautifulSoup vs lxml vs 採点方式）
+
+採点方式（scored）は、Geminiに渡す本文の上限（--max-chars）を指定した場合の所要時間と本文の長さも計測する。
+
+使い方:
+    # WIREDの記事ページを保存してコーパスを作成（初回のみ）
+    python bench_extraction.py --download 20
+    
+    # 保存済みコーパスでベンチマーク
+    python bench_extraction.py --repeat 5 --max-chars 2000
+"""
+import argparse
+import time
+from pathlib import Path
+from statistics import mean
+
+from html_extractor import SoupExtractor, LxmlExtractor, ScoredExtractor
+
+DEFAULT_CORPUS = Path(__file__).parent / "bench_corpus" / "wired"
+WIRED_FEED = "https://www.wired.com/feed/rss"
+
+
+def download_corpus(corpus: Path, count: int):
+    """WIREDのRSSフィードに含まれる記事ページをコーパスとして保存"""
+    import feedparser
+    import requests
+    
+    corpus.mkdir(parents=True, exist_ok=True)
+    session = requests.Session()
+    session.headers.update({'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
+    
+    feed = feedparser.parse(session.get(WIRED_FEED, timeout=10).content)
+    for i, entry in enumerate(feed.entries[:count], 1):
+        try:
+            response = session.get(entry.link, timeout=10)
+            response.raise_for_status()
+            path = corpus / f"{i:03d}.html"
+            path.write_bytes(response.content)
+            print(f"  ✓ {path.name}: {entry.title[:50]}...")
+        except Exception as e:
+            print(f"  ⚠️ 保存エラー ({entry.link}): {e}")
+        time.sleep(1.0)
+
+
+def time_extractor(extractor, html: str, repeat: int, max_chars: int = None) -> float:
+    """extract_page の最短所要時間（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        extractor.extract_page(html, max_chars)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML本文抽出のベンチマーク")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="保存済みHTMLのディレクトリ")
+    parser.add_argument("--download", type=int, default=0, help="WIREDから保存する記事数")
+    parser.add_argument("--repeat", type=int, default=5, help="1ページあたりの計測回数")
+    parser.add_argument("--max-chars", type=int, default=5000, help="採点方式で抽出する本文の上限文字数")
+    args = parser.parse_args()
+    
+    if args.download:
+        print(f"📥 WIREDの記事ページを保存中: {args.corpus}")
+        download_corpus(args.corpus, args.download)
+    
+    pages = sorted(args.corpus.glob("*.html"))
+    if not pages:
+        print(f"⚠️ コーパスがありません: {args.corpus}（--download で作成してください）")
+        return
+    
+    soup, fast, scored = SoupExtractor(), LxmlExtractor(), ScoredExtractor()
+    soup_times, lxml_times, scored_times = [], [], []
+    lxml_chars, scored_chars = [], []
+    matched = 0
+    
+    print(f"🚀 {len(pages)}ページで計測中（各{args.repeat}回）...")
+    for path in pages:
+        html = path.read_bytes().decode('utf-8', errors='replace')
+        soup_times.append(time_extractor(soup, html, args.repeat))
+        lxml_times.append(time_extractor(fast, html, args.repeat))
+        scored_times.append(time_extractor(scored, html, args.repeat, args.max_chars))
+        extracted = fast.extract_page(html)
+        if soup.extract_page(html) == extracted:
+            matched += 1
+        # 従来の方式は全文を抽出してから先頭を切り出していた
+        lxml_chars.append(len((extracted['content'] or '')[:args.max_chars]))
+        scored_chars.append(len(scored.extract_page(html, args.max_chars)['content'] or ''))
+    
+    soup_ms, lxml_ms = mean(soup_times) * 1000, mean(lxml_times) * 1000
+    scored_ms = mean(scored_times) * 1000
+    print(f"\n{'='*60}")
+    print(f"BeautifulSoup: {soup_ms:.2f}ms/ページ")
+    print(f"lxml:          {lxml_ms:.2f}ms/ページ")
+    print(f"高速化:        {soup_ms / lxml_ms:.1f}倍")
+    print(f"抽出結果の一致: {matched}/{len(pages)}ページ")
+    print(f"採点方式:      {scored_ms:.2f}ms/ページ（上限{args.max_chars}文字、lxmlの{lxml_ms / scored_ms:.1f}倍）")
+    print(f"本文の平均文字数: lxml {mean(lxml_chars):.0f} / 採点方式 {mean(scored_chars):.0f}")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+RSSフィード解析のベンチマーク（feedparser vs lxml iterparse）
+
+使い方:
+    # WIREDの8フィードを保存してコーパスを作成（初回のみ）
+    python bench_feed_parser.py --download
+    
+    # 保存済みコーパスでベンチマーク
+    python bench_feed_parser.py --repeat 5 --max-items 10
+"""
+import argparse
+import resource
+import time
+import tracemalloc
+from multiprocessing import get_context
+from pathlib import Path
+from statistics import mean
+
+from feed_parser import parse_feed
+from html_extractor import get_extractor
+
+DEFAULT_CORPUS = Path(__file__).parent / "bench_corpus" / "feeds"
+WIRED_FEEDS = [
+    "https://www.wired.com/feed/category/business/rss",
+    "https://www.wired.com/feed/tag/ai/latest/rss",
+    "https://www.wired.com/feed/category/ideas/rss",
+    "https://www.wired.com/feed/category/science/rss",
+    "https://www.wired.com/feed/category/gear/rss",
+    "https://www.wired.com/feed/category/culture/rss",
+    "https://www.wired.com/feed/category/security/rss",
+    "https://www.wired.com/feed/rss",
+]
+
+
+def download_corpus(corpus: Path):
+    """WIREDのRSSフィードをコーパスとして保存"""
+    import requests
+    
+    corpus.mkdir(parents=True, exist_ok=True)
+    session = requests.Session()
+    session.headers.update({'User-Agent': "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"})
+    
+    for i, url in enumerate(WIRED_FEEDS, 1):
+        try:
+            response = session.get(url, timeout=10)
+            response.raise_for_status()
+            path = corpus / f"{i:02d}.xml"
+            path.write_bytes(response.content)
+            print(f"  ✓ {path.name}: {url} ({len(response.content) / 1024:.0f}KB)")
+        except Exception as e:
+            print(f"  ⚠️ 保存エラー ({url}): {e}")
+        time.sleep(1.0)
+
+
+def time_parser(parser: str, data: bytes, max_items: int, repeat: int) -> float:
+    """parse_feed の最短所要時間（秒）"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse_feed(data, max_items, parser=parser)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def python_peak(parser: str, data: bytes, max_items: int) -> int:
+    """解析中のPythonオブジェクトの最大使用量（バイト、libxml2の内部メモリは含まない）"""
+    tracemalloc.start()
+    parse_feed(data, max_items, parser=parser)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def _rss_growth(parser: str, feeds: list, max_items: int) -> int:
+    """新しいプロセスで全フィードを解析したときの最大RSSの増加量（KB、libxml2を含む）"""
+    before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results = [parse_feed(data, max_items, parser=parser) for data in feeds]
+    growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+    del results
+    return growth
+
+
+def entry_summary(entry, extractor) -> tuple:
+    """fetch_from_rss の結果に影響する項目（HTML除去後の本文で比較）"""
+    content = ""
+    if hasattr(entry, 'content'):
+        content = entry.content[0].value if entry.content else ""
+    elif hasattr(entry, 'summary'):
+        content = entry.summary
+    published = entry.get('published_parsed') or entry.get('updated_parsed')
+    return (
+        entry.get('link'),
+        entry.get('title'),
+        extractor.clean_html(content)[:5000],
+        tuple(published[:6]) if published else None
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSSフィード解析のベンチマーク")
+    parser.add_argument("--corpus", type=Path, default=DEFAULT_CORPUS, help="保存済みフィードのディレクトリ")
+    parser.add_argument("--download", action="store_true", help="WIREDの8フィードを保存する")
+    parser.add_argument("--repeat", type=int, default=5, help="1フィードあたりの計測回数")
+    parser.add_argument("--max-items", type=int, default=10, help="解析する最大エントリ数（0は全件）")
+    args = parser.parse_args()
+    
+    if args.download:
+        print(f"📥 WIREDのフィードを保存中: {args.corpus}")
+        download_corpus(args.corpus)
+    
+    paths = sorted(args.corpus.glob("*.xml"))
+    if not paths:
+        print(f"⚠️ コーパスがありません: {args.corpus}（--download で作成してください）")
+        return
+    
+    feeds = [path.read_bytes() for path in paths]
+    max_items = args.max_items or None
+    extractor = get_extractor()
+    times = {'feedparser': [], 'fast': []}
+    peaks = {'feedparser': [], 'fast': []}
+    matched = fallbacks = 0
+    
+    print(f"🚀 {len(feeds)}フィードで計測中（各{args.repeat}回、最大{args.max_items or '全'}件）...")
+    for path, data in zip(paths, feeds):
+        for name in times:
+            times[name].append(time_parser(name, data, max_items, args.repeat))
+            peaks[name].append(python_peak(name, data, max_items))
+        
+        fast = parse_feed(data, max_items, parser="fast")
+        slow = parse_feed(data, max_items, parser="feedparser")
+        if fast['parser'] != "fast":
+            fallbacks += 1
+        if ([entry_summary(e, extractor) for e in fast['entries'][:max_items]] ==
+                [entry_summary(e, extractor) for e in slow['entries'][:max_items]]):
+            matched += 1
+        else:
+            print(f"  ⚠️ 解析結果の不一致: {path.name}")
+    
+    # libxml2のメモリも含めるため、パーサーごとに新しいプロセスで最大RSSを計測
+    with get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        growth = {name: pool.apply(_rss_growth, (name, feeds, max_items)) for name in times}
+    
+    slow_ms, fast_ms = mean(times['feedparser']) * 1000, mean(times['fast']) * 1000
+    print(f"\n{'='*60}")
+    print(f"feedparser: {slow_ms:.2f}ms/フィード, Pythonピーク {mean(peaks['feedparser']) / 1024:.0f}KB")
+    print(f"iterparse:  {fast_ms:.2f}ms/フィード, Pythonピーク {mean(peaks['fast']) / 1024:.0f}KB")
+    print(f"高速化:     {slow_ms / fast_ms:.1f}倍")
+    print(f"最大RSSの増加（全フィード）: feedparser {growth['feedparser']}KB / iterparse {growth['fast']}KB")
+    print(f"解析結果の一致: {matched}/{len(feeds)}フィード（feedparserへのフォールバック: {fallbacks}件）")
+    print(f"{'='*60}")
+
+
+if __name__ == "__main__":
+    main()
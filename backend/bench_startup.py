@@ -0,0 +1,144 @@
+"""
+起動時間のベンチマーク（モジュールのimport時間と、main:app が /healthz に応答できるまでの時間）
+
+モジュールごとに新しいPythonプロセスでimportし、google.generativeai が読み込まれたかどうかも表示する。
+変更前後を比べる場合は、それぞれのコミットをチェックアウトして実行する。
+
+使い方:
+    # import時間（5回の平均）と /healthz に応答できるまでの時間
+    python bench_startup.py --repeat 5
+    
+    # import時間のみ
+    python bench_startup.py --skip-server
+    
+    # 変更前と比較
+    git stash && python bench_startup.py && git stash pop && python bench_startup.py
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from statistics import mean
+
+BACKEND_DIR = Path(__file__).parent
+DEFAULT_MODULES = ["gemini_analyzer", "scheduler", "wired_bluesky_bot_advanced", "main"]
+
+# import時間を測る子プロセスのコード
+_IMPORT_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "genai_loaded": "google.generativeai" in sys.modules
+}}))
+"""
+
+
+def _bench_env() -> dict:
+    """ベンチマーク用の環境変数（APIキーがなくてもimportでき、バックグラウンドのBotを起動しない）"""
+    env = dict(os.environ)
+    env.setdefault("GEMINI_API_KEY", "bench-dummy-key")
+    env.setdefault("DISABLE_WIRED_SCHEDULER", "true")
+    env.setdefault("ENABLE_SCHEDULER", "false")
+    return env
+
+
+def measure_import(module: str, repeat: int) -> dict:
+    """
+    新しいプロセスでモジュールをimportする時間を計測
+    
+    Args:
+        module: モジュール名
+        repeat: 計測回数
+    
+    Returns:
+        {"seconds", "genai_loaded"}（importに失敗した場合は {"error"}）
+    """
+    samples = []
+    genai_loaded = False
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, "-c", _IMPORT_PROBE.format(module=module)],
+            cwd=BACKEND_DIR, env=_bench_env(), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            return {"error": (result.stderr.strip().splitlines() or ["不明なエラー"])[-1]}
+        measured = json.loads(result.stdout.strip().splitlines()[-1])
+        samples.append(measured["seconds"])
+        genai_loaded = measured["genai_loaded"]
+    return {"seconds": mean(samples), "genai_loaded": genai_loaded}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_readiness(app: str, timeout: float) -> dict:
+    """
+    uvicornでアプリを起動し、/healthz が200を返すまでの時間を計測
+    
+    Args:
+        app: アプリ（例: "main:app"）
+        timeout: 待機する最大秒数
+    
+    Returns:
+        {"seconds"}（起動に失敗した場合は {"error"}）
+    """
+    port = _free_port()
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_bench_env(), stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                return {"error": (server.stderr.read().strip().splitlines() or ["不明なエラー"])[-1]}
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/healthz", timeout=1) as response:
+                    if response.status == 200:
+                        return {"seconds": time.perf_counter() - started}
+            except OSError:
+                time.sleep(0.05)
+        return {"error": f"{timeout:.0f}秒以内に応答しませんでした"}
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動時間のベンチマーク")
+    parser.add_argument("--repeat", type=int, default=3, help="import時間の計測回数")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES, help="計測するモジュール")
+    parser.add_argument("--app", default="main:app", help="/healthz の応答時間を計測するアプリ")
+    parser.add_argument("--timeout", type=float, default=60, help="/healthz の応答を待つ最大秒数")
+    parser.add_argument("--skip-server", action="store_true", help="/healthz の応答時間を計測しない")
+    args = parser.parse_args()
+    
+    print(f"{'モジュール':<30} {'import (ms)':>12}  google.generativeai")
+    for module in args.modules:
+        result = measure_import(module, args.repeat)
+        if "error" in result:
+            print(f"{module:<30} {'失敗':>12}  {result['error']}")
+            continue
+        loaded = "読み込み済み" if result["genai_loaded"] else "未読み込み"
+        print(f"{module:<30} {result['seconds'] * 1000:>12.0f}  {loaded}")
+    
+    if not args.skip_server:
+        result = measure_readiness(args.app, args.timeout)
+        if "error" in result:
+            print(f"\n{args.app} の起動に失敗: {result['error']}")
+        else:
+            print(f"\n{args.app} が /healthz に応答するまで: {result['seconds'] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,662 @@
+"""
+ローカルキャッシュモジュール（SQLiteベースのLRUストア）
+
+【用途】
+- RSSフィードの条件付きGET用キャッシュ（ETag / Last-Modified + 解析済みエントリ）
+- 記事ページの抽出済み本文キャッシュ（正規化URLのハッシュをキーに保存）
+- フィードごとの既読位置（ウォーターマーク: 最後に見たGUIDと公開日時）
+
+【設定】
+- CACHE_DB_PATH: キャッシュ用SQLiteファイルのパス（デフォルト: ./http_cache.db）
+- CACHE_DB_BUSY_TIMEOUT_SECONDS: 他の接続が書き込み中の場合に待つ最大秒数（デフォルト: 10）
+- DISABLE_HTTP_CACHE: true の場合はキャッシュを使用しない
+- FEED_CACHE_MAX_ENTRIES: フィードキャッシュの最大件数（デフォルト: 64）
+- PAGE_CACHE_TTL_HOURS: 記事ページを再検証なしで返す時間（デフォルト: 24時間）
+- PAGE_CACHE_MAX_MB: 記事ページキャッシュの合計サイズ上限（デフォルト: 32MB）
+- PAGE_CACHE_COMPRESSION: zstd / none（デフォルト: zstandardがインストール済みならzstd）
+"""
+import os
+import json
+import hashlib
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# zstd圧縮（オプション、未インストールの場合は非圧縮で保存）
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CACHE_DB_PATH = os.getenv("CACHE_DB_PATH", "./http_cache.db")
+CACHE_DB_BUSY_TIMEOUT_SECONDS = float(os.getenv("CACHE_DB_BUSY_TIMEOUT_SECONDS", "10"))
+DISABLE_HTTP_CACHE = os.getenv("DISABLE_HTTP_CACHE", "").lower() == "true"
+FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "64"))
+PAGE_CACHE_TTL_HOURS = float(os.getenv("PAGE_CACHE_TTL_HOURS", "24"))
+PAGE_CACHE_MAX_MB = float(os.getenv("PAGE_CACHE_MAX_MB", "32"))
+PAGE_CACHE_COMPRESSION = os.getenv(
+    "PAGE_CACHE_COMPRESSION", "zstd" if zstandard else "none"
+).lower()
+
+# 正規化時に除去するトラッキング用クエリパラメータ
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+# ウォーターマークに保持する既読GUIDの最大件数（公開日時が同じエントリの判定用）
+WATERMARK_MAX_GUIDS = 200
+
+
+class CacheStore:
+    """SQLiteに保存するLRUキャッシュ（件数・バイト数の上限付き）"""
+    
+    def __init__(self, path: str = None, table: str = "cache",
+                 max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """
+        初期化
+        
+        Args:
+            path: SQLiteファイルのパス（":memory:"も可）
+            table: 使用するテーブル名
+            max_entries: 最大件数（Noneの場合は無制限）
+            max_bytes: 値の合計バイト数の上限（Noneの場合は無制限）
+        """
+        self.path = path or CACHE_DB_PATH
+        self.table = table
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # 同じファイルに複数の接続（テーブルごと・スレッドごと）から書き込むため、
+        # ロック中は待機し、WALで読み込みが書き込みを妨げないようにする
+        self._conn = sqlite3.connect(self.path, timeout=CACHE_DB_BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        if self.path != ":memory:":
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error as e:
+                print(f"⚠️ キャッシュのWALモード設定エラー（通常のジャーナルを使用）: {e}")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "key TEXT PRIMARY KEY, "
+            "value BLOB NOT NULL, "
+            "meta TEXT, "
+            "size INTEGER NOT NULL, "
+            "accessed_at REAL NOT NULL, "
+            "expires_at REAL)"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_accessed ON {self.table} (accessed_at)"
+        )
+        self._conn.commit()
+    
+    def get(self, key: str) -> Optional[Tuple[bytes, Dict]]:
+        """
+        値を取得（期限切れの場合はNone）
+        
+        Args:
+            key: キャッシュキー
+        
+        Returns:
+            (値, メタデータ) またはNone
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, meta, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            value, meta, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        
+        return value, json.loads(meta) if meta else {}
+    
+    def put(self, key: str, value: bytes, meta: Dict = None, ttl: Optional[float] = None):
+        """
+        値を保存（上限を超えた場合は最も古く使われたものから削除）
+        
+        Args:
+            key: キャッシュキー
+            value: 保存する値
+            meta: 付随するメタデータ（JSONシリアライズ可能な辞書）
+            ttl: 有効期限（秒、Noneの場合は無期限）
+        """
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} "
+                "(key, value, meta, size, accessed_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, json.dumps(meta or {}, ensure_ascii=False), len(value), now, expires_at)
+            )
+            self._evict()
+            self._conn.commit()
+    
+    def delete(self, key: str):
+        """値を削除"""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+    
+    def _evict(self):
+        """上限を超えている間、最も古く使われたエントリを削除（ロック取得済みで呼ぶこと）"""
+        count, total = self._conn.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+        ).fetchone()
+        
+        while ((self.max_entries is not None and count > self.max_entries) or
+               (self.max_bytes is not None and total > self.max_bytes)) and count > 0:
+            key, size = self._conn.execute(
+                f"SELECT key, size FROM {self.table} ORDER BY accessed_at ASC LIMIT 1"
+            ).fetchone()
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            count -= 1
+            total -= size
+            self.evictions += 1
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"hits", "misses", "evictions", "entries", "bytes"}
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'entries': count,
+            'bytes': total
+        }
+
+
+class FeedCache:
+    """RSSフィードの条件付きGET用キャッシュ（ETag / Last-Modified + 解析済みエントリ）"""
+    
+    def __init__(self, store: CacheStore = None):
+        """
+        初期化
+        
+        Args:
+            store: 保存先のストア（Noneの場合はデフォルトのSQLiteファイル）
+        """
+        self.store = store or CacheStore(table="feed_cache", max_entries=FEED_CACHE_MAX_ENTRIES)
+        self.hits = 0  # 304で解析をスキップできた回数
+        self.misses = 0  # フィード全体をダウンロード・解析した回数
+    
+    def get(self, feed_url: str, max_items: int) -> Optional[Dict]:
+        """
+        キャッシュ済みのフィードを取得
+        
+        max_items がキャッシュ時より多い場合は、304で返せる件数が足りないためNoneを返す。
+        
+        Args:
+            feed_url: フィードのURL
+            max_items: 取得する最大記事数
+        
+        Returns:
+            {"etag", "last_modified", "articles"} またはNone
+        """
+        cached = self.store.get(feed_url)
+        if cached is None:
+            return None
+        
+        value, meta = cached
+        if meta.get('max_items', 0) < max_items:
+            return None
+        
+        return {
+            'etag': meta.get('etag'),
+            'last_modified': meta.get('last_modified'),
+            'articles': _decode_articles(value)[:max_items]
+        }
+    
+    def conditional_headers(self, cached: Optional[Dict]) -> Dict[str, str]:
+        """
+        条件付きGET用のリクエストヘッダーを作成
+        
+        Args:
+            cached: get() の戻り値
+        
+        Returns:
+            If-None-Match / If-Modified-Since ヘッダー
+        """
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+    
+    def put(self, feed_url: str, max_items: int, etag: Optional[str],
+            last_modified: Optional[str], articles: List[Dict]):
+        """
+        フィードの検証子と解析済みエントリを保存（検証子がない場合は保存しない）
+        
+        Args:
+            feed_url: フィードのURL
+            max_items: 解析時の最大記事数
+            etag: レスポンスのETag
+            last_modified: レスポンスのLast-Modified
+            articles: 解析済みの記事リスト
+        """
+        if not etag and not last_modified:
+            return
+        
+        self.store.put(feed_url, _encode_articles(articles), {
+            'etag': etag,
+            'last_modified': last_modified,
+            'max_items': max_items
+        })
+    
+    def record_hit(self):
+        """304 Not Modified でキャッシュを返した"""
+        self.hits += 1
+    
+    def record_miss(self):
+        """フィード全体をダウンロードして解析した"""
+        self.misses += 1
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"hits", "misses", "hit_ratio", "entries", "bytes", "evictions"}
+        """
+        store_stats = self.store.stats()
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'entries': store_stats['entries'],
+            'bytes': store_stats['bytes'],
+            'evictions': store_stats['evictions']
+        }
+
+
+class PageCache:
+    """記事ページの抽出済み本文キャッシュ（TTL・サイズ上限・条件付きGETでの再検証）"""
+    
+    def __init__(self, store: CacheStore = None, ttl_hours: float = None, compression: str = None):
+        """
+        初期化
+        
+        Args:
+            store: 保存先のストア（Noneの場合はデフォルトのSQLiteファイル）
+            ttl_hours: 再検証なしで返す時間（Noneの場合はPAGE_CACHE_TTL_HOURS）
+            compression: "zstd" または "none"（Noneの場合はPAGE_CACHE_COMPRESSION）
+        """
+        self.store = store or CacheStore(
+            table="page_cache", max_bytes=int(PAGE_CACHE_MAX_MB * 1024 * 1024)
+        )
+        self.ttl = (ttl_hours if ttl_hours is not None else PAGE_CACHE_TTL_HOURS) * 3600
+        compression = compression or PAGE_CACHE_COMPRESSION
+        if compression == "zstd" and zstandard is None:
+            print("⚠️ zstandardがインストールされていないため、ページキャッシュは非圧縮で保存します")
+            compression = "none"
+        self.compression = compression
+        self.hits = 0  # ネットワークなしで返した回数
+        self.revalidated = 0  # 304で再検証して返した回数
+        self.misses = 0  # ダウンロードして抽出した回数
+    
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        キャッシュ済みの記事を取得（期限切れでも再検証用に返す）
+        
+        Args:
+            url: 記事のURL
+        
+        Returns:
+            {"article", "etag", "last_modified", "fresh"} またはNone
+        """
+        cached = self.store.get(self._key(url))
+        if cached is None:
+            return None
+        
+        value, meta = cached
+        try:
+            if meta.get('codec') == 'zstd':
+                if zstandard is None:
+                    return None
+                value = zstandard.ZstdDecompressor().decompress(value)
+            article = _decode_articles(value)[0]
+        except Exception as e:
+            print(f"⚠️ ページキャッシュ読み込みエラー: {e}")
+            return None
+        
+        return {
+            'article': article,
+            'etag': meta.get('etag'),
+            'last_modified': meta.get('last_modified'),
+            'fresh': time.time() - meta.get('fetched_at', 0) < self.ttl
+        }
+    
+    def conditional_headers(self, cached: Optional[Dict]) -> Dict[str, str]:
+        """
+        再検証用のリクエストヘッダーを作成
+        
+        Args:
+            cached: get() の戻り値
+        
+        Returns:
+            If-None-Match / If-Modified-Since ヘッダー
+        """
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+        return headers
+    
+    def put(self, url: str, article: Dict, etag: Optional[str] = None,
+            last_modified: Optional[str] = None):
+        """
+        抽出済みの記事を保存
+        
+        Args:
+            url: 記事のURL
+            article: fetch_from_url の戻り値
+            etag: レスポンスのETag
+            last_modified: レスポンスのLast-Modified
+        """
+        value = _encode_articles([article])
+        if self.compression == "zstd":
+            value = zstandard.ZstdCompressor(level=3).compress(value)
+        
+        self.store.put(self._key(url), value, {
+            'url': canonicalize_url(url),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+            'codec': self.compression
+        })
+    
+    def record_hit(self):
+        """ネットワークなしでキャッシュを返した"""
+        self.hits += 1
+    
+    def record_revalidated(self):
+        """304で再検証してキャッシュを返した"""
+        self.revalidated += 1
+    
+    def record_miss(self):
+        """ダウンロードして抽出した"""
+        self.misses += 1
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"hits", "revalidated", "misses", "hit_ratio", "entries", "bytes", "evictions"}
+        """
+        store_stats = self.store.stats()
+        total = self.hits + self.revalidated + self.misses
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_ratio': (self.hits + self.revalidated) / total if total else 0.0,
+            'entries': store_stats['entries'],
+            'bytes': store_stats['bytes'],
+            'evictions': store_stats['evictions']
+        }
+    
+    def _key(self, url: str) -> str:
+        """正規化URLのSHA-256をキーにする"""
+        return hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+
+
+class FeedWatermarks:
+    """フィードごとの既読位置（最後に見たGUIDと公開日時）を永続化"""
+    
+    def __init__(self, store: CacheStore = None):
+        """
+        初期化
+        
+        Args:
+            store: 保存先のストア（Noneの場合はデフォルトのSQLiteファイル）
+        """
+        self.store = store or CacheStore(table="feed_watermarks")
+    
+    def get(self, feed_url: str) -> Optional[Dict]:
+        """
+        フィードのウォーターマークを取得
+        
+        Args:
+            feed_url: フィードのURL
+        
+        Returns:
+            {"published", "guids", "etag", "last_modified"} またはNone（未取得のフィード）
+        """
+        cached = self.store.get(feed_url)
+        if cached is None:
+            return None
+        
+        value, meta = cached
+        mark = json.loads(value.decode('utf-8'))
+        return {
+            'published': datetime.fromisoformat(mark['published']) if mark.get('published') else None,
+            'guids': mark.get('guids', []),  # 新しい順
+            'etag': meta.get('etag'),
+            'last_modified': meta.get('last_modified')
+        }
+    
+    def conditional_headers(self, mark: Optional[Dict]) -> Dict[str, str]:
+        """
+        条件付きGET用のリクエストヘッダーを作成
+        
+        Args:
+            mark: get() の戻り値
+        
+        Returns:
+            If-None-Match / If-Modified-Since ヘッダー
+        """
+        headers = {}
+        if mark:
+            if mark.get('etag'):
+                headers['If-None-Match'] = mark['etag']
+            if mark.get('last_modified'):
+                headers['If-Modified-Since'] = mark['last_modified']
+        return headers
+    
+    def is_new(self, mark: Optional[Dict], guid: Optional[str], published: Optional[datetime]) -> bool:
+        """
+        エントリがウォーターマークより新しいか判定
+        
+        既読のGUIDは古いとみなす。それ以外は公開日時がウォーターマークより前なら古いとみなし、
+        同時刻または公開日時がない場合は新しいとみなす。
+        
+        Args:
+            mark: get() の戻り値（Noneの場合はすべて新しい）
+            guid: エントリのGUID
+            published: エントリの公開日時
+        
+        Returns:
+            新しいエントリならTrue
+        """
+        if mark is None:
+            return True
+        if guid and guid in mark['guids']:
+            return False
+        if published and mark['published'] and published < mark['published']:
+            return False
+        return True
+    
+    def advance(self, feed_url: str, entries: List[Tuple[Optional[str], Optional[datetime]]],
+                etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """
+        フィードで見たエントリまでウォーターマークを進める
+        
+        Args:
+            feed_url: フィードのURL
+            entries: フィード内のエントリの (GUID, 公開日時) のリスト（フィードの並び順）
+            etag: レスポンスのETag
+            last_modified: レスポンスのLast-Modified
+        """
+        mark = self.get(feed_url)
+        published = mark['published'] if mark else None
+        for _, entry_published in entries:
+            if entry_published and (published is None or entry_published > published):
+                published = entry_published
+        
+        # 今回のフィードのGUIDを優先して保持し、古いものから切り捨てる
+        guids = list(dict.fromkeys(guid for guid, _ in entries if guid))
+        if mark:
+            current = set(guids)
+            guids.extend(guid for guid in mark['guids'] if guid not in current)
+        
+        value = json.dumps({
+            'published': published.isoformat() if published else None,
+            'guids': guids[:WATERMARK_MAX_GUIDS]
+        }, ensure_ascii=False).encode('utf-8')
+        self.store.put(feed_url, value, {
+            'etag': etag,
+            'last_modified': last_modified
+        })
+    
+    def reset(self, feed_url: str):
+        """ウォーターマークを削除（次回はすべてのエントリを新着として扱う）"""
+        self.store.delete(feed_url)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    キャッシュキー用にURLを正規化
+    
+    スキーム・ホストの小文字化、フラグメントとトラッキング用パラメータの除去、
+    クエリパラメータの並べ替えを行う。
+    
+    Args:
+        url: URL
+    
+    Returns:
+        正規化されたURL
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAMS)
+    )
+    return urlunsplit((
+        parts.scheme.lower(),
+        parts.netloc.lower(),
+        parts.path or '/',
+        urlencode(query),
+        ''
+    ))
+
+
+def _encode_articles(articles: List[Dict]) -> bytes:
+    """記事リストをJSONバイト列に変換（datetimeはISO形式）"""
+    serializable = []
+    for article in articles:
+        item = dict(article)
+        if isinstance(item.get('published_at'), datetime):
+            item['published_at'] = item['published_at'].isoformat()
+        serializable.append(item)
+    return json.dumps(serializable, ensure_ascii=False).encode('utf-8')
+
+
+def _decode_articles(value: bytes) -> List[Dict]:
+    """JSONバイト列を記事リストに戻す"""
+    articles = json.loads(value.decode('utf-8'))
+    for article in articles:
+        if article.get('published_at'):
+            article['published_at'] = datetime.fromisoformat(article['published_at'])
+    return articles
+
+
+_feed_cache: Optional[FeedCache] = None
+_feed_cache_lock = threading.Lock()
+
+
+def get_feed_cache() -> Optional[FeedCache]:
+    """
+    プロセス共通のフィードキャッシュを取得
+    
+    Returns:
+        FeedCache（DISABLE_HTTP_CACHE=true、または初期化に失敗した場合はNone）
+    """
+    global _feed_cache
+    if DISABLE_HTTP_CACHE:
+        return None
+    
+    with _feed_cache_lock:
+        if _feed_cache is None:
+            try:
+                _feed_cache = FeedCache()
+            except Exception as e:
+                print(f"⚠️ フィードキャッシュ初期化エラー: {e}")
+                return None
+        return _feed_cache
+
+
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """
+    プロセス共通の記事ページキャッシュを取得
+    
+    Returns:
+        PageCache（DISABLE_HTTP_CACHE=true、または初期化に失敗した場合はNone）
+    """
+    global _page_cache
+    if DISABLE_HTTP_CACHE:
+        return None
+    
+    with _page_cache_lock:
+        if _page_cache is None:
+            try:
+                _page_cache = PageCache()
+            except Exception as e:
+                print(f"⚠️ ページキャッシュ初期化エラー: {e}")
+                return None
+        return _page_cache
+
+
+_feed_watermarks: Optional[FeedWatermarks] = None
+_feed_watermarks_lock = threading.Lock()
+
+
+def get_feed_watermarks() -> Optional[FeedWatermarks]:
+    """
+    プロセス共通のフィードウォーターマークを取得
+    
+    Returns:
+        FeedWatermarks（初期化に失敗した場合はNone）
+    """
+    global _feed_watermarks
+    with _feed_watermarks_lock:
+        if _feed_watermarks is None:
+            try:
+                _feed_watermarks = FeedWatermarks()
+            except Exception as e:
+                print(f"⚠️ フィードウォーターマーク初期化エラー: {e}")
+                return None
+        return _feed_watermarks
@@ -6,8 +6,12 @@
 - ローカル開発: SQLite (weak_signals.db)
 - Render本番: PostgreSQL (DATABASE_URL が自動設定される)
 - postgres:// → postgresql:// の自動変換対応
+
+【記事本文】
+- 本文は article_bodies テーブルに圧縮して保存（models.ArticleBody）
+- init_db() 時に、旧バージョンの articles.content に残っている本文を圧縮して移行
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, func
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 import os
@@ -16,7 +20,7 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
-from models import Base, Article, PostQueue
+from models import Base, Article, ArticleBody, ArticleFingerprint, PostQueue
 
 # データベースURL（環境変数から取得）
 # - ローカル開発: デフォルトで SQLite を使用
@@ -60,6 +64,14 @@ def init_db():
         Base.metadata.create_all(bind=engine)
         logger.info("✅ データベース初期化完了")
         
+        db = SessionLocal()
+        try:
+            migrated = migrate_article_contents(db)
+            if migrated:
+                logger.info(f"📦 記事本文を圧縮して移行しました: {migrated}件")
+        finally:
+            db.close()
+        
         # 接続情報をログ出力（セキュリティのため URL は出力しない）
         db_type = "PostgreSQL" if "postgresql://" in DATABASE_URL else "SQLite"
         logger.info(f"📊 データベースタイプ: {db_type}")
@@ -91,11 +103,77 @@ def create_article(db: Session, url: str, title: str, content: str = None, publi
     return article
 
 
+def migrate_article_contents(db: Session, batch_size: int = 100) -> int:
+    """
+    旧バージョンで articles.content に保存された本文を article_bodies に圧縮して移行
+    
+    Args:
+        db: データベースセッション
+        batch_size: 1回のコミットで移行する件数
+    
+    Returns:
+        移行した記事数
+    """
+    migrated = 0
+    while True:
+        articles = db.query(Article).filter(
+            Article.legacy_content.isnot(None)
+        ).limit(batch_size).all()
+        if not articles:
+            return migrated
+        for article in articles:
+            # 本文を設定し直すと圧縮して保存され、articles.content は空になる
+            article.content = article.legacy_content
+        db.commit()
+        migrated += len(articles)
+
+
+def get_article_body_stats(db: Session) -> dict:
+    """
+    記事本文の保存サイズを取得
+    
+    Args:
+        db: データベースセッション
+    
+    Returns:
+        {"articles", "raw_bytes", "stored_bytes", "ratio"}（ratioは圧縮前÷圧縮後）
+    """
+    count, raw_bytes, stored_bytes = db.query(
+        func.count(ArticleBody.article_id),
+        func.coalesce(func.sum(ArticleBody.raw_size), 0),
+        func.coalesce(func.sum(func.length(ArticleBody.data)), 0)
+    ).one()
+    return {
+        'articles': count,
+        'raw_bytes': raw_bytes,
+        'stored_bytes': stored_bytes,
+        'ratio': raw_bytes / stored_bytes if stored_bytes else 0.0
+    }
+
+
 def get_article_by_url(db: Session, url: str):
     """URLで記事を取得"""
     return db.query(Article).filter(Article.url == url).first()
 
 
+def add_article_fingerprint(db: Session, url: str, simhash: int, article_id: int = None):
+    """記事のSimHashを保存（同じURLが登録済みの場合は何もしない）"""
+    if db.query(ArticleFingerprint.id).filter(ArticleFingerprint.url == url).first():
+        return None
+    fingerprint = ArticleFingerprint(url=url, simhash=simhash, article_id=article_id)
+    db.add(fingerprint)
+    db.commit()
+    return fingerprint
+
+
+def get_article_fingerprints(db: Session, since: datetime = None):
+    """保存済みの (URL, SimHash, 登録日時) を取得（sinceを指定した場合はそれ以降に登録したもののみ）"""
+    query = db.query(ArticleFingerprint.url, ArticleFingerprint.simhash, ArticleFingerprint.created_at)
+    if since is not None:
+        query = query.filter(ArticleFingerprint.created_at >= since)
+    return query.all()
+
+
 def update_article_analysis(db: Session, article_id: int, analysis_result: dict):
     """記事の分析結果を更新"""
     article = db.query(Article).filter(Article.id == article_id).first()
@@ -142,12 +220,12 @@ def get_recently_posted_urls(db: Session, hours: int = 3):
     from datetime import timedelta
     cutoff_time = datetime.utcnow() - timedelta(hours=hours)
     
-    recent_articles = db.query(Article).filter(
+    recent_urls = db.query(Article.url).filter(
         Article.is_posted == True,
         Article.posted_at >= cutoff_time
     ).all()
     
-    return {article.url for article in recent_articles}
+    return {url for url, in recent_urls}
 
 
 def get_latest_posted_article(db: Session):
@@ -207,13 +285,13 @@ def get_posting_history_summary(db: Session, hours: int = 48) -> dict:
     
     cutoff_time = datetime.utcnow() - timedelta(hours=hours)
     
-    articles = db.query(Article).filter(
+    articles = db.query(Article.url, Article.posted_at).filter(
         Article.is_posted == True,
         Article.posted_at >= cutoff_time
     ).order_by(desc(Article.posted_at)).all()
     
     return {
         'total': len(articles),
-        'urls': [a.url for a in articles],
+        'urls': [url for url, _ in articles],
         'latest': articles[0].posted_at if articles else None
     }
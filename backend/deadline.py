@@ -0,0 +1,124 @@
+"""
+実行全体の期限（デッドライン）管理
+
+ボットの1回の実行に壁時計時間の上限を設け、記事取得・Gemini・URL短縮・投稿の各段階に
+残り時間を配分する。各段階は自分の持ち時間をタイムアウトに使い、時間が足りない場合は
+処理を省略して縮退する（本文取得を省いてRSSの概要で要約する、など）。
+
+【設定】
+- BOT_RUN_DEADLINE_SECONDS: 1回の実行の上限（秒、デフォルト: 300、0の場合は無制限）
+- BOT_POST_RESERVE_SECONDS: 投稿のために最後に残しておく時間（秒、デフォルト: 60）
+"""
+import os
+import time
+from typing import Optional
+
+BOT_RUN_DEADLINE_SECONDS = float(os.getenv("BOT_RUN_DEADLINE_SECONDS", "300"))
+BOT_POST_RESERVE_SECONDS = float(os.getenv("BOT_POST_RESERVE_SECONDS", "60"))
+
+# 残り時間がこれ未満の呼び出しは行わずに縮退する（秒）
+MIN_CALL_SECONDS = 2.0
+
+
+class Deadline:
+    """残り時間を段階ごとに配分する期限（無制限も可）"""
+    
+    def __init__(self, seconds: Optional[float] = None, expires_at: Optional[float] = None):
+        """
+        初期化
+        
+        Args:
+            seconds: 現在からの持ち時間（秒、Noneまたは0以下で無制限）
+            expires_at: 期限（time.monotonic() の値、指定した場合はsecondsより優先）
+        """
+        if expires_at is None and seconds is not None and seconds > 0:
+            expires_at = time.monotonic() + seconds
+        self.expires_at = expires_at
+    
+    @classmethod
+    def for_run(cls) -> 'Deadline':
+        """
+        BOT_RUN_DEADLINE_SECONDS の期限を作成
+        
+        Returns:
+            Deadline（0以下の場合は無制限）
+        """
+        return cls(BOT_RUN_DEADLINE_SECONDS)
+    
+    @property
+    def bounded(self) -> bool:
+        """期限があるか"""
+        return self.expires_at is not None
+    
+    def remaining(self) -> float:
+        """
+        残り時間
+        
+        Returns:
+            残り秒数（期限切れは0、無制限は無限大）
+        """
+        if self.expires_at is None:
+            return float('inf')
+        return max(0.0, self.expires_at - time.monotonic())
+    
+    def expired(self, margin: float = 0.0) -> bool:
+        """
+        期限切れか
+        
+        Args:
+            margin: 残り時間がこの秒数以下でも期限切れとみなす
+        
+        Returns:
+            期限切れの場合True
+        """
+        return self.remaining() <= margin
+    
+    def timeout(self, default: float, share: float = 1.0) -> float:
+        """
+        1回の呼び出しに使うタイムアウト
+        
+        Args:
+            default: 期限に余裕がある場合のタイムアウト（秒）
+            share: 残り時間のうちこの呼び出しに割り当てる割合
+        
+        Returns:
+            min(default, 残り時間 × share)
+        """
+        return min(default, self.remaining() * share)
+    
+    def stage(self, share: float = 1.0, reserve: float = 0.0) -> 'Deadline':
+        """
+        段階ごとの期限を作成
+        
+        Args:
+            share: 残り時間（reserveを除く）のうちこの段階に割り当てる割合
+            reserve: 後の段階のために残しておく秒数
+        
+        Returns:
+            この段階の期限（元の期限より後にはならない）
+        """
+        if self.expires_at is None:
+            return Deadline()
+        budget = max(0.0, self.remaining() - reserve) * share
+        return Deadline(expires_at=time.monotonic() + budget)
+    
+    def sleep(self, seconds: float, minimum: float = 0.0) -> float:
+        """
+        残り時間を超えない範囲で待機
+        
+        Args:
+            seconds: 待機したい秒数
+            minimum: 期限が迫っていても最低限待機する秒数
+        
+        Returns:
+            待機した秒数
+        """
+        wait = max(minimum, min(seconds, self.remaining()))
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+    
+    def __repr__(self) -> str:
+        if self.expires_at is None:
+            return "Deadline(unbounded)"
+        return f"Deadline(remaining={self.remaining():.1f}s)"
@@ -0,0 +1,197 @@
+"""
+RSS/Atomフィードの高速パーサー
+
+WIREDなどの一般的なRSS 2.0 / Atomフィードを lxml の iterparse で逐次解析し、
+fetch_from_rss が使う項目（link, title, content / summary, 公開日時, GUID）だけを取り出す。
+必要な件数を読んだ時点で解析を打ち切る。
+想定外の形式（RSS 1.0、XHTMLコンテンツ、解析できない日付、XMLエラーなど）は feedparser で解析する。
+
+【設定】
+- FEED_PARSER: fast / feedparser（デフォルト: fast、lxmlが使えない場合はfeedparser）
+"""
+import os
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from typing import List, Optional
+
+import feedparser
+
+# lxml（オプション、インポートできない場合は常にfeedparserを使用）
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+FEED_PARSER = os.getenv("FEED_PARSER", "fast").lower()
+
+ATOM_NS = '{http://www.w3.org/2005/Atom}'
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+DC_DATE = '{http://purl.org/dc/elements/1.1/}date'
+
+
+class FeedEntry(dict):
+    """feedparserの結果と同じ属性名でアクセスできる辞書"""
+    
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+class UnsupportedFeed(Exception):
+    """高速パーサーで扱わない形式（feedparserで解析する）"""
+
+
+def parse_feed(data: bytes, max_items: Optional[int] = None, parser: str = None) -> FeedEntry:
+    """
+    フィードを解析
+    
+    Args:
+        data: フィードのバイト列
+        max_items: 解析する最大エントリ数（高速パーサーはこの件数で打ち切る）
+        parser: "fast" または "feedparser"（Noneの場合はFEED_PARSER）
+    
+    Returns:
+        feedparser.parse と同じく entries / bozo / bozo_exception を持つ結果
+        （"parser" に使用したパーサー名）
+    """
+    if (parser or FEED_PARSER) == "fast" and etree is not None:
+        try:
+            entries = _parse_fast(data, max_items)
+            return FeedEntry(entries=entries, bozo=False, bozo_exception=None, parser="fast")
+        except (UnsupportedFeed, etree.XMLSyntaxError, ValueError):
+            pass
+    
+    feed = feedparser.parse(data)
+    feed['parser'] = "feedparser"
+    return feed
+
+
+def _parse_fast(data: bytes, max_items: Optional[int]) -> List[FeedEntry]:
+    """iterparseでRSS 2.0 / Atomのエントリを逐次解析"""
+    context = etree.iterparse(
+        BytesIO(data), events=('start', 'end'),
+        resolve_entities=False, no_network=True, remove_comments=True
+    )
+    entries = []
+    entry_tag = None
+    parse_entry = None
+    
+    for event, element in context:
+        if entry_tag is None:
+            # ルート要素で形式を判定
+            if element.tag == 'rss' and (element.get('version') or '').startswith(('2.', '0.9')):
+                entry_tag, parse_entry = 'item', _rss_entry
+            elif element.tag == ATOM_NS + 'feed':
+                entry_tag, parse_entry = ATOM_NS + 'entry', _atom_entry
+            else:
+                raise UnsupportedFeed(str(element.tag))
+            continue
+        
+        if event != 'end' or element.tag != entry_tag:
+            continue
+        
+        entries.append(parse_entry(element))
+        # 処理済みのエントリを解放してメモリを一定に保つ
+        element.clear()
+        parent = element.getparent()
+        while element.getprevious() is not None:
+            del parent[0]
+        
+        if max_items and len(entries) >= max_items:
+            break
+    
+    if entry_tag is None:
+        raise UnsupportedFeed("empty document")
+    return entries
+
+
+def _text(element) -> str:
+    """子要素を持たない要素のテキスト（子要素がある場合は想定外としてフォールバック）"""
+    if len(element):
+        raise UnsupportedFeed(f"nested markup in {element.tag}")
+    return element.text or ''
+
+
+def _rss_entry(item) -> FeedEntry:
+    """RSS 2.0の<item>をエントリに変換"""
+    entry = FeedEntry()
+    for child in item:
+        tag = child.tag
+        if tag == 'title':
+            entry['title'] = _text(child).strip()
+        elif tag == 'link':
+            entry['link'] = _text(child).strip()
+        elif tag == 'guid':
+            entry['id'] = _text(child).strip()
+        elif tag == 'description':
+            entry['summary'] = _text(child)
+        elif tag == CONTENT_ENCODED:
+            entry['content'] = [FeedEntry(value=_text(child))]
+        elif tag == 'pubDate':
+            entry['published_parsed'] = _rfc822(_text(child))
+        elif tag == DC_DATE:
+            entry['updated_parsed'] = _iso8601(_text(child))
+    
+    if not entry.get('link') or 'title' not in entry:
+        raise UnsupportedFeed("item without link or title")
+    return entry
+
+
+def _atom_entry(element) -> FeedEntry:
+    """Atomの<entry>をエントリに変換"""
+    entry = FeedEntry()
+    for child in element:
+        tag = child.tag
+        if tag == ATOM_NS + 'title':
+            entry['title'] = _atom_text(child).strip()
+        elif tag == ATOM_NS + 'link':
+            if child.get('rel', 'alternate') == 'alternate' and 'link' not in entry:
+                entry['link'] = (child.get('href') or '').strip()
+        elif tag == ATOM_NS + 'id':
+            entry['id'] = _text(child).strip()
+        elif tag == ATOM_NS + 'content':
+            entry['content'] = [FeedEntry(value=_atom_text(child))]
+        elif tag == ATOM_NS + 'summary':
+            entry['summary'] = _atom_text(child)
+        elif tag == ATOM_NS + 'published':
+            entry['published_parsed'] = _iso8601(_text(child))
+        elif tag == ATOM_NS + 'updated':
+            entry['updated_parsed'] = _iso8601(_text(child))
+    
+    if not entry.get('link') or 'title' not in entry:
+        raise UnsupportedFeed("entry without link or title")
+    return entry
+
+
+def _atom_text(element) -> str:
+    """Atomのテキスト構造（text / html のみ対応、xhtmlはフォールバック）"""
+    if element.get('type') == 'xhtml':
+        raise UnsupportedFeed("xhtml content")
+    return _text(element)
+
+
+def _rfc822(value: str) -> time.struct_time:
+    """RFC 822形式の日付をUTCのstruct_timeに変換（feedparserのpublished_parsedと同じ形式）"""
+    try:
+        parsed = parsedate_to_datetime(value.strip())
+    except (TypeError, ValueError, IndexError):
+        raise UnsupportedFeed(f"unparsable date: {value!r}")
+    return _utc_struct_time(parsed)
+
+
+def _iso8601(value: str) -> time.struct_time:
+    """ISO 8601形式の日付をUTCのstruct_timeに変換"""
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace('Z', '+00:00'))
+    except ValueError:
+        raise UnsupportedFeed(f"unparsable date: {value!r}")
+    return _utc_struct_time(parsed)
+
+
+def _utc_struct_time(value: datetime) -> time.struct_time:
+    """datetimeをUTCのstruct_timeに変換（タイムゾーンなしはUTCとみなす、feedparserと同じく tm_isdst=0）"""
+    return value.utctimetuple()
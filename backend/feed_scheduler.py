@@ -0,0 +1,184 @@
+"""
+フィードごとの適応的なポーリング間隔の管理
+
+【仕組み】
+- フィードのエントリの公開日時から新着記事の到着間隔を求め、指数平滑化で平均到着間隔を推定
+- 次回のポーリングまでの間隔 = 推定した平均到着間隔（最小・最大の範囲に制限）
+- 新着がなかった場合は間隔を FEED_POLL_BACKOFF 倍に延ばす
+  → 更新の多いフィードは頻繁に、少ないフィードはまれにポーリングする
+- 状態はキャッシュ用SQLiteファイル（feed_scheduleテーブル）に保存
+
+【設定】
+- FEED_POLL_MIN_MINUTES: ポーリング間隔の下限（分、デフォルト: 15）
+- FEED_POLL_MAX_MINUTES: ポーリング間隔の上限（分、デフォルト: 360）
+- FEED_POLL_SMOOTHING: 指数平滑化の係数（0〜1、大きいほど直近の間隔を重視、デフォルト: 0.3）
+- FEED_POLL_BACKOFF: 新着がなかった場合に間隔を延ばす倍率（デフォルト: 1.5）
+"""
+import os
+import json
+import time
+import calendar
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from cache_store import CacheStore
+
+FEED_POLL_MIN_MINUTES = float(os.getenv("FEED_POLL_MIN_MINUTES", "15"))
+FEED_POLL_MAX_MINUTES = float(os.getenv("FEED_POLL_MAX_MINUTES", "360"))
+FEED_POLL_SMOOTHING = float(os.getenv("FEED_POLL_SMOOTHING", "0.3"))
+FEED_POLL_BACKOFF = float(os.getenv("FEED_POLL_BACKOFF", "1.5"))
+
+
+class FeedPollScheduler:
+    """フィードごとのポーリング間隔を更新頻度から推定するスケジューラー"""
+    
+    def __init__(self, store: CacheStore = None, min_minutes: float = None, max_minutes: float = None,
+                 smoothing: float = None, backoff: float = None):
+        """
+        初期化
+        
+        Args:
+            store: 状態の保存先（Noneの場合はデフォルトのSQLiteファイル）
+            min_minutes: ポーリング間隔の下限（分、Noneの場合はFEED_POLL_MIN_MINUTES）
+            max_minutes: ポーリング間隔の上限（分、Noneの場合はFEED_POLL_MAX_MINUTES）
+            smoothing: 指数平滑化の係数（Noneの場合はFEED_POLL_SMOOTHING）
+            backoff: 新着がなかった場合の倍率（Noneの場合はFEED_POLL_BACKOFF）
+        """
+        self.store = store or CacheStore(table="feed_schedule")
+        self.min_interval = (min_minutes if min_minutes is not None else FEED_POLL_MIN_MINUTES) * 60
+        self.max_interval = (max_minutes if max_minutes is not None else FEED_POLL_MAX_MINUTES) * 60
+        self.smoothing = smoothing if smoothing is not None else FEED_POLL_SMOOTHING
+        self.backoff = backoff if backoff is not None else FEED_POLL_BACKOFF
+    
+    def get_state(self, feed_url: str) -> Optional[Dict]:
+        """
+        フィードの状態を取得
+        
+        Args:
+            feed_url: フィードのURL
+        
+        Returns:
+            {"mean_gap", "interval", "newest", "last_polled_at", "next_poll_at"}（秒・UNIX時刻）
+            またはNone（未取得のフィード）
+        """
+        cached = self.store.get(feed_url)
+        if cached is None:
+            return None
+        return json.loads(cached[0].decode('utf-8'))
+    
+    def record_poll(self, feed_url: str, published: List[Optional[datetime]],
+                    now: float = None) -> float:
+        """
+        ポーリング結果を記録して次回までの間隔を更新
+        
+        前回までに見た最新の公開日時より新しいエントリを新着とみなし、その到着間隔で
+        平均到着間隔を更新する。初回はフィード内のエントリの間隔から推定する。
+        
+        Args:
+            feed_url: フィードのURL
+            published: 取得したエントリの公開日時（UTC、Noneは無視）
+            now: 現在時刻（UNIX時刻、Noneの場合は現在）
+        
+        Returns:
+            次回のポーリングまでの間隔（秒）
+        """
+        now = time.time() if now is None else now
+        state = self.get_state(feed_url)
+        times = sorted(min(_to_timestamp(p), now) for p in published if p)
+        
+        if state is None:
+            state = {'mean_gap': None, 'interval': self.min_interval, 'newest': None}
+        
+        newest = state['newest']
+        arrivals = [t for t in times if newest is None or t > newest]
+        mean_gap = state['mean_gap']
+        
+        previous = newest
+        for arrived in arrivals:
+            if previous is not None:
+                gap = arrived - previous
+                mean_gap = gap if mean_gap is None else (
+                    self.smoothing * gap + (1 - self.smoothing) * mean_gap
+                )
+            previous = arrived
+        
+        if not arrivals:
+            # 新着なし: 間隔を延ばす
+            interval = state['interval'] * self.backoff
+        elif mean_gap is not None:
+            interval = mean_gap
+        else:
+            interval = state['interval']
+        
+        interval = max(self.min_interval, min(self.max_interval, interval))
+        state.update({
+            'mean_gap': mean_gap,
+            'interval': interval,
+            'newest': previous,
+            'last_polled_at': now,
+            'next_poll_at': now + interval
+        })
+        self.store.put(feed_url, json.dumps(state).encode('utf-8'))
+        
+        print(f"🗓️ 次回ポーリング: {interval / 60:.0f}分後 (新着{len(arrivals)}件, {feed_url})")
+        return interval
+    
+    def overdue_ratio(self, feed_url: str, now: float = None) -> float:
+        """
+        前回のポーリングからの経過時間と推定間隔の比（1以上ならポーリング時期）
+        
+        Args:
+            feed_url: フィードのURL
+            now: 現在時刻（UNIX時刻、Noneの場合は現在）
+        
+        Returns:
+            経過時間 / ポーリング間隔（未取得のフィードは無限大）
+        """
+        state = self.get_state(feed_url)
+        if state is None or not state.get('last_polled_at'):
+            return float('inf')
+        now = time.time() if now is None else now
+        return (now - state['last_polled_at']) / state['interval']
+    
+    def due_feeds(self, feeds: List[Dict], now: float = None) -> List[Dict]:
+        """
+        ポーリング時期になったフィードを返す
+        
+        Args:
+            feeds: "url" を含むフィード設定のリスト
+            now: 現在時刻（UNIX時刻、Noneの場合は現在）
+        
+        Returns:
+            ポーリング時期のフィード設定のリスト（入力順）
+        """
+        return [feed for feed in feeds if self.overdue_ratio(feed['url'], now) >= 1.0]
+
+
+def _to_timestamp(value: datetime) -> float:
+    """公開日時（タイムゾーンなしはUTCとみなす）をUNIX時刻に変換"""
+    if value.tzinfo is not None:
+        return value.timestamp()
+    return float(calendar.timegm(value.timetuple()))
+
+
+_poll_scheduler: Optional[FeedPollScheduler] = None
+_poll_scheduler_lock = threading.Lock()
+
+
+def get_feed_poll_scheduler() -> Optional[FeedPollScheduler]:
+    """
+    プロセス共通のポーリングスケジューラーを取得
+    
+    Returns:
+        FeedPollScheduler（初期化に失敗した場合はNone）
+    """
+    global _poll_scheduler
+    with _poll_scheduler_lock:
+        if _poll_scheduler is None:
+            try:
+                _poll_scheduler = FeedPollScheduler()
+            except Exception as e:
+                print(f"⚠️ ポーリングスケジューラー初期化エラー: {e}")
+                return None
+        return _poll_scheduler
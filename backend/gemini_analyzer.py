@@ -1,30 +1,137 @@
 """
 Gemini APIを使用した記事分析
+
+同じプロンプトへの応答は gemini_cache のキャッシュから返す（再実行でクォータを消費しない）。
+
+【非同期API】
+- 各メソッドの *_async 版は generate_content_async を使用（同期版は run_sync で待つだけの薄いラッパー）
+- generate_future_signals / analyze_articles_batch は複数の呼び出しを並列に実行（gemini_async.gather_bounded）
+
+【まとめて分析】
+- analyze_articles_batch: 複数の記事を1回のリクエスト（JSON出力）で分析
+  推定トークン数と件数の上限で自動的に分割し、結果が返らなかった記事は1件ずつ分析し直す
+
+【プロンプト】
+- 本文は文字数ではなく、入力トークン数の予算（prompt_budget、GEMINI_PROMPT_TOKENS_ANALYSIS）に合わせて文の区切りで切り詰める
+
+【構造化出力】
+- JSONを返す呼び出しは response_schema を指定し、型付きの結果オブジェクトに変換する（gemini_schema）
+  解析できない応答は1回だけ修復を試み、それでも解析できない場合はキャッシュから削除してエラーとする
+
+【SDKの読み込み】
+- google.generativeai のimportと genai.configure は最初にモデルを使うときに行う（gemini_client）
+  モジュールのimportや GeminiAnalyzer() の作成だけではSDKを読み込まない（起動時間の短縮）
+
+【設定】
+- GEMINI_API_KEY: Gemini APIキー（必須、未設定の場合は GeminiAnalyzer() でValueError）
+- GEMINI_BATCH_MAX_ARTICLES: 1回のリクエストで分析する最大記事数（デフォルト: 10）
+- GEMINI_BATCH_MAX_TOKENS: 1回のリクエストに含める記事の推定トークン数の上限（デフォルト: 24000）
 """
 import os
 import json
-import re
-import google.generativeai as genai
-from typing import Dict, Optional
-
-# Gemini API設定（環境変数から取得）
-GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError(
-        "GEMINI_API_KEY環境変数が設定されていません。"
-        "Render の Environment Variables で設定してください。"
-    )
+from typing import Dict, List, Optional
+from gemini_cache import generate_cached_async, discard_cached
+from gemini_async import run_sync, gather_bounded
+from gemini_quota import estimate_tokens
+from prompt_budget import fit_prompt_async, prompt_tokens, trim_to_tokens
+from gemini_client import require_api_key, get_model
+from gemini_schema import (
+    StructuredOutput, StructuredOutputError, ANALYSIS, ANALYSIS_BATCH, FUTURE_SIGNAL
+)
 
-genai.configure(api_key=GEMINI_API_KEY)
+GEMINI_BATCH_MAX_ARTICLES = int(os.getenv("GEMINI_BATCH_MAX_ARTICLES", "10"))
+GEMINI_BATCH_MAX_TOKENS = int(os.getenv("GEMINI_BATCH_MAX_TOKENS", "24000"))
 
 
 class GeminiAnalyzer:
     """Gemini APIを使用した記事分析クラス"""
     
     def __init__(self, model_name: str = "gemini-2.5-flash"):
-        self.model = genai.GenerativeModel(model_name)
+        require_api_key()  # APIキーがない場合はここでValueError（SDKは最初に使うときに読み込む）
+        self.model_name = model_name
+    
+    @property
+    def model(self):
+        """GenerativeModel（プロセス共通、初回に使うときにSDKを読み込んで設定）"""
+        return get_model(self.model_name)
+    
+    def generate_text(self, prompt: str, kind: str, generation_config=None,
+                      request_options: Dict = None) -> str:
+        """
+        応答テキストを生成（同じプロンプトへの応答はキャッシュから返す）
+        
+        Args:
+            prompt: プロンプト
+            kind: 呼び出しの種類（analysis / tweet / future_signal / summary / top5、有効期限に使用）
+            generation_config: 生成設定
+            request_options: リクエストオプション（timeoutなど）
+        
+        Returns:
+            応答テキスト
+        """
+        return run_sync(self.generate_text_async(prompt, kind, generation_config, request_options))
+    
+    async def generate_text_async(self, prompt: str, kind: str, generation_config=None,
+                                  request_options: Dict = None) -> str:
+        """
+        generate_text の非同期版
+        
+        Args:
+            prompt: プロンプト
+            kind: 呼び出しの種類
+            generation_config: 生成設定
+            request_options: リクエストオプション（timeoutなど）
+        
+        Returns:
+            応答テキスト
+        """
+        return await generate_cached_async(self.model, prompt, kind, generation_config, request_options)
+    
+    def generate_structured(self, prompt: str, output: StructuredOutput, request_options: Dict = None):
+        """generate_structured_async の同期版（response_schema を指定して生成し、結果オブジェクトに変換）"""
+        return run_sync(self.generate_structured_async(prompt, output, request_options))
+    
+    async def generate_structured_async(self, prompt: str, output: StructuredOutput,
+                                        request_options: Dict = None):
+        """
+        response_schema を指定して生成し、結果オブジェクトに変換
+        
+        Args:
+            prompt: プロンプト
+            output: 構造化出力の種類（gemini_schema.ANALYSIS / TOP5 / DETAILED_SUMMARY / FUTURE_SIGNAL など）
+            request_options: リクエストオプション（timeoutなど）
+        
+        Returns:
+            結果オブジェクト（種類ごとの型）
+        
+        Raises:
+            StructuredOutputError: 修復しても解析できない場合（応答はキャッシュから削除）
+        """
+        generation_config = output.config()
+        response_text = await self.generate_text_async(prompt, output.cache_kind, generation_config, request_options)
+        try:
+            return output.parse(response_text)
+        except StructuredOutputError as e:
+            print(f"⚠️ 構造化出力の解析エラー ({output.name}): {e}")
+            print(f"レスポンス: {response_text[:200]}")
+            self.forget_response(prompt, generation_config)
+            raise
+    
+    def forget_response(self, prompt: str, generation_config=None):
+        """
+        キャッシュ済みの応答を削除（解析できなかった応答を再利用しないようにする）
+        
+        Args:
+            prompt: プロンプト
+            generation_config: 生成設定
+        """
+        discard_cached(self.model, prompt, generation_config)
     
     def analyze_article(self, title: str, content: str, url: str = None) -> Dict:
+        """analyze_article_async の同期版（記事を分析してテーマ、要約、主要ポイントを抽出）"""
+        return run_sync(self.analyze_article_async(title, content, url))
+    
+    async def analyze_article_async(self, title: str, content: str, url: str = None) -> Dict:
         """
         記事を分析してテーマ、要約、主要ポイントを抽出
         
@@ -36,69 +143,131 @@ class GeminiAnalyzer:
         Returns:
             分析結果の辞書
         """
+        prompt = await fit_prompt_async(
+            lambda fields: _analysis_prompt(title, fields['content']),
+            {'content': content or ''}, prompt_tokens('analysis'), self.model
+        )
+        
+        try:
+            analysis = await self.generate_structured_async(prompt, ANALYSIS)
+            return analysis.to_record()
+            
+        except Exception as e:
+            print(f"⚠️ 分析エラー: {e}")
+            return _error_analysis()
+    
+    def analyze_articles_batch(self, articles: List[Dict]) -> List[Dict]:
+        """analyze_articles_batch_async の同期版（複数の記事をまとめて分析）"""
+        return run_sync(self.analyze_articles_batch_async(articles))
+    
+    async def analyze_articles_batch_async(self, articles: List[Dict]) -> List[Dict]:
+        """
+        複数の記事をまとめて分析（analyze_article と同じ形式の結果を返す）
+        
+        推定トークン数（GEMINI_BATCH_MAX_TOKENS）と件数（GEMINI_BATCH_MAX_ARTICLES）の上限で
+        リクエストを分割する。結果が返らなかった記事・リクエストが失敗した記事は1件ずつ分析し直す。
+        
+        Args:
+            articles: {"title", "content", "url"} の辞書のリスト
+        
+        Returns:
+            分析結果の辞書のリスト（入力と同じ順序）
+        """
+        results: List[Optional[Dict]] = [None] * len(articles)
+        batches = [batch for batch in self._split_batches(articles) if len(batch) > 1]
+        for batch in batches:
+            print(f"🔍 {len(batch)}件の記事をまとめて分析中...")
+        for answered in await gather_bounded(
+            self._analyze_batch_async(articles, batch) for batch in batches
+        ):
+            for index, result in (answered if isinstance(answered, dict) else {}).items():
+                results[index] = result
+        
+        # まとめて分析できなかった記事（1件だけのリクエストを含む）は1件ずつ分析
+        missing = [index for index, result in enumerate(results) if result is None]
+        if missing and len(articles) > 1:
+            print(f"🔁 {len(missing)}件の記事を1件ずつ分析します")
+        retried = await gather_bounded(
+            self.analyze_article_async(
+                articles[index].get('title', ''), articles[index].get('content') or '', articles[index].get('url')
+            )
+            for index in missing
+        )
+        for index, result in zip(missing, retried):
+            results[index] = result if isinstance(result, dict) else _error_analysis()
+        return results
+    
+    def _split_batches(self, articles: List[Dict]) -> List[List[int]]:
+        """記事のインデックスを推定トークン数・件数の上限で分割"""
+        batches = []
+        batch: List[int] = []
+        batch_tokens = 0
+        for index, article in enumerate(articles):
+            tokens = estimate_tokens(article.get('title', '')) + min(
+                estimate_tokens(article.get('content') or ''), _analysis_content_tokens(article)
+            )
+            if batch and (len(batch) >= GEMINI_BATCH_MAX_ARTICLES
+                          or batch_tokens + tokens > GEMINI_BATCH_MAX_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(index)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    async def _analyze_batch_async(self, articles: List[Dict], batch: List[int]) -> Dict[int, Dict]:
+        """
+        1回のリクエストで複数の記事を分析
+        
+        Returns:
+            {記事のインデックス: 分析結果}（結果が返らなかった記事は含まない）
+        """
+        articles_text = ""
+        for number, index in enumerate(batch, 1):
+            article = articles[index]
+            content = trim_to_tokens(article.get('content') or '', _analysis_content_tokens(article))
+            articles_text += f"[記事{number}]\nタイトル: {article.get('title', '')}\n本文:\n{content}\n\n"
+        
         prompt = f"""
-以下の記事を分析してください。
-
-タイトル: {title}
+以下の{len(batch)}件の記事をそれぞれ分析してください。
 
-本文:
-{content[:5000]}  # 長い記事の場合は最初の5000文字
-
-以下の形式でJSONで回答してください：
-{{
-    "theme": "記事の主要テーマ（1-2語）",
-    "summary": "記事の要約（100-150文字）",
-    "key_points": ["主要ポイント1", "主要ポイント2", "主要ポイント3"],
-    "sentiment_score": 0.0-1.0の数値（0.5が中立、1.0が最もポジティブ）,
-    "relevance_score": 0.0-1.0の数値（1.0が最も関連性が高い）,
-    "should_post": true/false（Xに投稿すべきかどうか）
-}}
+{articles_text}
+以下の形式のJSON配列で、記事ごとに1つずつ回答してください：
+[
+    {{
+        "index": 記事番号（1-{len(batch)}）,
+        "theme": "記事の主要テーマ（1-2語）",
+        "summary": "記事の要約（100-150文字）",
+        "key_points": ["主要ポイント1", "主要ポイント2", "主要ポイント3"],
+        "sentiment_score": 0.0-1.0の数値（0.5が中立、1.0が最もポジティブ）,
+        "relevance_score": 0.0-1.0の数値（1.0が最も関連性が高い）,
+        "should_post": true/false（Xに投稿すべきかどうか）
+    }},
+    ...
+]
 
 回答はJSON形式のみで、余計な説明は不要です。
 """
-        
         try:
-            response = self.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # JSONを抽出（```json```で囲まれている場合がある）
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
-            
-            # キーポイントをJSON文字列に変換
-            if isinstance(result.get("key_points"), list):
-                result["key_points"] = json.dumps(result["key_points"], ensure_ascii=False)
-            
-            return result
-            
-        except json.JSONDecodeError as e:
-            print(f"⚠️ JSON解析エラー: {e}")
-            print(f"レスポンス: {response_text}")
-            # フォールバック
-            return {
-                "theme": "未分類",
-                "summary": content[:150] if content else "要約生成失敗",
-                "key_points": json.dumps(["分析エラー"], ensure_ascii=False),
-                "sentiment_score": 0.5,
-                "relevance_score": 0.5,
-                "should_post": False
-            }
+            analyses = await self.generate_structured_async(prompt, ANALYSIS_BATCH)
         except Exception as e:
-            print(f"⚠️ 分析エラー: {e}")
-            return {
-                "theme": "エラー",
-                "summary": "分析に失敗しました",
-                "key_points": json.dumps([], ensure_ascii=False),
-                "sentiment_score": 0.0,
-                "relevance_score": 0.0,
-                "should_post": False
-            }
+            print(f"⚠️ まとめての分析エラー（1件ずつ分析します）: {e}")
+            return {}
+        
+        results = {}
+        for analysis in analyses:
+            if 1 <= analysis.index <= len(batch):
+                results[batch[analysis.index - 1]] = analysis.to_record()
+        if len(results) < len(batch):
+            print(f"⚠️ {len(batch) - len(results)}件の分析結果が返りませんでした")
+        return results
     
     def generate_tweet_text(self, title: str, summary: str, theme: str, url: str = None) -> str:
+        """generate_tweet_text_async の同期版（ソーシャルメディア投稿用のテキストを生成）"""
+        return run_sync(self.generate_tweet_text_async(title, summary, theme, url))
+    
+    async def generate_tweet_text_async(self, title: str, summary: str, theme: str, url: str = None) -> str:
         """
         ソーシャルメディア投稿用のテキストを生成
         
@@ -130,8 +299,7 @@ URL: {url or "なし"}
 """
         
         try:
-            response = self.model.generate_content(prompt)
-            tweet_text = response.text.strip()
+            tweet_text = (await self.generate_text_async(prompt, 'tweet')).strip()
             
             # URLが含まれていない場合、追加（未来の兆しの前）
             if url and url not in tweet_text:
@@ -193,7 +361,27 @@ URL: {url or "なし"}
                     fallback = fallback[:277] + "..."
             return fallback
     
+    def generate_future_signals(self, themes: List[str]) -> List:
+        """generate_future_signals_async の同期版（複数のテーマの「未来の兆し」を並列に生成）"""
+        return run_sync(self.generate_future_signals_async(themes))
+    
+    async def generate_future_signals_async(self, themes: List[str]) -> List:
+        """
+        複数のテーマの「未来の兆し」を並列に生成（同時実行数はGEMINI_MAX_CONCURRENCY）
+        
+        Args:
+            themes: テーマのリスト
+        
+        Returns:
+            テーマごとの結果のリスト（入力と同じ順序、生成に失敗したテーマは例外オブジェクト）
+        """
+        return await gather_bounded(self.generate_future_signal_async(theme) for theme in themes)
+    
     def generate_future_signal(self, theme: str) -> Dict[str, str]:
+        """generate_future_signal_async の同期版（テーマに基づいて「未来の兆し」を生成）"""
+        return run_sync(self.generate_future_signal_async(theme))
+    
+    async def generate_future_signal_async(self, theme: str) -> Dict[str, str]:
         """
         テーマに基づいて「未来の兆し」を生成（実際の記事は不要）
         
@@ -221,47 +409,52 @@ URL: {url or "なし"}
 }}"""
         
         try:
-            # JSON出力を強制
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    response_mime_type="application/json"
-                )
-            )
-            
-            # JSONを直接パース
-            response_text = response.text.strip()
-            
-            # ```json```で囲まれている場合の処理
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
-            
-            # 必須フィールドの検証
-            title = result.get("title", "").strip()
-            summary = result.get("summary", "").strip()
-            future_signal = result.get("future_signal", "").strip()
-            
-            # 空の場合は例外を発生
-            if not title or not summary or not future_signal:
-                raise ValueError(f"不完全なJSONレスポンス: title={bool(title)}, summary={bool(summary)}, future_signal={bool(future_signal)}")
-            
-            return {
-                "title": title,
-                "summary": summary,
-                "future_signal": future_signal,
-                "theme": theme
-            }
+            # response_schema で項目を指定して生成（必須の項目が空の場合は StructuredOutputError）
+            signal = await self.generate_structured_async(prompt, FUTURE_SIGNAL)
+            return signal.to_dict(theme)
             
-        except json.JSONDecodeError as e:
-            print(f"⚠️ JSON解析エラー: {e}")
-            print(f"レスポンステキスト: {response_text if 'response_text' in locals() else 'N/A'}")
-            raise ValueError(f"JSON解析に失敗しました: {e}")
         except Exception as e:
             print(f"⚠️ 未来の兆し生成エラー: {e}")
             # エラー時は例外を再発生させて呼び出し側で処理をスキップ
             raise
 
+
+def _analysis_prompt(title: str, content: str) -> str:
+    """1件の記事を分析するプロンプト"""
+    return f"""
+以下の記事を分析してください。
+
+タイトル: {title}
+
+本文:
+{content}
+
+以下の形式でJSONで回答してください：
+{{
+    "theme": "記事の主要テーマ（1-2語）",
+    "summary": "記事の要約（100-150文字）",
+    "key_points": ["主要ポイント1", "主要ポイント2", "主要ポイント3"],
+    "sentiment_score": 0.0-1.0の数値（0.5が中立、1.0が最もポジティブ）,
+    "relevance_score": 0.0-1.0の数値（1.0が最も関連性が高い）,
+    "should_post": true/false（Xに投稿すべきかどうか）
+}}
+
+回答はJSON形式のみで、余計な説明は不要です。
+"""
+
+
+def _analysis_content_tokens(article: Dict) -> int:
+    """記事の本文に使える推定トークン数（まとめて分析する場合も1件ずつ分析する場合と同じだけ使う）"""
+    return prompt_tokens('analysis') - estimate_tokens(_analysis_prompt(article.get('title', ''), ''))
+
+
+def _error_analysis() -> Dict:
+    """分析に失敗した場合の結果"""
+    return {
+        "theme": "エラー",
+        "summary": "分析に失敗しました",
+        "key_points": json.dumps([], ensure_ascii=False),
+        "sentiment_score": 0.0,
+        "relevance_score": 0.0,
+        "should_post": False
+    }
@@ -0,0 +1,96 @@
+"""
+Gemini APIの非同期呼び出し
+
+generate_content_async はプロセス共通のバックグラウンドのイベントループ（専用スレッド）で実行する。
+SDKの非同期クライアント（gRPC）は最初に使ったイベントループに結びつくため、
+同期APIからの呼び出し（run_sync）も、FastAPIなど別のイベントループからの呼び出し（run_async）も
+同じループに集約する。
+
+【並列実行】
+- gather_bounded: 同時実行数を制限して複数の呼び出しを並列に実行
+  （TOP5の要約・テーマごとの未来の兆しなどを、1回の呼び出しとほぼ同じ時間で生成する）
+
+【設定】
+- GEMINI_MAX_CONCURRENCY: 同時に実行するGemini呼び出しの数（デフォルト: 5、TOP5の要約を一度に生成できる数）
+"""
+import os
+import asyncio
+import threading
+from typing import Awaitable, Iterable, List, Optional
+
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "5"))
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[threading.Thread] = None
+_loop_lock = threading.Lock()
+
+
+def get_gemini_loop() -> asyncio.AbstractEventLoop:
+    """
+    Gemini呼び出し用のイベントループを取得（初回に専用スレッドで起動）
+    
+    Returns:
+        実行中のイベントループ
+    """
+    global _loop, _loop_thread
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="gemini-loop", daemon=True)
+            thread.start()
+            _loop, _loop_thread = loop, thread
+        return _loop
+
+
+def run_sync(coro: Awaitable, timeout: Optional[float] = None):
+    """
+    コルーチンをGemini用のイベントループで実行し、結果を待つ（同期APIから呼ぶ）
+    
+    Args:
+        coro: 実行するコルーチン
+        timeout: 待機する最大秒数（Noneの場合は無制限）
+    
+    Returns:
+        コルーチンの戻り値（例外はそのまま送出）
+    """
+    loop = get_gemini_loop()
+    if threading.current_thread() is _loop_thread:
+        coro.close()
+        raise RuntimeError("Gemini用のイベントループ内では run_sync を使えません（await してください）")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout)
+
+
+async def run_async(coro: Awaitable):
+    """
+    コルーチンをGemini用のイベントループで実行（別のイベントループからも await できる）
+    
+    Args:
+        coro: 実行するコルーチン（generate_content_async など）
+    
+    Returns:
+        コルーチンの戻り値
+    """
+    loop = get_gemini_loop()
+    if asyncio.get_running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+async def gather_bounded(coros: Iterable[Awaitable], limit: Optional[int] = None) -> List:
+    """
+    同時実行数を制限して複数のコルーチンを並列に実行
+    
+    Args:
+        coros: 実行するコルーチン
+        limit: 同時実行数（Noneの場合はGEMINI_MAX_CONCURRENCY）
+    
+    Returns:
+        結果のリスト（入力と同じ順序、失敗したものは例外オブジェクト）
+    """
+    semaphore = asyncio.Semaphore(max(1, limit or GEMINI_MAX_CONCURRENCY))
+    
+    async def bounded(coro):
+        async with semaphore:
+            return await coro
+    
+    return await asyncio.gather(*(bounded(coro) for coro in coros), return_exceptions=True)
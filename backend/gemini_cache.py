@@ -0,0 +1,359 @@
+"""
+Gemini応答キャッシュ
+
+同じモデル・生成設定・プロンプトへの応答テキストを再利用し、再実行や /test/wired-bot の
+手動実行、フィードの切り替え後も残っている記事などでAPIの呼び出し（とクォータ）を消費しないようにする。
+
+【構成】
+- 1段目: プロセス内のLRU（最大 GEMINI_CACHE_MEMORY_ENTRIES 件）
+- 2段目: キャッシュ用SQLiteファイル（gemini_cacheテーブル、CacheStoreと同じインターフェースなら差し替え可能）
+- キー: モデル名・生成設定・プロンプトのSHA-256
+- キャッシュにない場合のみクォータ管理（gemini_quota）で空きを確保してからAPIを呼ぶ
+- 有効期限: 呼び出しの種類ごと（analysis / tweet / summary / top5）
+- 入力が同じでも毎回別の応答が欲しい呼び出し（future_signal: 固定のテーマから兆しを生成して投稿する）はキャッシュしない
+
+【設定】
+- GEMINI_CACHE_TTL_HOURS: 種類ごとの指定がない場合の有効期限（時間、デフォルト: 24）
+- GEMINI_CACHE_TTL_<種類>: 種類ごとの有効期限（時間、例: GEMINI_CACHE_TTL_TOP5=6、0の場合はキャッシュしない）
+- GEMINI_CACHE_MEMORY_ENTRIES: メモリ上に保持する件数（デフォルト: 256）
+- GEMINI_CACHE_MAX_ENTRIES: SQLiteファイルに保持する件数（デフォルト: 2000）
+- DISABLE_GEMINI_CACHE: true の場合はキャッシュを使用しない
+"""
+import os
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from cache_store import CacheStore, DISABLE_HTTP_CACHE
+from gemini_async import run_async
+from gemini_quota import get_quota_governor, estimate_tokens, is_rate_limit_error, EXPECTED_OUTPUT_TOKENS
+
+GEMINI_CACHE_TTL_HOURS = float(os.getenv("GEMINI_CACHE_TTL_HOURS", "24"))
+GEMINI_CACHE_MEMORY_ENTRIES = int(os.getenv("GEMINI_CACHE_MEMORY_ENTRIES", "256"))
+GEMINI_CACHE_MAX_ENTRIES = int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "2000"))
+DISABLE_GEMINI_CACHE = os.getenv("DISABLE_GEMINI_CACHE", "").lower() == "true"
+
+# 呼び出しの種類ごとのデフォルトの有効期限（時間）
+DEFAULT_TTL_HOURS = {
+    'analysis': 168,  # 記事の分析結果は記事が変わらない限り同じ
+    'summary': 72,  # 記事の詳細要約
+    'tweet': 24,  # 投稿テキスト
+    'top5': 6,  # 同じ候補からのTOP5選定（再実行・手動実行用）
+}
+
+# キャッシュしない呼び出しの種類（同じテーマから毎回新しい兆しを生成して投稿するため、有効期限の設定に関係なく使わない）
+UNCACHED_KINDS = ('future_signal',)
+
+
+def _ttl_seconds(kind: str) -> float:
+    """呼び出しの種類の有効期限（秒）"""
+    default = DEFAULT_TTL_HOURS.get(kind, GEMINI_CACHE_TTL_HOURS)
+    return float(os.getenv(f"GEMINI_CACHE_TTL_{kind.upper()}", str(default))) * 3600
+
+
+def _cache_for(kind: str) -> Optional["GeminiResponseCache"]:
+    """呼び出しの種類に使うキャッシュ（キャッシュしない種類・有効期限が0の種類はNone）"""
+    if kind in UNCACHED_KINDS or _ttl_seconds(kind) <= 0:
+        return None
+    return get_gemini_cache()
+
+
+def _describe_config(config) -> Optional[Dict]:
+    """生成設定をキーに使える辞書に変換（値がNoneの項目は除く）"""
+    if config is None:
+        return None
+    if not isinstance(config, dict):
+        config = vars(config) if hasattr(config, '__dict__') else {'repr': repr(config)}
+    return {key: value for key, value in config.items() if value is not None}
+
+
+def response_key(model, prompt: str, generation_config=None) -> str:
+    """
+    キャッシュキーを作成
+    
+    Args:
+        model: GenerativeModel（モデル名・モデルの生成設定・システム指示をキーに含める）
+        prompt: プロンプト
+        generation_config: 呼び出しごとの生成設定
+    
+    Returns:
+        SHA-256の16進文字列
+    """
+    parts = {
+        'model': getattr(model, 'model_name', None) or str(model),
+        'model_config': _describe_config(getattr(model, '_generation_config', None)),
+        'system': str(getattr(model, '_system_instruction', None) or ''),
+        'config': _describe_config(generation_config),
+        'prompt': prompt
+    }
+    encoded = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=repr)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+class GeminiResponseCache:
+    """Geminiの応答テキストのキャッシュ（メモリのLRU + SQLite、スレッドセーフ）"""
+    
+    def __init__(self, store: CacheStore = None, memory_entries: int = None):
+        """
+        初期化
+        
+        Args:
+            store: 2段目の保存先（get/putを持つオブジェクト、Noneの場合はデフォルトのSQLiteファイル、
+                   DISABLE_HTTP_CACHE=trueの場合はメモリ上のみ）
+            memory_entries: メモリ上に保持する件数（Noneの場合はGEMINI_CACHE_MEMORY_ENTRIES）
+        """
+        self.store = store or CacheStore(
+            path=":memory:" if DISABLE_HTTP_CACHE else None,
+            table="gemini_cache",
+            max_entries=GEMINI_CACHE_MAX_ENTRIES
+        )
+        self.memory_entries = memory_entries if memory_entries is not None else GEMINI_CACHE_MEMORY_ENTRIES
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key: str, kind: str) -> Optional[str]:
+        """
+        キャッシュ済みの応答を取得
+        
+        Args:
+            key: response_key() のキー
+            kind: 呼び出しの種類（統計用）
+        
+        Returns:
+            応答テキスト（ないか期限切れの場合はNone）
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                if cached[1] > now:
+                    self._memory.move_to_end(key)
+                    self._count(kind, 'memory_hits')
+                    return cached[0]
+                del self._memory[key]
+        
+        stored = self.store.get(key)
+        with self._lock:
+            if stored is None:
+                self._count(kind, 'misses')
+                return None
+            value, meta = stored
+            text = value.decode('utf-8')
+            self._remember(key, text, meta.get('expires_at', now))
+            self._count(kind, 'store_hits')
+            return text
+    
+    def put(self, key: str, kind: str, text: str):
+        """
+        応答を保存（キャッシュしない種類・有効期限が0の種類の場合は保存しない）
+        
+        Args:
+            key: response_key() のキー
+            kind: 呼び出しの種類（有効期限の決定に使用）
+            text: 応答テキスト
+        """
+        ttl = 0 if kind in UNCACHED_KINDS else _ttl_seconds(kind)
+        if ttl <= 0 or not text:
+            return
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._remember(key, text, expires_at)
+        self.store.put(key, text.encode('utf-8'), {'kind': kind, 'expires_at': expires_at}, ttl=ttl)
+    
+    def discard(self, key: str):
+        """
+        応答を削除（JSONとして解析できなかった応答などを再利用しないようにする）
+        
+        Args:
+            key: response_key() のキー
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        self.store.delete(key)
+    
+    def _remember(self, key: str, text: str, expires_at: float):
+        """メモリ上のLRUに追加（ロック取得済みで呼ぶこと）"""
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (text, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+    
+    def _count(self, kind: str, name: str):
+        """種類ごとの件数を加算（ロック取得済みで呼ぶこと）"""
+        counts = self._counts.setdefault(kind, {'memory_hits': 0, 'store_hits': 0, 'misses': 0})
+        counts[name] += 1
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"hits", "memory_hits", "store_hits", "misses", "hit_ratio", "memory_entries", "by_kind"}
+        """
+        with self._lock:
+            by_kind = {}
+            for kind, counts in self._counts.items():
+                hits = counts['memory_hits'] + counts['store_hits']
+                total = hits + counts['misses']
+                by_kind[kind] = dict(counts, hits=hits, hit_ratio=hits / total if total else 0.0)
+            memory_entries = len(self._memory)
+        
+        memory_hits = sum(counts['memory_hits'] for counts in by_kind.values())
+        store_hits = sum(counts['store_hits'] for counts in by_kind.values())
+        misses = sum(counts['misses'] for counts in by_kind.values())
+        total = memory_hits + store_hits + misses
+        return {
+            'hits': memory_hits + store_hits,
+            'memory_hits': memory_hits,
+            'store_hits': store_hits,
+            'misses': misses,
+            'hit_ratio': (memory_hits + store_hits) / total if total else 0.0,
+            'memory_entries': memory_entries,
+            'by_kind': by_kind
+        }
+
+
+_gemini_cache: Optional[GeminiResponseCache] = None
+_gemini_cache_lock = threading.Lock()
+
+
+def get_gemini_cache() -> Optional[GeminiResponseCache]:
+    """
+    プロセス共通のGemini応答キャッシュを取得
+    
+    Returns:
+        GeminiResponseCache（DISABLE_GEMINI_CACHE=true、または初期化に失敗した場合はNone）
+    """
+    global _gemini_cache
+    if DISABLE_GEMINI_CACHE:
+        return None
+    
+    with _gemini_cache_lock:
+        if _gemini_cache is None:
+            try:
+                _gemini_cache = GeminiResponseCache()
+            except Exception as e:
+                print(f"⚠️ Gemini応答キャッシュ初期化エラー: {e}")
+                return None
+        return _gemini_cache
+
+
+def generate_cached(model, prompt: str, kind: str, generation_config=None,
+                    request_options: Dict = None) -> str:
+    """
+    Geminiで応答テキストを生成（同じプロンプトへの応答はキャッシュから返す）
+    
+    Args:
+        model: GenerativeModel
+        prompt: プロンプト
+        kind: 呼び出しの種類（analysis / tweet / future_signal / summary / top5）
+        generation_config: 呼び出しごとの生成設定
+        request_options: generate_content に渡すリクエストオプション（timeoutなど、キーには含めない）
+    
+    Returns:
+        応答テキスト
+    
+    Raises:
+        QuotaExceeded: クォータの空きを待てる時間内に確保できない場合
+    """
+    cache = _cache_for(kind)
+    key = response_key(model, prompt, generation_config) if cache else None
+    if cache:
+        cached = cache.get(key, kind)
+        if cached is not None:
+            return cached
+    
+    governor = get_quota_governor()
+    reserved = estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS
+    governor.acquire(reserved, timeout=_timeout(request_options))
+    try:
+        response = model.generate_content(prompt, **_call_kwargs(generation_config, request_options))
+    except Exception as e:
+        if is_rate_limit_error(e):
+            governor.rate_limited()
+        raise
+    governor.settle(reserved, response)
+    text = response.text
+    
+    if cache:
+        cache.put(key, kind, text)
+    return text
+
+
+async def generate_cached_async(model, prompt: str, kind: str, generation_config=None,
+                                request_options: Dict = None) -> str:
+    """
+    generate_cached の非同期版（generate_content_async をGemini用のイベントループで実行）
+    
+    Args:
+        model: GenerativeModel
+        prompt: プロンプト
+        kind: 呼び出しの種類（analysis / tweet / future_signal / summary / top5）
+        generation_config: 呼び出しごとの生成設定
+        request_options: generate_content_async に渡すリクエストオプション（timeoutなど）
+    
+    Returns:
+        応答テキスト
+    
+    Raises:
+        QuotaExceeded: クォータの空きを待てる時間内に確保できない場合
+    """
+    cache = _cache_for(kind)
+    key = response_key(model, prompt, generation_config) if cache else None
+    if cache:
+        cached = cache.get(key, kind)
+        if cached is not None:
+            return cached
+    
+    governor = get_quota_governor()
+    reserved = estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS
+    await governor.acquire_async(reserved, timeout=_timeout(request_options))
+    try:
+        response = await run_async(
+            model.generate_content_async(prompt, **_call_kwargs(generation_config, request_options))
+        )
+    except Exception as e:
+        if is_rate_limit_error(e):
+            governor.rate_limited()
+        raise
+    governor.settle(reserved, response)
+    text = response.text
+    
+    if cache:
+        cache.put(key, kind, text)
+    return text
+
+
+def _call_kwargs(generation_config, request_options: Optional[Dict]) -> Dict:
+    """generate_content に渡すキーワード引数"""
+    kwargs = {}
+    if generation_config is not None:
+        kwargs['generation_config'] = generation_config
+    if request_options:
+        kwargs['request_options'] = request_options
+    return kwargs
+
+
+def _timeout(request_options: Optional[Dict]) -> Optional[float]:
+    """リクエストオプションのタイムアウト（クォータの空きを待つ最大秒数にも使う）"""
+    return (request_options or {}).get('timeout')
+
+
+def discard_cached(model, prompt: str, generation_config=None):
+    """
+    キャッシュ済みの応答を削除（解析できなかった応答を次回の呼び出しで再利用しないようにする）
+    
+    Args:
+        model: GenerativeModel
+        prompt: プロンプト
+        generation_config: 呼び出しごとの生成設定
+    """
+    cache = get_gemini_cache()
+    if cache:
+        cache.discard(response_key(model, prompt, generation_config))
@@ -0,0 +1,99 @@
+"""
+Gemini SDKの遅延読み込み（プロセス共通のクライアント）
+
+google.generativeai のimportは重く（gRPC・protobufなどを読み込む）、モジュールのimport時に
+genai.configure まで行うと、/healthz に応答できるまでの時間（Renderのコールドスタート）が延びる。
+SDKのimportと設定は最初にモデルを使うときまで遅らせ、モデルはモデル名ごとに1つだけ作って共有する。
+
+【使い方】
+- require_api_key(): APIキーが設定されているかだけを確認（SDKは読み込まない）
+- get_model(model_name): 共有の GenerativeModel を取得（初回にSDKを読み込んで設定）
+- generation_config(**kwargs): GenerationConfig を作成
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+_genai = None
+_configured_key: Optional[str] = None
+_models: Dict[str, object] = {}
+_client_lock = threading.Lock()
+
+
+def require_api_key(api_key: Optional[str] = None) -> str:
+    """
+    Gemini APIキーを取得（SDKは読み込まない）
+    
+    Args:
+        api_key: 明示的に指定するAPIキー（Noneの場合は環境変数 GEMINI_API_KEY）
+    
+    Returns:
+        APIキー
+    
+    Raises:
+        ValueError: APIキーが設定されていない場合
+    """
+    api_key = api_key or os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "GEMINI_API_KEY環境変数が設定されていません。"
+            "Render の Environment Variables で設定してください。"
+        )
+    return api_key
+
+
+def get_genai(api_key: Optional[str] = None):
+    """
+    google.generativeai を読み込み、APIキーを設定して返す（初回、またはAPIキーが変わった場合のみ設定）
+    
+    Args:
+        api_key: 明示的に指定するAPIキー（Noneの場合は環境変数 GEMINI_API_KEY）
+    
+    Returns:
+        google.generativeai モジュール
+    
+    Raises:
+        ValueError: APIキーが設定されていない場合
+    """
+    global _genai, _configured_key
+    api_key = require_api_key(api_key)
+    with _client_lock:
+        if _genai is None:
+            import google.generativeai as genai
+            _genai = genai
+        if api_key != _configured_key:
+            _genai.configure(api_key=api_key)
+            _configured_key = api_key
+            _models.clear()
+        return _genai
+
+
+def get_model(model_name: str):
+    """
+    モデル名ごとに共有の GenerativeModel を取得
+    
+    Args:
+        model_name: モデル名（例: "gemini-2.5-flash"）
+    
+    Returns:
+        GenerativeModel
+    """
+    genai = get_genai()
+    with _client_lock:
+        model = _models.get(model_name)
+        if model is None:
+            model = _models[model_name] = genai.GenerativeModel(model_name)
+        return model
+
+
+def generation_config(**kwargs):
+    """
+    生成設定（GenerationConfig）を作成
+    
+    Args:
+        **kwargs: GenerationConfig の引数（response_mime_type など）
+    
+    Returns:
+        GenerationConfig
+    """
+    return get_genai().types.GenerationConfig(**kwargs)
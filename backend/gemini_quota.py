@@ -0,0 +1,311 @@
+"""
+Gemini APIのクォータ管理（プロセス共通）
+
+429（ResourceExhausted）が返ってから待つのではなく、呼び出し前に1分あたりのリクエスト数（RPM）と
+推定トークン数（TPM）をトークンバケットで管理し、上限に達しそうな場合は待機させるか、
+優先度の低い呼び出し（手動の /fetch/research など）を諦めさせる。
+
+【優先度】
+- high: 定期実行のボットの投稿など（上限まで使える）
+- normal: 通常の分析・生成（上限まで使える）
+- low: 手動実行など（GEMINI_LOW_PRIORITY_RESERVE の割合を high / normal 用に残し、待ち時間も短い）
+
+【トークン数】
+- 呼び出し前はプロンプトの推定トークン数 + EXPECTED_OUTPUT_TOKENS で予約し、
+  応答の usage_metadata で実際のトークン数が分かったら差分を精算する
+
+【設定】
+- GEMINI_RPM: 1分あたりのリクエスト数の上限（デフォルト: 10、0の場合は制限なし）
+- GEMINI_TPM: 1分あたりのトークン数の上限（デフォルト: 250000、0の場合は制限なし）
+- GEMINI_LOW_PRIORITY_RESERVE: 優先度lowの呼び出しが使えない残量の割合（デフォルト: 0.3）
+- GEMINI_QUOTA_MAX_WAIT_SECONDS: high / normal の呼び出しが空きを待つ最大秒数（デフォルト: 60）
+- GEMINI_LOW_PRIORITY_MAX_WAIT_SECONDS: low の呼び出しが空きを待つ最大秒数（デフォルト: 5）
+"""
+import os
+import re
+import time
+import asyncio
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "10"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "250000"))
+GEMINI_LOW_PRIORITY_RESERVE = float(os.getenv("GEMINI_LOW_PRIORITY_RESERVE", "0.3"))
+GEMINI_QUOTA_MAX_WAIT_SECONDS = float(os.getenv("GEMINI_QUOTA_MAX_WAIT_SECONDS", "60"))
+GEMINI_LOW_PRIORITY_MAX_WAIT_SECONDS = float(os.getenv("GEMINI_LOW_PRIORITY_MAX_WAIT_SECONDS", "5"))
+
+PRIORITIES = ('high', 'normal', 'low')
+
+# 応答のトークン数の見込み（実際の値はusage_metadataで精算）
+EXPECTED_OUTPUT_TOKENS = 1000
+
+# 429を受けた場合に全呼び出しを止める秒数
+RATE_LIMITED_COOLDOWN_SECONDS = 10.0
+
+# 日本語・中国語の文字（おおよそ1文字1トークン、それ以外は4文字で1トークンと推定）
+_CJK_CHARS = re.compile(r'[\u3040-\u30FF\u3400-\u9FFF\uFF00-\uFFEF]')
+
+# 呼び出し元が指定した優先度（gemini_priority() で設定、スレッド・タスクごと）
+_current_priority: ContextVar[str] = ContextVar('gemini_priority', default='normal')
+
+
+class QuotaExceeded(Exception):
+    """クォータの空きを待てる時間内に確保できなかった（呼び出しを行わずに諦めた）"""
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    テキストのトークン数を推定（APIを呼ばない簡易推定）
+    
+    Args:
+        text: テキスト
+    
+    Returns:
+        推定トークン数
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_CHARS.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+@contextmanager
+def gemini_priority(priority: str):
+    """
+    このブロック内のGemini呼び出しの優先度を設定
+    
+    Args:
+        priority: "high" / "normal" / "low"
+    """
+    if priority not in PRIORITIES:
+        raise ValueError(f"不明な優先度です: {priority}")
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    """現在の呼び出しの優先度"""
+    return _current_priority.get()
+
+
+class _Bucket:
+    """1分あたりの上限を毎秒少しずつ回復するトークンバケット"""
+    
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = per_minute
+        self.updated = time.monotonic()
+    
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def take(self, amount: float):
+        if self.capacity > 0:
+            self.level -= amount
+    
+    def wait_for(self, amount: float, reserve: float) -> float:
+        """amountを取り出してもreserveの割合が残るようになるまでの秒数"""
+        if self.capacity <= 0:
+            return 0.0
+        # 1回の呼び出しが上限を超える場合は、満タンになるまで待てば取り出せることにする
+        needed = min(amount + self.capacity * reserve, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        return (needed - self.level) / self.rate
+
+
+class QuotaGovernor:
+    """Gemini APIのRPM・TPMのトークンバケット（スレッドセーフ、同期・非同期の両方から使える）"""
+    
+    def __init__(self, rpm: float = None, tpm: float = None, low_priority_reserve: float = None):
+        """
+        初期化
+        
+        Args:
+            rpm: 1分あたりのリクエスト数の上限（Noneの場合はGEMINI_RPM、0の場合は制限なし）
+            tpm: 1分あたりのトークン数の上限（Noneの場合はGEMINI_TPM、0の場合は制限なし）
+            low_priority_reserve: 優先度lowが使えない残量の割合（Noneの場合はGEMINI_LOW_PRIORITY_RESERVE）
+        """
+        self.requests = _Bucket(rpm if rpm is not None else GEMINI_RPM)
+        self.tokens = _Bucket(tpm if tpm is not None else GEMINI_TPM)
+        self.low_priority_reserve = (
+            low_priority_reserve if low_priority_reserve is not None else GEMINI_LOW_PRIORITY_RESERVE
+        )
+        self.blocked_until = 0.0
+        self._counts = {priority: {'acquired': 0, 'shed': 0, 'waited_seconds': 0.0} for priority in PRIORITIES}
+        self._lock = threading.Lock()
+    
+    def _try_acquire(self, tokens: int, priority: str) -> float:
+        """空きがあれば確保して0を、なければ待つべき秒数を返す"""
+        reserve = self.low_priority_reserve if priority == 'low' else 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            wait = max(
+                self.blocked_until - now,
+                self.requests.wait_for(1, reserve),
+                self.tokens.wait_for(tokens, reserve)
+            )
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            return 0.0
+    
+    def _max_wait(self, priority: str, timeout: Optional[float]) -> float:
+        """優先度と呼び出しのタイムアウトから、空きを待つ最大秒数を決める"""
+        max_wait = GEMINI_LOW_PRIORITY_MAX_WAIT_SECONDS if priority == 'low' else GEMINI_QUOTA_MAX_WAIT_SECONDS
+        if timeout is not None:
+            max_wait = min(max_wait, timeout)
+        return max_wait
+    
+    def _record(self, priority: str, waited: float, acquired: bool):
+        with self._lock:
+            counts = self._counts[priority]
+            counts['acquired' if acquired else 'shed'] += 1
+            counts['waited_seconds'] += waited
+    
+    def acquire(self, tokens: int, priority: str = None, timeout: Optional[float] = None) -> float:
+        """
+        クォータを確保（空きがなければ待機）
+        
+        Args:
+            tokens: 予約する推定トークン数
+            priority: 優先度（Noneの場合は gemini_priority() で設定された値）
+            timeout: 呼び出し全体のタイムアウト（これより長くは待たない）
+        
+        Returns:
+            待機した秒数
+        
+        Raises:
+            QuotaExceeded: 待てる時間内に空きができない場合
+        """
+        priority = priority or current_priority()
+        deadline = time.monotonic() + self._max_wait(priority, timeout)
+        started = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens, priority)
+            if wait == 0:
+                waited = time.monotonic() - started
+                self._record(priority, waited, True)
+                return waited
+            if time.monotonic() + wait > deadline:
+                self._record(priority, time.monotonic() - started, False)
+                raise QuotaExceeded(f"Geminiのクォータの空きがありません（優先度: {priority}、必要な待機: {wait:.1f}秒）")
+            time.sleep(wait)
+    
+    async def acquire_async(self, tokens: int, priority: str = None, timeout: Optional[float] = None) -> float:
+        """
+        acquire の非同期版（待機中もイベントループを止めない）
+        
+        Args:
+            tokens: 予約する推定トークン数
+            priority: 優先度（Noneの場合は gemini_priority() で設定された値）
+            timeout: 呼び出し全体のタイムアウト（これより長くは待たない）
+        
+        Returns:
+            待機した秒数
+        
+        Raises:
+            QuotaExceeded: 待てる時間内に空きができない場合
+        """
+        priority = priority or current_priority()
+        deadline = time.monotonic() + self._max_wait(priority, timeout)
+        started = time.monotonic()
+        while True:
+            wait = self._try_acquire(tokens, priority)
+            if wait == 0:
+                waited = time.monotonic() - started
+                self._record(priority, waited, True)
+                return waited
+            if time.monotonic() + wait > deadline:
+                self._record(priority, time.monotonic() - started, False)
+                raise QuotaExceeded(f"Geminiのクォータの空きがありません（優先度: {priority}、必要な待機: {wait:.1f}秒）")
+            await asyncio.sleep(wait)
+    
+    def settle(self, reserved_tokens: int, response) -> None:
+        """
+        応答の usage_metadata で実際のトークン数が分かったら、予約との差分を精算
+        
+        Args:
+            reserved_tokens: acquire で予約したトークン数
+            response: generate_content のレスポンス
+        """
+        usage = getattr(response, 'usage_metadata', None)
+        actual = getattr(usage, 'total_token_count', None) if usage else None
+        if not actual:
+            return
+        if self.tokens.capacity <= 0:
+            return
+        with self._lock:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + reserved_tokens - actual)
+    
+    def rate_limited(self, cooldown: float = RATE_LIMITED_COOLDOWN_SECONDS):
+        """
+        429を受けた場合に呼ぶ（cooldown秒間はすべての呼び出しを待たせ、RPMの残量を0にする）
+        
+        Args:
+            cooldown: 呼び出しを止める秒数
+        """
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + cooldown)
+            self.requests.level = min(self.requests.level, 0.0)
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"requests_available", "tokens_available", "by_priority"}
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.requests.refill(now)
+            self.tokens.refill(now)
+            return {
+                'requests_available': self.requests.level,
+                'tokens_available': self.tokens.level,
+                'by_priority': {priority: dict(counts) for priority, counts in self._counts.items()}
+            }
+
+
+_governor: Optional[QuotaGovernor] = None
+_governor_lock = threading.Lock()
+
+
+def get_quota_governor() -> QuotaGovernor:
+    """
+    プロセス共通のクォータ管理を取得
+    
+    Returns:
+        QuotaGovernor
+    """
+    global _governor
+    with _governor_lock:
+        if _governor is None:
+            _governor = QuotaGovernor()
+        return _governor
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """
+    429（レート制限・クォータ超過）のエラーか
+    
+    Args:
+        error: 発生した例外
+    
+    Returns:
+        429の場合True
+    """
+    if type(error).__name__ == 'ResourceExhausted':
+        return True
+    message = str(error).lower()
+    return "429" in message or "rate limit" in message or "quota" in message
@@ -6,26 +6,36 @@ import re
 import time
 from typing import List, Dict, Optional
 from datetime import datetime
-import google.generativeai as genai
+from gemini_client import get_genai, require_api_key
+from gemini_quota import get_quota_governor, estimate_tokens, QuotaExceeded, EXPECTED_OUTPUT_TOKENS
 
-# Google Search Grounding用のインポート（最新バージョン対応）
-# 複数のパスを試して、確実にインポートできるようにする
-Tool = None
-GoogleSearch = None
 
-try:
-    # パターン1: 最も一般的で最新のパス (google-generativeai >= 0.8.0)
-    from google.generativeai.types import Tool, GoogleSearch
-    print("✨ Tool/GoogleSearch: パターン1でインポート成功")
-except ImportError:
+def _import_grounding_classes():
+    """
+    Google Search Grounding用のクラスをインポート（最新バージョン対応）
+    
+    複数のパスを試して、確実にインポートできるようにする（SDKの読み込みを初期化時まで遅らせるため関数内でインポート）
+    
+    Returns:
+        (Tool, GoogleSearch)（インポートできなかった場合は (None, None)）
+    """
+    try:
+        # パターン1: 最も一般的で最新のパス (google-generativeai >= 0.8.0)
+        from google.generativeai.types import Tool, GoogleSearch
+        print("✨ Tool/GoogleSearch: パターン1でインポート成功")
+        return Tool, GoogleSearch
+    except ImportError:
+        pass
     try:
         # パターン2: 以前のパス（一部のバージョンで存在）
         from google.generativeai import Tool, GoogleSearch
         print("✨ Tool/GoogleSearch: パターン2でインポート成功")
+        return Tool, GoogleSearch
     except ImportError:
         # どのパスでも見つからなかった場合、Noneのままとなる
         print("⚠️ Tool/GoogleSearch: 必要なクラスのインポートに失敗")
-        pass
+        return None, None
+
 
 # Google API Core例外をインポート（リトライ用）
 try:
@@ -46,11 +56,9 @@ class GeminiResearcher:
             api_key: Gemini APIキー（Noneの場合は環境変数から取得）
             model: 使用するモデル名
         """
-        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
-            raise ValueError("GEMINI_API_KEY環境変数が設定されていません")
-        
-        genai.configure(api_key=self.api_key)
+        self.api_key = require_api_key(api_key)
+        genai = get_genai(self.api_key)
+        Tool, GoogleSearch = _import_grounding_classes()
         
         # Grounding (Google Search) を有効にする
         # 最新バージョン（0.8.5）では Tool(google_search=GoogleSearch()) 形式が必須
@@ -464,11 +472,16 @@ World Economic Forum — https://www.youtube.com/@WorldEconomicForum
         
         Raises:
             ValueError: toolsの二重指定エラー
+            QuotaExceeded: クォータの空きを待てる時間内に確保できない場合（リトライしない）
             Exception: その他のエラー（リトライ後も失敗した場合）
         """
         max_retries = max_retries or self.max_retries
         base_delay = base_delay or self.base_delay
         
+        # 他のGemini呼び出しと共通のクォータから、試行ごとに空きを確保する
+        governor = get_quota_governor()
+        reserved = estimate_tokens(str(payload.get('contents', ''))) + EXPECTED_OUTPUT_TOKENS
+        
         last_exception = None
         
         for attempt in range(max_retries + 1):
@@ -478,11 +491,17 @@ World Economic Forum — https://www.youtube.com/@WorldEconomicForum
                     print(f"⏳ リトライ {attempt}/{max_retries} (待機時間: {delay:.1f}秒)")
                     time.sleep(delay)
                 
+                governor.acquire(reserved)
                 response = self.model.generate_content(**payload)
+                governor.settle(reserved, response)
                 if attempt > 0:
                     print(f"✅ リトライ成功（試行回数: {attempt + 1}）")
                 return response
                 
+            except QuotaExceeded as e:
+                print(f"⚠️ Geminiのクォータ不足のため呼び出しを中止: {e}")
+                raise
+                
             except TypeError as e:
                 # toolsの二重指定エラーはリトライしない
                 error_msg = str(e)
@@ -501,6 +520,7 @@ World Economic Forum — https://www.youtube.com/@WorldEconomicForum
                 if gex:
                     if isinstance(e, gex.ResourceExhausted):  # 429
                         print(f"⚠️ レート制限エラー (429): {e}")
+                        governor.rate_limited()
                         if attempt < max_retries:
                             continue
                         raise
@@ -529,6 +549,7 @@ World Economic Forum — https://www.youtube.com/@WorldEconomicForum
                     raise
                 elif "429" in error_str or "rate limit" in error_str or "quota" in error_str:
                     print(f"⚠️ レート制限エラー (429): {e}")
+                    governor.rate_limited()
                     if attempt < max_retries:
                         continue
                     raise
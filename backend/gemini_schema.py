@@ -0,0 +1,301 @@
+"""
+Geminiの構造化出力（response_schema）
+
+呼び出しの種類（記事の分析・TOP5選定・詳細要約・未来の兆し）ごとに response_schema を指定してJSONで出力させ、
+応答を型付きの結果オブジェクトに変換する。"```json" の切り出しなどの文字列処理をやめ、
+解析に失敗して呼び出し（とクォータ）を無駄にすることを減らす。
+
+【解析】
+- orjson がインストールされていれば orjson、なければ標準の json で解析
+- 解析できない場合は1回だけ修復（コードブロックの除去、前後の余分な文字列の除去、末尾のカンマの除去）してから解析し直す
+- 必須の項目がない・空の場合は StructuredOutputError（数値・真偽値・リストは型を揃える）
+
+【使い方】
+- GeminiAnalyzer.generate_structured(prompt, ANALYSIS) など
+  （StructuredOutput.config() の生成設定で呼び出し、StructuredOutput.parse() で変換）
+"""
+import copy
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from gemini_client import generation_config
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+_CODE_FENCE = re.compile(r'```(?:json)?\s*(.*?)```', re.S)
+_TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+
+class StructuredOutputError(ValueError):
+    """応答をJSONとして解析できない、または必須の項目がない"""
+
+
+def _loads(text: str) -> Any:
+    """JSONを解析（orjsonがあれば使用）"""
+    return orjson.loads(text) if orjson else json.loads(text)
+
+
+def _repair(text: str) -> str:
+    """よくある崩れ（コードブロック・前後の説明文・末尾のカンマ）を取り除く"""
+    fenced = _CODE_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [position for position in (text.find('{'), text.find('[')) if position >= 0]
+    if starts:
+        end = max(text.rfind('}'), text.rfind(']'))
+        if end > min(starts):
+            text = text[min(starts):end + 1]
+    return _TRAILING_COMMA.sub(r'\1', text)
+
+
+def decode_json(text: str) -> Any:
+    """
+    応答テキストをJSONとして解析（失敗した場合は1回だけ修復して解析し直す）
+    
+    Args:
+        text: 応答テキスト
+    
+    Returns:
+        解析結果
+    
+    Raises:
+        StructuredOutputError: 修復しても解析できない場合
+    """
+    try:
+        return _loads(text)
+    except ValueError:
+        pass
+    try:
+        return _loads(_repair(text))
+    except ValueError as e:
+        raise StructuredOutputError(f"JSONとして解析できません: {e}") from e
+
+
+def _text(data: Dict, key: str, required: bool = True) -> str:
+    value = data.get(key)
+    text = value.strip() if isinstance(value, str) else ('' if value is None else str(value))
+    if required and not text:
+        raise StructuredOutputError(f"必須の項目がありません: {key}")
+    return text
+
+
+def _score(data: Dict, key: str) -> float:
+    """0.0-1.0の数値（ない・数値でない場合は0.5）"""
+    try:
+        return min(1.0, max(0.0, float(data.get(key, 0.5))))
+    except (TypeError, ValueError):
+        return 0.5
+
+
+def _flag(data: Dict, key: str) -> bool:
+    value = data.get(key, False)
+    if isinstance(value, str):
+        return value.strip().lower() in ("true", "yes", "1")
+    return bool(value)
+
+
+def _integer(data: Dict, key: str) -> int:
+    try:
+        return int(data[key])
+    except (KeyError, TypeError, ValueError):
+        raise StructuredOutputError(f"整数の項目がありません: {key}")
+
+
+def _object(data: Any) -> Dict:
+    if not isinstance(data, dict):
+        raise StructuredOutputError(f"JSONオブジェクトではありません: {type(data).__name__}")
+    return data
+
+
+def _items(data: Any, key: Optional[str] = None) -> List:
+    """配列を取り出す（オブジェクトで包まれている場合は中の配列）"""
+    if isinstance(data, dict):
+        data = data.get(key) if key else next((value for value in data.values() if isinstance(value, list)), None)
+    if not isinstance(data, list):
+        raise StructuredOutputError("配列がありません")
+    return data
+
+
+@dataclass(slots=True)
+class ArticleAnalysis:
+    """記事の分析結果"""
+    theme: str
+    summary: str
+    key_points: List[str]
+    sentiment_score: float
+    relevance_score: float
+    should_post: bool
+    index: Optional[int] = None  # まとめて分析した場合の記事番号（1始まり）
+    
+    @classmethod
+    def from_json(cls, data: Any) -> "ArticleAnalysis":
+        data = _object(data)
+        key_points = data.get("key_points") or []
+        if isinstance(key_points, str):
+            key_points = [key_points]
+        return cls(
+            theme=_text(data, "theme"),
+            summary=_text(data, "summary"),
+            key_points=[str(point).strip() for point in key_points if str(point).strip()],
+            sentiment_score=_score(data, "sentiment_score"),
+            relevance_score=_score(data, "relevance_score"),
+            should_post=_flag(data, "should_post"),
+            index=_integer(data, "index") if "index" in data else None
+        )
+    
+    def to_record(self) -> Dict:
+        """保存用の辞書（キーポイントはJSON文字列）"""
+        return {
+            "theme": self.theme,
+            "summary": self.summary,
+            "key_points": json.dumps(self.key_points, ensure_ascii=False),
+            "sentiment_score": self.sentiment_score,
+            "relevance_score": self.relevance_score,
+            "should_post": self.should_post
+        }
+
+
+def _analysis_batch(data: Any) -> List[ArticleAnalysis]:
+    """まとめて分析した結果（必須の項目がない記事は除く、1件ずつ分析し直すため）"""
+    analyses = []
+    for item in _items(data):
+        try:
+            analysis = ArticleAnalysis.from_json(item)
+        except StructuredOutputError:
+            continue
+        if analysis.index is not None:
+            analyses.append(analysis)
+    return analyses
+
+
+@dataclass(slots=True)
+class Top5Pick:
+    """TOP5選定の1件"""
+    rank: int
+    article_number: int  # 候補記事の番号（1始まり）
+    reason: str
+    
+    @classmethod
+    def from_json(cls, data: Any) -> "Top5Pick":
+        data = _object(data)
+        return cls(
+            rank=_integer(data, "rank"),
+            article_number=_integer(data, "article_number"),
+            reason=_text(data, "reason", required=False)
+        )
+
+
+def _top5(data: Any) -> List[Top5Pick]:
+    """TOP5選定の結果（順位順）"""
+    picks = [Top5Pick.from_json(item) for item in _items(data, "top5")]
+    if not picks:
+        raise StructuredOutputError("TOP5が空です")
+    return sorted(picks, key=lambda pick: pick.rank)
+
+
+@dataclass(slots=True)
+class DetailedSummary:
+    """記事の詳細要約"""
+    summary: str
+    key_point: str
+    
+    @classmethod
+    def from_json(cls, data: Any) -> "DetailedSummary":
+        data = _object(data)
+        return cls(summary=_text(data, "summary"), key_point=_text(data, "key_point", required=False))
+
+
+@dataclass(slots=True)
+class FutureSignal:
+    """テーマから生成した未来の兆し"""
+    title: str
+    summary: str
+    future_signal: str
+    
+    @classmethod
+    def from_json(cls, data: Any) -> "FutureSignal":
+        data = _object(data)
+        return cls(
+            title=_text(data, "title"),
+            summary=_text(data, "summary"),
+            future_signal=_text(data, "future_signal")
+        )
+    
+    def to_dict(self, theme: str) -> Dict[str, str]:
+        return {"title": self.title, "summary": self.summary, "future_signal": self.future_signal, "theme": theme}
+
+
+def _object_schema(properties: Dict[str, Dict], required: List[str] = None) -> Dict:
+    return {"type": "object", "properties": properties, "required": required or list(properties)}
+
+
+_STRING = {"type": "string"}
+_NUMBER = {"type": "number"}
+_INTEGER = {"type": "integer"}
+
+_ANALYSIS_PROPERTIES = {
+    "theme": _STRING,
+    "summary": _STRING,
+    "key_points": {"type": "array", "items": _STRING},
+    "sentiment_score": _NUMBER,
+    "relevance_score": _NUMBER,
+    "should_post": {"type": "boolean"},
+}
+
+
+@dataclass(frozen=True, slots=True)
+class StructuredOutput:
+    """構造化出力の種類（response_schema と、応答を結果オブジェクトに変換する関数）"""
+    name: str
+    cache_kind: str  # Gemini応答キャッシュの種類（有効期限に使用）
+    schema: Dict
+    build: Callable[[Any], Any]
+    
+    def config(self):
+        """response_schema を指定した生成設定（SDKがスキーマの辞書を書き換えても共有の定義が変わらないようコピーを渡す）"""
+        return generation_config(response_mime_type="application/json", response_schema=copy.deepcopy(self.schema))
+    
+    def parse(self, text: str):
+        """
+        応答テキストを結果オブジェクトに変換
+        
+        Args:
+            text: 応答テキスト
+        
+        Returns:
+            結果オブジェクト（種類ごとの型）
+        
+        Raises:
+            StructuredOutputError: 解析できない、または必須の項目がない場合
+        """
+        return self.build(decode_json(text))
+
+
+ANALYSIS = StructuredOutput(
+    "analysis", "analysis", _object_schema(_ANALYSIS_PROPERTIES), ArticleAnalysis.from_json
+)
+ANALYSIS_BATCH = StructuredOutput(
+    "analysis_batch", "analysis",
+    {"type": "array", "items": _object_schema(dict(_ANALYSIS_PROPERTIES, index=_INTEGER))},
+    _analysis_batch
+)
+TOP5 = StructuredOutput(
+    "top5", "top5",
+    _object_schema({"top5": {"type": "array", "items": _object_schema(
+        {"rank": _INTEGER, "article_number": _INTEGER, "reason": _STRING}
+    )}}),
+    _top5
+)
+DETAILED_SUMMARY = StructuredOutput(
+    "summary", "summary", _object_schema({"summary": _STRING, "key_point": _STRING}), DetailedSummary.from_json
+)
+FUTURE_SIGNAL = StructuredOutput(
+    "future_signal", "future_signal",
+    _object_schema({"title": _STRING, "summary": _STRING, "future_signal": _STRING}),
+    FutureSignal.from_json
+)
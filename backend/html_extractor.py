@@ -0,0 +1,572 @@
+"""
+HTML本文抽出モジュール
+
+【抽出バックエンド】
+- lxml: lxmlで解析し、不要なタグの部分木を飛ばしながらテキストを収集（高速）
+- soup: BeautifulSoup（html.parser）で解析（従来の実装、フォールバック用）
+- scored: 段落ごとの文字数・句読点数とリンク密度でブロックを採点し、本文ブロックを選ぶ（デフォルト）
+  （Readability方式、確信度の高いブロックが見つかった時点で採点を打ち切る）
+
+【文字数の上限】
+- extract_page(html, max_chars): 本文を文の区切りで切り詰めて返す（trim_to_sentences）
+
+【バッチ処理】
+- clean_html_batch: 複数のRSSエントリのHTMLをまとめて処理（CLEAN_WORKERS を指定した場合のみプロセスプール）
+  プロセスプールのワーカーは起動時に __main__（FastAPIアプリ・Bot）を読み込み直すため、
+  1回30件程度のフィードでは起動の負担の方が大きい。コア数の多い環境で大量に処理する場合のみ使う
+
+【設定】
+- HTML_EXTRACTOR: scored / lxml / soup（デフォルト: scored、lxmlが使えない場合はsoup）
+- CLEAN_WORKERS: HTML除去に使うプロセス数（デフォルト: 0 = プロセスプールを使わずその場で処理）
+- CLEAN_CHUNK_SIZE: 1プロセスにまとめて渡すエントリ数（デフォルト: 8）
+- CLEAN_INLINE_MAX_CHARS: HTMLの合計文字数がこれ未満のバッチはその場で処理（デフォルト: 50000）
+"""
+import os
+import re
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+from bs4 import BeautifulSoup
+
+# lxml（オプション、インポートできない場合はBeautifulSoupのみ使用）
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+    etree = None
+
+HTML_EXTRACTOR = os.getenv("HTML_EXTRACTOR", "scored").lower()
+CLEAN_WORKERS = int(os.getenv("CLEAN_WORKERS", "0"))
+CLEAN_CHUNK_SIZE = int(os.getenv("CLEAN_CHUNK_SIZE", "8"))
+CLEAN_INLINE_MAX_CHARS = int(os.getenv("CLEAN_INLINE_MAX_CHARS", "50000"))
+
+# 本文抽出時に除去するタグ
+BOILERPLATE_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe')
+
+# body全体を使う場合に事前に除去するタグ（iframeは本文抽出時に除去）
+BODY_STRIP_TAGS = ('script', 'style', 'nav', 'header', 'footer', 'aside')
+
+# 採点する段落のタグと、段落として数える最小文字数
+SCORED_TAGS = ('p', 'pre', 'td', 'blockquote')
+MIN_PARAGRAPH_CHARS = 25
+
+# リンク密度（リンクテキストの割合）がこれ未満のブロックを本文とみなす
+MAX_LINK_DENSITY = 0.25
+
+# 構造化データ（itemprop="articleBody"）のブロックをそのまま採用する最小文字数
+ARTICLE_BODY_MIN_CHARS = 500
+
+_BLANK_LINES = re.compile(r'\n\s*\n')
+_SPACES = re.compile(r' +')
+_PUNCTUATION = re.compile(r'[,，、。]')
+_POSITIVE_CLASS = re.compile(r'article|body|content|entry|main|post|story|text', re.I)
+_NEGATIVE_CLASS = re.compile(r'comment|footer|sidebar|related|share|social|promo|sponsor|widget|menu|nav|ad-', re.I)
+_SENTENCE_END = re.compile(r'[。．！？!?」』]|\.(?=\s)|\n')
+
+
+def _normalize_text(text: str) -> str:
+    """余分な空白を整理"""
+    text = _BLANK_LINES.sub('\n\n', text)
+    text = _SPACES.sub(' ', text)
+    return text.strip()
+
+
+def trim_to_sentences(text: Optional[str], max_chars: int) -> Optional[str]:
+    """
+    文の途中で切れないように、文字数の上限までの文だけを残す
+    
+    Args:
+        text: 本文
+        max_chars: 最大文字数
+    
+    Returns:
+        max_chars以内の本文（上限の半分より前に文の区切りがない場合は上限で切る）
+    """
+    if not text or len(text) <= max_chars:
+        return text
+    
+    head = text[:max_chars]
+    end = 0
+    for match in _SENTENCE_END.finditer(head):
+        end = match.end()
+    if end < max_chars // 2:
+        end = max_chars
+    return head[:end].rstrip()
+
+
+def parse_published_at(value: Optional[str]) -> Optional[datetime]:
+    """
+    <time>タグの値を日時に変換
+    
+    Args:
+        value: datetime属性またはテキスト
+    
+    Returns:
+        datetimeまたはNone
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class SoupExtractor:
+    """BeautifulSoup（html.parser）による抽出（従来の実装）"""
+    
+    name = "soup"
+    
+    def extract_page(self, html: str, max_chars: int = None) -> Dict:
+        """
+        記事ページからタイトル・本文・公開日時を抽出
+        
+        Args:
+            html: ページのHTML
+            max_chars: 本文の最大文字数（文の区切りで切り詰める、Noneの場合は全文）
+        
+        Returns:
+            {"title", "content", "published_at"}（見つからない項目はNone）
+        """
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        # タイトルの取得
+        title = None
+        if soup.find('title'):
+            title = soup.find('title').get_text().strip()
+        elif soup.find('h1'):
+            title = soup.find('h1').get_text().strip()
+        elif soup.find('meta', property='og:title'):
+            title = soup.find('meta', property='og:title').get('content', '').strip()
+        
+        # 本文の取得（article → main → body の順）
+        content = None
+        article_tag = soup.find('article')
+        if article_tag:
+            content = self.extract_text(article_tag)
+        else:
+            main_tag = soup.find('main')
+            if main_tag:
+                content = self.extract_text(main_tag)
+            else:
+                body = soup.find('body')
+                if body:
+                    for tag in body.find_all(list(BODY_STRIP_TAGS)):
+                        tag.decompose()
+                    content = self.extract_text(body)
+        
+        # 公開日時の取得
+        published_at = None
+        time_tag = soup.find('time')
+        if time_tag:
+            published_at = parse_published_at(time_tag.get('datetime') or time_tag.get_text())
+        
+        if max_chars:
+            content = trim_to_sentences(content, max_chars)
+        
+        return {
+            'title': title,
+            'content': content,
+            'published_at': published_at
+        }
+    
+    def extract_text(self, element) -> str:
+        """
+        BeautifulSoup要素からテキストを抽出
+        
+        Args:
+            element: BeautifulSoup要素
+        
+        Returns:
+            抽出されたテキスト
+        """
+        if not element:
+            return ""
+        
+        # コピーを作成して操作
+        element = element.__copy__()
+        
+        # 不要なタグを除去
+        for tag in element.find_all(list(BOILERPLATE_TAGS)):
+            tag.decompose()
+        
+        return _normalize_text(element.get_text(separator='\n', strip=True))
+    
+    def clean_html(self, html: str) -> str:
+        """
+        HTMLタグを除去してテキストのみを抽出
+        
+        Args:
+            html: HTML文字列
+        
+        Returns:
+            クリーンなテキスト
+        """
+        if not html:
+            return ""
+        return self.extract_text(BeautifulSoup(html, 'html.parser'))
+
+
+class LxmlExtractor:
+    """lxmlによる高速抽出（ツリーをコピーせず、不要なタグの部分木を飛ばす）"""
+    
+    name = "lxml"
+    
+    def __init__(self, fallback: SoupExtractor = None):
+        """
+        初期化
+        
+        Args:
+            fallback: lxmlで解析できないHTML用のフォールバック
+        """
+        self.fallback = fallback or SoupExtractor()
+    
+    def extract_page(self, html: str, max_chars: int = None) -> Dict:
+        """
+        記事ページからタイトル・本文・公開日時を抽出
+        
+        Args:
+            html: ページのHTML
+            max_chars: 本文の最大文字数（文の区切りで切り詰める、Noneの場合は全文）
+        
+        Returns:
+            {"title", "content", "published_at"}（見つからない項目はNone）
+        """
+        try:
+            root = lxml.html.document_fromstring(html)
+        except (etree.ParserError, ValueError):
+            return self.fallback.extract_page(html, max_chars)
+        
+        content = self.extract_content(root, max_chars)
+        if max_chars:
+            content = trim_to_sentences(content, max_chars)
+        
+        return {
+            'title': _extract_title(root),
+            'content': content,
+            'published_at': _extract_published_at(root)
+        }
+    
+    def extract_content(self, root, max_chars: int = None) -> Optional[str]:
+        """
+        本文を抽出（article → main → body の順）
+        
+        Args:
+            root: lxmlの文書ルート
+            max_chars: 本文の最大文字数（このクラスでは使用しない）
+        
+        Returns:
+            本文またはNone
+        """
+        container = _first(root, '//article')
+        if container is None:
+            container = _first(root, '//main')
+        if container is None:
+            container = _first(root, '//body')
+        if container is None:
+            return None
+        return _normalize_text('\n'.join(_iter_strings(container, BOILERPLATE_TAGS)))
+    
+    def clean_html(self, html: str) -> str:
+        """
+        HTMLタグを除去してテキストのみを抽出
+        
+        Args:
+            html: HTML文字列
+        
+        Returns:
+            クリーンなテキスト
+        """
+        if not html:
+            return ""
+        try:
+            root = lxml.html.fragment_fromstring(html, create_parent='div')
+        except (etree.ParserError, ValueError):
+            return self.fallback.clean_html(html)
+        return _normalize_text('\n'.join(_iter_strings(root, BOILERPLATE_TAGS)))
+
+
+class ScoredExtractor(LxmlExtractor):
+    """
+    段落の採点による本文抽出（Readability方式）
+    
+    段落ごとに文字数と句読点の数で点数をつけて親（全点）と祖父（半分）に加算し
+    （class・idが本文らしいブロックは加点、コメント欄・関連記事などは減点）、
+    リンク密度で割り引いた点数が最も高いブロックを本文とする（同じ親を持つ高得点のブロックも含める）。
+    itemprop="articleBody" のブロックがある場合や、1つのブロックの段落だけで必要な文字数（max_chars）に
+    達した場合は、残りの段落を採点せずに終了する。
+    """
+    
+    name = "scored"
+    
+    def extract_content(self, root, max_chars: int = None) -> Optional[str]:
+        """
+        本文を抽出（段落が見つからない場合は article → main → body の順）
+        
+        Args:
+            root: lxmlの文書ルート
+            max_chars: 本文の最大文字数（1つのブロックでこの文字数に達した時点で採点を打ち切る、
+                       Noneの場合はすべての段落を採点）
+        
+        Returns:
+            本文またはNone
+        """
+        blocks = self._find_blocks(root, max_chars)
+        if not blocks:
+            return super().extract_content(root, max_chars)
+        
+        texts = []
+        total = 0
+        for block in blocks:
+            for text in _iter_strings(block, BOILERPLATE_TAGS):
+                texts.append(text)
+                total += len(text) + 1
+                if max_chars and total > max_chars:
+                    break
+            else:
+                continue
+            break
+        return _normalize_text('\n'.join(texts))
+    
+    def _find_blocks(self, root, target_chars: Optional[int]) -> List:
+        """本文ブロックを文書順に返す（段落がない場合は空のリスト）"""
+        for node in root.xpath('//*[@itemprop="articleBody"]'):
+            if (len(node.text_content()) >= ARTICLE_BODY_MIN_CHARS
+                    and _link_density(node) < MAX_LINK_DENSITY):
+                return [node]
+        
+        scores: Dict = {}
+        lengths: Dict = {}
+        rejected = set()
+        for paragraph in root.iter(*SCORED_TAGS):
+            parent = paragraph.getparent()
+            if parent is None or _in_boilerplate(paragraph):
+                continue
+            text = ' '.join(_iter_strings(paragraph, BOILERPLATE_TAGS))
+            if len(text) < MIN_PARAGRAPH_CHARS:
+                continue
+            
+            score = 1 + len(_PUNCTUATION.findall(text)) + min(len(text) / 100, 3)
+            grandparent = parent.getparent()
+            for node, weight in ((parent, 1), (grandparent, 0.5)):
+                if node is None:
+                    continue
+                if node not in scores:
+                    scores[node] = _class_weight(node)
+                scores[node] += score * weight
+            lengths[parent] = lengths.get(parent, 0) + len(text)
+            
+            # 1つのブロックで必要な文字数に達し、リンクが少なければ確定
+            if target_chars and lengths[parent] >= target_chars and parent not in rejected:
+                if _link_density(parent) < MAX_LINK_DENSITY:
+                    return self._with_siblings(parent, scores[parent], scores)
+                rejected.add(parent)
+        
+        if not scores:
+            return []
+        
+        candidates = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:5]
+        best, best_score = max(
+            ((node, score * (1 - _link_density(node))) for node, score in candidates),
+            key=lambda item: item[1]
+        )
+        return self._with_siblings(best, best_score, scores)
+    
+    def _with_siblings(self, best, best_score: float, scores: Dict) -> List:
+        """本文ブロックに、同じ親を持つ点数の高いブロックを加える（コメント欄などは除く、文書順）"""
+        parent = best.getparent()
+        if parent is None:
+            return [best]
+        
+        threshold = max(10.0, best_score * 0.2)
+        blocks = []
+        for sibling in parent:
+            if sibling is best:
+                blocks.append(sibling)
+            elif (sibling in scores and _class_weight(sibling) >= 0
+                    and scores[sibling] * (1 - _link_density(sibling)) >= threshold):
+                blocks.append(sibling)
+        return blocks
+
+
+def _extract_title(root) -> Optional[str]:
+    """タイトルを取得（title → h1 → og:title の順）"""
+    for xpath in ('//title', '//h1'):
+        tag = _first(root, xpath)
+        if tag is not None:
+            return tag.text_content().strip()
+    og_title = _first(root, '//meta[@property="og:title"]')
+    if og_title is not None:
+        return (og_title.get('content') or '').strip()
+    return None
+
+
+def _extract_published_at(root) -> Optional[datetime]:
+    """最初の<time>タグから公開日時を取得"""
+    time_tag = _first(root, '//time')
+    if time_tag is None:
+        return None
+    return parse_published_at(time_tag.get('datetime') or time_tag.text_content())
+
+
+def _link_density(element) -> float:
+    """要素のテキストのうちリンクテキストが占める割合"""
+    length = len(element.text_content())
+    if not length:
+        return 1.0
+    link_length = sum(len(text) for text in element.xpath('.//a//text()'))
+    return min(1.0, link_length / length)
+
+
+def _class_weight(element) -> float:
+    """class・id属性による初期点数（本文らしい名前は+25、コメント欄・広告などは-25）"""
+    names = f"{element.get('class', '')} {element.get('id', '')}"
+    weight = 0.0
+    if _NEGATIVE_CLASS.search(names):
+        weight -= 25
+    if _POSITIVE_CLASS.search(names):
+        weight += 25
+    return weight
+
+
+def _in_boilerplate(element) -> bool:
+    """要素がナビゲーションなど除去対象のタグの中にあるか"""
+    for ancestor in element.iterancestors():
+        if ancestor.tag in BOILERPLATE_TAGS:
+            return True
+    return False
+
+
+def _first(root, xpath: str):
+    """XPathに一致する最初の要素（なければNone）"""
+    found = root.xpath(xpath)
+    return found[0] if found else None
+
+
+def _iter_strings(element, skip_tags):
+    """
+    要素内のテキストを文書順に返す（前後の空白を除去し、空文字は除く）
+    
+    skip_tags の部分木とコメントは飛ばすが、その直後のテキスト（tail）は含める。
+    """
+    stack = [(element, False)]
+    while stack:
+        node, is_tail = stack.pop()
+        if is_tail:
+            text = node.tail
+            if text:
+                text = text.strip()
+                if text:
+                    yield text
+            continue
+        
+        if node is not element:
+            # 子要素の処理後にtailを返すため、先にスタックへ積む
+            stack.append((node, True))
+        if not isinstance(node.tag, str) or node.tag in skip_tags:
+            continue
+        
+        text = node.text
+        if text:
+            text = text.strip()
+            if text:
+                yield text
+        for child in reversed(node):
+            stack.append((child, False))
+
+
+def get_extractor(name: str = None):
+    """
+    抽出バックエンドを取得
+    
+    Args:
+        name: "scored"、"lxml" または "soup"（Noneの場合はHTML_EXTRACTOR）
+    
+    Returns:
+        ScoredExtractor、LxmlExtractor または SoupExtractor
+    """
+    name = (name or HTML_EXTRACTOR).lower()
+    if name == "scored" and lxml is not None:
+        return ScoredExtractor()
+    if name == "lxml" and lxml is not None:
+        return LxmlExtractor()
+    if name in ("scored", "lxml"):
+        print("⚠️ lxmlが利用できないため、BeautifulSoupで本文を抽出します")
+    return SoupExtractor()
+
+
+_clean_pool: Optional[ProcessPoolExecutor] = None
+_clean_pool_lock = threading.Lock()
+_worker_extractors: Dict[str, object] = {}
+
+
+def _get_clean_pool() -> Optional[ProcessPoolExecutor]:
+    """HTML除去用のプロセス共通のプロセスプール（CLEAN_WORKERS=0、または作成に失敗した場合はNone）"""
+    global _clean_pool
+    if CLEAN_WORKERS <= 0:
+        return None
+    
+    with _clean_pool_lock:
+        if _clean_pool is None:
+            # スレッドから呼ばれるため、forkではなくforkserver（なければspawn）でワーカーを起動
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            try:
+                _clean_pool = ProcessPoolExecutor(max_workers=CLEAN_WORKERS, mp_context=context)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ HTML除去用プロセスプールの作成エラー: {e}")
+                return None
+        return _clean_pool
+
+
+def _clean_chunk(name: str, htmls: List[str]) -> List[str]:
+    """ワーカープロセスでHTMLを除去（抽出バックエンドはプロセスごとに1回だけ作成）"""
+    extractor = _worker_extractors.get(name)
+    if extractor is None:
+        extractor = _worker_extractors[name] = get_extractor(name)
+    return [extractor.clean_html(html) for html in htmls]
+
+
+def clean_html_batch(htmls: List[str], extractor=None) -> List[str]:
+    """
+    複数のHTMLからタグを除去してテキストのみを抽出
+    
+    CLEAN_WORKERS を指定した場合は、CLEAN_CHUNK_SIZE件ずつプロセスプールに渡して複数コアで処理する。
+    件数・合計文字数が少ない場合は、プロセス間の受け渡しの方が高くつくためその場で処理する。
+    
+    Args:
+        htmls: HTML文字列のリスト（1つまたは複数のフィードのエントリ）
+        extractor: 抽出バックエンド（Noneの場合はHTML_EXTRACTORの設定）
+    
+    Returns:
+        クリーンなテキストのリスト（入力と同じ順序）
+    """
+    global _clean_pool
+    extractor = extractor or get_extractor()
+    chunk_size = max(1, CLEAN_CHUNK_SIZE)
+    name = getattr(extractor, 'name', None)
+    
+    pool = None
+    if (len(htmls) > chunk_size and name in ("scored", "lxml", "soup")
+            and sum(len(html) for html in htmls if html) >= CLEAN_INLINE_MAX_CHARS):
+        pool = _get_clean_pool()
+    if pool is None:
+        return [extractor.clean_html(html) for html in htmls]
+    
+    try:
+        futures = [
+            pool.submit(_clean_chunk, name, htmls[i:i + chunk_size])
+            for i in range(0, len(htmls), chunk_size)
+        ]
+        return [text for future in futures for text in future.result()]
+    except BrokenProcessPool as e:
+        # ワーカーが異常終了した場合は、次回プールを作り直してその場で処理
+        print(f"⚠️ HTML除去用プロセスプールのエラー: {e}")
+        with _clean_pool_lock:
+            if _clean_pool is pool:
+                _clean_pool = None
+        return [extractor.clean_html(html) for html in htmls]
@@ -0,0 +1,183 @@
+"""
+共通HTTPトランスポート
+
+記事取得・URL短縮・robots.txtなど backend/ からの外部HTTPリクエストで、
+1つのコネクションプールを共有する（Keep-Aliveで接続を再利用し、TCP/TLSハンドシェイクを省く）。
+
+【仕組み】
+- requestsのアダプターを1つだけ作成し、各クライアントのSessionにマウント
+  （ヘッダーはクライアントごと、接続はプロセス全体で共有）
+- Accept-Encoding: urllib3で展開できる圧縮形式（br / zstd は対応ライブラリがあれば追加）
+- HTTP/2: HTTP_ENABLE_HTTP2=true かつ h2 がインストールされている場合のみ、urllib3のHTTP/2対応を有効化（HTTPSのみ）
+  （urllib3をプロセス全体で書き換えるため、Bluesky・Geminiなど requests を使う他のクライアントもHTTP/2になる）
+- 新規接続数とリクエスト数を数え、接続の再利用率を確認できる
+
+【設定】
+- HTTP_POOL_HOSTS: 接続を保持するホスト数（デフォルト: 32）
+- HTTP_POOL_PER_HOST: ホストごとに保持する接続数（デフォルト: 10）
+- HTTP_ENABLE_HTTP2: true の場合はHTTP/2を使用する（デフォルト: false、h2が必要）
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import connectionpool
+from urllib3.util.request import ACCEPT_ENCODING
+
+# HTTP/2（オプション、h2とurllib3 2.3以降が必要）
+try:
+    import h2  # noqa: F401
+    import urllib3.http2 as urllib3_http2
+except ImportError:
+    urllib3_http2 = None
+
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "32"))
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "10"))
+HTTP_ENABLE_HTTP2 = os.getenv("HTTP_ENABLE_HTTP2", "false").lower() == "true"
+
+# "gzip,deflate" に、brotli / zstandard がインストールされていれば "br" / "zstd" が加わる
+ACCEPT_ENCODING_HEADER = ACCEPT_ENCODING.replace(',', ', ')
+
+
+class _ConnectionStats:
+    """新規接続数とリクエスト数（プロセス全体、スレッドセーフ）"""
+    
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+    
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+    
+    def count_connection(self):
+        with self._lock:
+            self.connections += 1
+
+
+_stats = _ConnectionStats()
+
+
+class _CountingHTTPConnectionPool(connectionpool.HTTPConnectionPool):
+    """新規接続とリクエストを数えるコネクションプール"""
+    
+    def _new_conn(self):
+        _stats.count_connection()
+        return super()._new_conn()
+    
+    def _make_request(self, *args, **kwargs):
+        _stats.count_request()
+        return super()._make_request(*args, **kwargs)
+
+
+class _CountingHTTPSConnectionPool(connectionpool.HTTPSConnectionPool):
+    """新規接続とリクエストを数えるコネクションプール（HTTPS）"""
+    
+    def _new_conn(self):
+        _stats.count_connection()
+        return super()._new_conn()
+    
+    def _make_request(self, *args, **kwargs):
+        _stats.count_request()
+        return super()._make_request(*args, **kwargs)
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """複数のSessionで共有するアダプター（Session.close() でプールを閉じない）"""
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CountingHTTPConnectionPool,
+            'https': _CountingHTTPSConnectionPool
+        }
+    
+    def close(self):
+        """共有しているため、個々のSessionを閉じても接続は保持する"""
+
+
+_adapter: Optional[SharedHTTPAdapter] = None
+_adapter_lock = threading.Lock()
+_http2_enabled = False
+_default_session: Optional[requests.Session] = None
+
+
+def get_http_adapter() -> SharedHTTPAdapter:
+    """
+    プロセス共通のアダプターを取得（初回にHTTP/2の有効化も行う）
+    
+    Returns:
+        SharedHTTPAdapter
+    """
+    global _adapter, _http2_enabled
+    with _adapter_lock:
+        if _adapter is None:
+            if HTTP_ENABLE_HTTP2 and urllib3_http2 is not None:
+                try:
+                    urllib3_http2.inject_into_urllib3()
+                    _http2_enabled = True
+                except Exception as e:
+                    print(f"⚠️ HTTP/2の有効化エラー（HTTP/1.1を使用）: {e}")
+            _adapter = SharedHTTPAdapter(
+                pool_connections=HTTP_POOL_HOSTS,
+                pool_maxsize=HTTP_POOL_PER_HOST
+            )
+        return _adapter
+
+
+def create_session(headers: Dict[str, str] = None) -> requests.Session:
+    """
+    共通のコネクションプールを使うSessionを作成
+    
+    Args:
+        headers: このSessionで送るヘッダー（User-Agentなど）
+    
+    Returns:
+        requests.Session
+    """
+    session = requests.Session()
+    adapter = get_http_adapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Accept-Encoding'] = ACCEPT_ENCODING_HEADER
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """
+    プロセス共通のSessionを取得（特定のヘッダーが不要なクライアント用）
+    
+    Returns:
+        requests.Session
+    """
+    global _default_session
+    if _default_session is None:
+        session = create_session()
+        with _adapter_lock:
+            if _default_session is None:
+                _default_session = session
+    return _default_session
+
+
+def get_transport_stats() -> Dict:
+    """
+    接続の再利用状況を取得
+    
+    Returns:
+        {"requests", "connections", "reused", "reuse_ratio", "http2", "accept_encoding"}
+    """
+    requests_count, connections = _stats.requests, _stats.connections
+    reused = max(0, requests_count - connections)
+    return {
+        'requests': requests_count,
+        'connections': connections,
+        'reused': reused,
+        'reuse_ratio': reused / requests_count if requests_count else 0.0,
+        'http2': _http2_enabled,
+        'accept_encoding': ACCEPT_ENCODING_HEADER
+    }
@@ -44,6 +44,7 @@ from datetime import datetime
 from database import get_db, init_db, create_article, get_article_by_url, update_article_analysis
 from database import add_to_post_queue, get_pending_posts
 from gemini_analyzer import GeminiAnalyzer
+from gemini_quota import gemini_priority, QuotaExceeded
 from twitter_poster import SocialPoster
 from article_fetcher import ArticleFetcher, RSSFeedManager, get_default_feed_manager
 from url_shortener import URLShortener
@@ -760,15 +761,22 @@ async def fetch_by_research(
         themes_list = [t.strip() for t in request.themes.split(',') if t.strip()]
         generated_items = []
         
-        for theme in themes_list:
-            try:
-                result = analyzer.generate_future_signal(theme)
-                generated_items.append(result)
-            except Exception as e:
-                print(f"⚠️ テーマ '{theme}' の未来の兆し生成エラー: {e}")
+        # 手動実行のため優先度を下げ、定時の投稿の分のクォータを残す
+        with gemini_priority('low'):
+            results = await analyzer.generate_future_signals_async(themes_list)
+        for theme, result in zip(themes_list, results):
+            if isinstance(result, Exception):
+                print(f"⚠️ テーマ '{theme}' の未来の兆し生成エラー: {result}")
                 continue
+            generated_items.append(result)
         
         if not generated_items:
+            if results and all(isinstance(result, QuotaExceeded) for result in results):
+                raise HTTPException(
+                    status_code=429,
+                    detail="Gemini quota is reserved for scheduled posts. Please retry later.",
+                    headers={"Retry-After": "60"}
+                )
             raise HTTPException(status_code=500, detail="未来の兆しの生成に失敗しました")
         
         # 生成された「未来の兆し」を記事として保存
@@ -1,10 +1,33 @@
 """
 データモデル定義
+
+【記事本文の保存】
+- 本文は articles テーブルではなく article_bodies テーブルにzstd圧縮して保存
+  （記事の検索・重複チェックで本文を読み込まない、Article.content にアクセスした時点で読み込み・展開）
+- 旧バージョンで articles.content に保存された本文は init_db() 時に article_bodies へ移行
+
+【設定】
+- ARTICLE_BODY_COMPRESSION: zstd / none（デフォルト: zstandardがインストール済みならzstd）
 """
+import os
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float
+from sqlalchemy import Column, Integer, BigInteger, String, Text, DateTime, Boolean, Float, LargeBinary, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import relationship, deferred
+
+# zstd圧縮（オプション、未インストールの場合は非圧縮で保存）
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARTICLE_BODY_COMPRESSION = os.getenv(
+    "ARTICLE_BODY_COMPRESSION", "zstd" if zstandard else "none"
+).lower()
+
+# 一度書いたら書き換えないため、圧縮率を優先
+ARTICLE_BODY_ZSTD_LEVEL = 9
 
 Base = declarative_base()
 
@@ -16,7 +39,6 @@ class Article(Base):
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, unique=True, index=True, nullable=False)
     title = Column(String, nullable=False)
-    content = Column(Text)
     published_at = Column(DateTime)
     created_at = Column(DateTime, default=datetime.utcnow)
     
@@ -32,10 +54,81 @@ class Article(Base):
     posted_at = Column(DateTime, nullable=True)
     tweet_id = Column(String, nullable=True)
     
+    # 本文（圧縮してarticle_bodiesに保存、アクセスした時点で読み込む）
+    body = relationship("ArticleBody", uselist=False, lazy="select", cascade="all, delete-orphan")
+    
+    # 旧バージョンの非圧縮の本文（移行用、通常は読み込まない）
+    legacy_content = deferred(Column("content", Text))
+    
+    @property
+    def content(self) -> Optional[str]:
+        """記事本文（圧縮された本文を展開して返す）"""
+        if self.body is not None:
+            return self.body.text
+        return self.legacy_content
+    
+    @content.setter
+    def content(self, value: Optional[str]):
+        if value is None:
+            self.body = None
+        elif self.body is None:
+            self.body = ArticleBody(text=value)
+        else:
+            self.body.text = value
+        if self.legacy_content is not None:
+            self.legacy_content = None
+    
     def __repr__(self):
         return f"<Article(id={self.id}, title='{self.title}', theme='{self.theme}')>"
 
 
+class ArticleBody(Base):
+    """記事本文（zstd圧縮、articlesとは別テーブル）"""
+    __tablename__ = "article_bodies"
+    
+    article_id = Column(Integer, ForeignKey("articles.id", ondelete="CASCADE"), primary_key=True)
+    codec = Column(String, nullable=False, default="none")  # zstd / none
+    data = Column(LargeBinary, nullable=False)
+    raw_size = Column(Integer, nullable=False, default=0)  # 圧縮前のバイト数
+    
+    @property
+    def text(self) -> str:
+        """展開した本文"""
+        if self.codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("zstdで圧縮された本文の展開にはzstandardが必要です")
+            return zstandard.ZstdDecompressor().decompress(self.data).decode("utf-8")
+        return self.data.decode("utf-8")
+    
+    @text.setter
+    def text(self, value: str):
+        raw = value.encode("utf-8")
+        self.raw_size = len(raw)
+        if ARTICLE_BODY_COMPRESSION == "zstd" and zstandard is not None:
+            self.codec = "zstd"
+            self.data = zstandard.ZstdCompressor(level=ARTICLE_BODY_ZSTD_LEVEL).compress(raw)
+        else:
+            self.codec = "none"
+            self.data = raw
+    
+    def __repr__(self):
+        return f"<ArticleBody(article_id={self.article_id}, codec='{self.codec}', size={len(self.data or b'')}/{self.raw_size})>"
+
+
+class ArticleFingerprint(Base):
+    """記事のSimHash（類似記事の検出用）"""
+    __tablename__ = "article_fingerprints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True, index=True, nullable=False)
+    article_id = Column(Integer, nullable=True)
+    simhash = Column(BigInteger, nullable=False)  # 64bitを符号付きで保存
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ArticleFingerprint(id={self.id}, url='{self.url}', simhash={self.simhash})>"
+
+
 class PostQueue(Base):
     """投稿キュー"""
     __tablename__ = "post_queue"
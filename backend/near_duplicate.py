@@ -0,0 +1,278 @@
+"""
+ニアデュプリケート（類似記事）検出モジュール
+
+同じ記事が複数のフィードに別URLで掲載されることがあるため、タイトルと本文の
+SimHash（64bit）で類似記事を検出する。
+
+【仕組み】
+- タイトル＋本文（先頭のみ）を3-gram（英数字は単語、日本語は文字単位）に分割してSimHashを計算
+- 64bitを (最大ハミング距離 + 1) 個のバンドに分け、いずれかのバンドが一致する記事のみ比較（LSH）
+  → 鳩の巣原理により、距離が最大値以内の記事は必ず候補に含まれる
+- フィンガープリントは article_fingerprints テーブルに保存し、初回の照会時にメモリへ読み込む
+- メモリ上のインデックスは直近 NEAR_DUPLICATE_WINDOW_DAYS 日分のみ保持し、古い記事は定期的に取り除く
+  （常駐するワーカーでメモリとバケットの大きさが増え続けないようにする）
+
+【設定】
+- NEAR_DUPLICATE_THRESHOLD: 類似度のしきい値（0〜1、デフォルト: 0.9 ≒ 64bit中6bitまでの違い）
+- NEAR_DUPLICATE_WINDOW_DAYS: 類似記事を比較する期間（日、デフォルト: 7、0の場合は無期限）
+- DISABLE_NEAR_DUPLICATE: true の場合は類似記事の検出を行わない
+"""
+import os
+import re
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+NEAR_DUPLICATE_WINDOW_DAYS = float(os.getenv("NEAR_DUPLICATE_WINDOW_DAYS", "7"))
+DISABLE_NEAR_DUPLICATE = os.getenv("DISABLE_NEAR_DUPLICATE", "").lower() == "true"
+
+SIMHASH_BITS = 64
+SIMHASH_CONTENT_CHARS = 2000  # 本文はこの文字数までを使用
+SHINGLE_SIZE = 3
+PRUNE_INTERVAL = timedelta(hours=1)  # 期間外の記事を取り除く間隔
+
+_TOKEN = re.compile(r'[a-z0-9]+|[\u3040-\u30ff\u3400-\u9fff]')
+_MASK = (1 << SIMHASH_BITS) - 1
+
+
+def _shingles(text: str) -> List[str]:
+    """テキストを3-gramに分割（英数字は単語単位、日本語は文字単位）"""
+    tokens = _TOKEN.findall(text.lower())
+    if len(tokens) < SHINGLE_SIZE:
+        return [' '.join(tokens)] if tokens else []
+    return [' '.join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)]
+
+
+def simhash(title: str, content: Optional[str] = None) -> int:
+    """
+    タイトルと本文のSimHashを計算
+    
+    Args:
+        title: 記事タイトル
+        content: 記事本文（先頭SIMHASH_CONTENT_CHARS文字のみ使用）
+    
+    Returns:
+        64bitの符号なし整数
+    """
+    text = f"{title or ''}\n{(content or '')[:SIMHASH_CONTENT_CHARS]}"
+    shingles = set(_shingles(text))
+    if not shingles:
+        return 0
+    
+    # 各ビットが1になっているシングルの数を数え、過半数なら1にする
+    ones = [0] * SIMHASH_BITS
+    for shingle in shingles:
+        value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        bit = 0
+        while value:
+            if value & 1:
+                ones[bit] += 1
+            value >>= 1
+            bit += 1
+    
+    half = len(shingles) / 2
+    fingerprint = 0
+    for bit, count in enumerate(ones):
+        if count > half:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def to_signed(fingerprint: int) -> int:
+    """64bitの符号なし整数をDB保存用の符号付き整数に変換"""
+    return fingerprint - (1 << SIMHASH_BITS) if fingerprint >= 1 << (SIMHASH_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    """DBに保存した符号付き整数を64bitの符号なし整数に戻す"""
+    return value & _MASK
+
+
+class NearDuplicateIndex:
+    """SimHashのLSHインデックス（スレッドセーフ）"""
+    
+    def __init__(self, threshold: float = None, window_days: float = None):
+        """
+        初期化
+        
+        Args:
+            threshold: 類似度のしきい値（0〜1、Noneの場合はNEAR_DUPLICATE_THRESHOLD）
+            window_days: 比較する期間（日、Noneの場合はNEAR_DUPLICATE_WINDOW_DAYS、0の場合は無期限）
+        """
+        threshold = NEAR_DUPLICATE_THRESHOLD if threshold is None else threshold
+        window_days = NEAR_DUPLICATE_WINDOW_DAYS if window_days is None else window_days
+        self.window = timedelta(days=window_days) if window_days > 0 else None
+        self.max_distance = max(0, min(SIMHASH_BITS - 1, int((1.0 - threshold) * SIMHASH_BITS)))
+        
+        # 64bitを (max_distance + 1) 個のバンドに分割（端数は先頭のバンドに配分）
+        bands = self.max_distance + 1
+        width, extra = divmod(SIMHASH_BITS, bands)
+        self._bands: List[Tuple[int, int]] = []
+        shift = 0
+        for i in range(bands):
+            bits = width + (1 if i < extra else 0)
+            self._bands.append((shift, (1 << bits) - 1))
+            shift += bits
+        
+        self._buckets: List[Dict[int, List[Tuple[str, int]]]] = [{} for _ in self._bands]
+        self._urls: Dict[str, Tuple[int, datetime]] = {}  # URL → (フィンガープリント, 登録日時)
+        self._pruned_at = datetime.utcnow()
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._urls)
+    
+    def _cutoff(self) -> Optional[datetime]:
+        """比較する期間の開始日時（無期限の場合はNone）"""
+        return datetime.utcnow() - self.window if self.window else None
+    
+    def add(self, url: str, fingerprint: int, added_at: datetime = None):
+        """
+        フィンガープリントを登録
+        
+        Args:
+            url: 記事のURL
+            fingerprint: simhash() の戻り値
+            added_at: 登録日時（UTC、Noneの場合は現在）
+        """
+        added_at = added_at or datetime.utcnow()
+        cutoff = self._cutoff()
+        if cutoff and added_at < cutoff:
+            return
+        with self._lock:
+            if url in self._urls:
+                return
+            self._urls[url] = (fingerprint, added_at)
+            for buckets, (shift, mask) in zip(self._buckets, self._bands):
+                buckets.setdefault((fingerprint >> shift) & mask, []).append((url, fingerprint))
+    
+    def prune(self, force: bool = False) -> int:
+        """
+        比較する期間より古い記事を取り除く（PRUNE_INTERVAL ごと）
+        
+        Args:
+            force: 前回から PRUNE_INTERVAL が経っていなくても実行する
+        
+        Returns:
+            取り除いた件数
+        """
+        cutoff = self._cutoff()
+        if cutoff is None:
+            return 0
+        with self._lock:
+            now = datetime.utcnow()
+            if not force and now - self._pruned_at < PRUNE_INTERVAL:
+                return 0
+            self._pruned_at = now
+            expired = {url for url, (_, added_at) in self._urls.items() if added_at < cutoff}
+            if not expired:
+                return 0
+            for url in expired:
+                del self._urls[url]
+            for buckets in self._buckets:
+                for key in list(buckets):
+                    kept = [entry for entry in buckets[key] if entry[0] not in expired]
+                    if kept:
+                        buckets[key] = kept
+                    else:
+                        del buckets[key]
+        return len(expired)
+    
+    def matches(self, fingerprint: int, exclude_url: str = None) -> List[Tuple[str, int]]:
+        """
+        しきい値以内の類似記事をすべて検索
+        
+        Args:
+            fingerprint: simhash() の戻り値
+            exclude_url: 比較対象から除くURL（記事自身など）
+        
+        Returns:
+            [(記事のURL, ハミング距離)]（距離の近い順）
+        """
+        self.prune()
+        cutoff = self._cutoff()
+        found: Dict[str, int] = {}
+        with self._lock:
+            for buckets, (shift, mask) in zip(self._buckets, self._bands):
+                for url, other in buckets.get((fingerprint >> shift) & mask, ()):
+                    if url == exclude_url or url in found:
+                        continue
+                    if cutoff and self._urls[url][1] < cutoff:
+                        continue
+                    distance = (fingerprint ^ other).bit_count()
+                    if distance <= self.max_distance:
+                        found[url] = distance
+        return sorted(found.items(), key=lambda match: match[1])
+    
+    def query(self, fingerprint: int, exclude_url: str = None) -> Optional[Tuple[str, int]]:
+        """
+        最も近い類似記事を検索
+        
+        Args:
+            fingerprint: simhash() の戻り値
+            exclude_url: 比較対象から除くURL（記事自身など）
+        
+        Returns:
+            (最も近い記事のURL, ハミング距離) またはNone
+        """
+        found = self.matches(fingerprint, exclude_url)
+        return found[0] if found else None
+    
+    def load(self, db):
+        """
+        DBに保存済みのフィンガープリントを読み込む
+        
+        Args:
+            db: データベースセッション
+        """
+        from database import get_article_fingerprints
+        for url, value, created_at in get_article_fingerprints(db, since=self._cutoff()):
+            self.add(url, to_unsigned(value), created_at)
+        print(f"✅ 類似記事インデックスを読み込みました: {len(self)}件")
+    
+    def register(self, db, url: str, fingerprint: int, article_id: int = None):
+        """
+        フィンガープリントをDBに保存してインデックスに登録
+        
+        Args:
+            db: データベースセッション
+            url: 記事のURL
+            fingerprint: simhash() の戻り値
+            article_id: 記事ID（オプション）
+        """
+        from database import add_article_fingerprint
+        add_article_fingerprint(db, url, to_signed(fingerprint), article_id)
+        self.add(url, fingerprint)
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index(db) -> Optional[NearDuplicateIndex]:
+    """
+    プロセス共通の類似記事インデックスを取得（初回はDBから読み込む）
+    
+    Args:
+        db: データベースセッション
+    
+    Returns:
+        NearDuplicateIndex（DISABLE_NEAR_DUPLICATE=true、または読み込みに失敗した場合はNone）
+    """
+    global _index
+    if DISABLE_NEAR_DUPLICATE:
+        return None
+    
+    with _index_lock:
+        if _index is None:
+            index = NearDuplicateIndex()
+            try:
+                index.load(db)
+            except Exception as e:
+                print(f"⚠️ 類似記事インデックスの読み込みエラー: {e}")
+                db.rollback()
+                return None
+            _index = index
+        return _index
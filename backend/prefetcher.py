@@ -0,0 +1,153 @@
+"""
+記事本文の投機的な先読み
+
+RSSの記事リストを取得した時点で、候補記事の本文の取得・抽出をバックグラウンドで開始する。
+Geminiでの選定などを待つ間に本文を用意しておき、選定後の本文取得待ちをなくす。
+
+先読みするのは候補の先頭 PREFETCH_MAX_ARTICLES 件まで（ホストごとの間隔制御を通るため、
+使われない記事まで取得すると選定後の本文取得が後回しになる）。期限（Deadline）を過ぎた後は取得しない。
+
+【設定】
+- PREFETCH_MAX_WORKERS: 同時に取得する記事数（デフォルト: 4）
+- PREFETCH_MAX_ARTICLES: 先読みする候補記事の最大数（デフォルト: 10）
+- DISABLE_PREFETCH: true の場合は先読みしない
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional
+
+from deadline import Deadline, MIN_CALL_SECONDS
+
+PREFETCH_MAX_WORKERS = int(os.getenv("PREFETCH_MAX_WORKERS", "4"))
+PREFETCH_MAX_ARTICLES = int(os.getenv("PREFETCH_MAX_ARTICLES", "10"))
+DISABLE_PREFETCH = os.getenv("DISABLE_PREFETCH", "").lower() == "true"
+
+
+class ArticlePrefetcher:
+    """候補記事の本文をバックグラウンドで先読みする"""
+    
+    def __init__(self, fetcher, max_workers: int = None, max_articles: int = None):
+        """
+        初期化
+        
+        Args:
+            fetcher: ArticleFetcher（fetch_from_url を使用、ホストごとの間隔制御もそのまま適用）
+            max_workers: 同時に取得する記事数（Noneの場合はPREFETCH_MAX_WORKERS）
+            max_articles: 先読みする候補記事の最大数（Noneの場合はPREFETCH_MAX_ARTICLES）
+        """
+        self.fetcher = fetcher
+        self.max_workers = max_workers or PREFETCH_MAX_WORKERS
+        self.max_articles = max_articles if max_articles is not None else PREFETCH_MAX_ARTICLES
+        self.hits = 0  # 先読み済みの本文を返した回数
+        self.skipped = 0  # 件数の上限・期限切れで取得しなかった記事数
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def start(self, articles: List[Dict], deadline: Deadline = None) -> 'ArticlePrefetcher':
+        """
+        記事リストの本文の先読みを開始（すぐに戻る）
+        
+        Args:
+            articles: "url" を含む記事のリスト（リストの順に、先頭から max_articles 件まで取得）
+            deadline: 先読みの期限（Noneの場合は無制限、期限切れの後は取得しない）
+        
+        Returns:
+            self
+        """
+        deadline = deadline or Deadline()
+        urls = [a['url'] for a in articles if a.get('url') and a['url'] not in self._futures]
+        limit = max(0, self.max_articles - len(self._futures))
+        self.skipped += max(0, len(urls) - limit)
+        urls = urls[:limit]
+        if not urls:
+            return self
+        
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=max(1, self.max_workers), thread_name_prefix="ArticlePrefetcher"
+            )
+        for url in urls:
+            self._futures[url] = self._executor.submit(self._fetch, url, deadline)
+        print(f"🚀 記事本文の先読みを開始: {len(urls)}件")
+        return self
+    
+    def _fetch(self, url: str, deadline: Deadline) -> Optional[Dict]:
+        """期限内であれば本文を取得（ワーカースレッドで実行）"""
+        if deadline.expired(MIN_CALL_SECONDS):
+            with self._lock:
+                self.skipped += 1
+            return None
+        timeout = deadline.timeout(self.fetcher.timeout) if deadline.bounded else None
+        return self.fetcher.fetch_from_url(url, timeout=timeout)
+    
+    def retain(self, urls: List[str]):
+        """
+        指定したURL以外の未着手の先読みを取り消す（選定結果が出た後に呼ぶ）
+        
+        Args:
+            urls: 引き続き取得するURLのリスト
+        """
+        keep = set(urls)
+        cancelled = 0
+        for url, future in self._futures.items():
+            if url not in keep and future.cancel():
+                cancelled += 1
+        if cancelled:
+            print(f"🧹 不要になった先読みを取り消し: {cancelled}件")
+    
+    def get(self, url: str, timeout: Optional[float] = None) -> Optional[Dict]:
+        """
+        先読みした記事を取得（取得中の場合は完了を待つ）
+        
+        Args:
+            url: 記事のURL
+            timeout: 待機する最大秒数（Noneの場合は完了まで待つ）
+        
+        Returns:
+            記事の辞書、または先読みしていない・取得できなかった場合はNone
+        """
+        future = self._futures.get(url)
+        if future is None or future.cancelled():
+            return None
+        try:
+            article = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return None
+        except Exception as e:
+            print(f"⚠️ 先読みエラー ({url}): {e}")
+            return None
+        
+        if article:
+            self.hits += 1
+        return article
+    
+    def close(self):
+        """未着手の先読みを取り消して終了（実行中の取得は待たない）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"submitted", "hits", "skipped"}
+        """
+        return {
+            'submitted': len(self._futures),
+            'hits': self.hits,
+            'skipped': self.skipped
+        }
+    
+    def summary(self) -> str:
+        """
+        先読みの結果の1行サマリー（実行ログ用）
+        
+        Returns:
+            "先読み: {hits}/{submitted}件を利用（スキップ: {skipped}件）"
+        """
+        stats = self.stats()
+        return f"先読み: {stats['hits']}/{stats['submitted']}件を利用（スキップ: {stats['skipped']}件）"
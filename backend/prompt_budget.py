@@ -0,0 +1,167 @@
+"""
+トークン数の予算に合わせたプロンプトの組み立て
+
+本文などを文字数で一律に切り詰める（content[:5000] など）のではなく、呼び出しの種類ごとの
+入力トークン数の予算を、固定の指示文と可変の項目（本文・候補記事の概要など）で分け合う。
+
+- 日本語（1文字 ≒ 1トークン）と英語（4文字 ≒ 1トークン）で同じ予算になるよう推定トークン数で数える
+- 短い項目は全文を使い、余った予算を長い項目に回す（候補記事が多い場合も予算を使い切る）
+- 切り詰める場合は文の区切りで切る（trim_to_sentences）
+- GEMINI_COUNT_TOKENS=true の場合は組み立てたプロンプトを count_tokens で確認し、予算を超えていれば1回だけ詰め直す
+
+【設定】
+- GEMINI_PROMPT_TOKENS_<種類>: 種類ごとの入力トークン数の予算（例: GEMINI_PROMPT_TOKENS_ANALYSIS=4000）
+- GEMINI_COUNT_TOKENS: true の場合は count_tokens（API）で実際のトークン数を確認する（デフォルト: false）
+"""
+import os
+from typing import Callable, Dict, Hashable, Optional
+
+from html_extractor import trim_to_sentences
+from gemini_async import run_async
+from gemini_quota import estimate_tokens
+
+GEMINI_COUNT_TOKENS = os.getenv("GEMINI_COUNT_TOKENS", "").lower() == "true"
+
+# 呼び出しの種類ごとのデフォルトの入力トークン数の予算（指示文を含む）
+DEFAULT_PROMPT_TOKENS = {
+    'analysis': 4000,  # 記事の分析（本文）
+    'summary': 2000,  # 記事の詳細要約（本文）
+    'top5': 8000,  # TOP5選定（候補記事のタイトル・概要）
+}
+
+# 種類の指定がない場合の予算
+DEFAULT_PROMPT_TOKENS_FALLBACK = 4000
+
+PromptRenderer = Callable[[Dict[Hashable, str]], str]
+
+
+def prompt_tokens(kind: str) -> int:
+    """
+    呼び出しの種類の入力トークン数の予算
+    
+    Args:
+        kind: 呼び出しの種類（analysis / summary / top5）
+    
+    Returns:
+        予算（トークン数）
+    """
+    default = DEFAULT_PROMPT_TOKENS.get(kind, DEFAULT_PROMPT_TOKENS_FALLBACK)
+    return int(os.getenv(f"GEMINI_PROMPT_TOKENS_{kind.upper()}", str(default)))
+
+
+def trim_to_tokens(text: Optional[str], max_tokens: int) -> str:
+    """
+    推定トークン数が max_tokens 以下になるよう、文の区切りで切り詰める
+    
+    Args:
+        text: テキスト
+        max_tokens: 最大トークン数
+    
+    Returns:
+        切り詰めたテキスト（収まる場合はそのまま）
+    """
+    if not text or max_tokens <= 0:
+        return ''
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    # 1文字は最大1トークン、最小1/4トークンなので、収まる最長の文字数はこの範囲にある
+    low, high = max_tokens, min(len(text), max_tokens * 4 + 3)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return trim_to_sentences(text, low) or ''
+
+
+def allocate_tokens(fields: Dict[Hashable, str], budget: int) -> Dict[Hashable, str]:
+    """
+    予算を可変の項目で分け合い、各項目を切り詰める
+    
+    短い項目から順に均等な取り分と比べ、収まる項目は全文を使い、余った予算を残りの長い項目に回す。
+    
+    Args:
+        fields: {項目名: テキスト}
+        budget: 項目全体で使えるトークン数
+    
+    Returns:
+        {項目名: 切り詰めたテキスト}
+    """
+    sizes = {name: estimate_tokens(text or '') for name, text in fields.items()}
+    remaining = max(0, budget)
+    allotted = {}
+    ordered = sorted(fields, key=lambda name: sizes[name])
+    for position, name in enumerate(ordered):
+        share = remaining // (len(ordered) - position)
+        allotted[name] = min(sizes[name], share)
+        remaining -= allotted[name]
+    return {
+        name: (text or '') if allotted[name] >= sizes[name] else trim_to_tokens(text, allotted[name])
+        for name, text in fields.items()
+    }
+
+
+def _fit(render: PromptRenderer, fields: Dict[Hashable, str], max_tokens: int) -> str:
+    """固定部分（項目を空にしたプロンプト）の残りを項目で分け合って組み立てる"""
+    fixed = estimate_tokens(render({name: '' for name in fields}))
+    return render(allocate_tokens(fields, max_tokens - fixed))
+
+
+def _corrected_budget(max_tokens: int, counted: Optional[int]) -> Optional[int]:
+    """count_tokens の結果が予算を超えている場合、推定とのずれを見込んで縮めた予算"""
+    if not counted or counted <= max_tokens:
+        return None
+    return max_tokens * max_tokens // counted
+
+
+def fit_prompt(render: PromptRenderer, fields: Dict[Hashable, str], max_tokens: int, model=None) -> str:
+    """
+    予算に収まるようにプロンプトを組み立てる
+    
+    Args:
+        render: {項目名: テキスト} からプロンプトを作る関数
+        fields: 可変の項目（本文など、予算に合わせて切り詰める）
+        max_tokens: プロンプト全体の入力トークン数の予算
+        model: GenerativeModel（GEMINI_COUNT_TOKENS=true の場合に count_tokens で確認）
+    
+    Returns:
+        プロンプト
+    """
+    prompt = _fit(render, fields, max_tokens)
+    if GEMINI_COUNT_TOKENS and model is not None:
+        try:
+            corrected = _corrected_budget(max_tokens, model.count_tokens(prompt).total_tokens)
+        except Exception as e:
+            print(f"⚠️ count_tokensエラー（推定トークン数を使用）: {e}")
+            corrected = None
+        if corrected:
+            prompt = _fit(render, fields, corrected)
+    return prompt
+
+
+async def fit_prompt_async(render: PromptRenderer, fields: Dict[Hashable, str], max_tokens: int,
+                           model=None) -> str:
+    """
+    fit_prompt の非同期版（count_tokens_async をGemini用のイベントループで実行）
+    
+    Args:
+        render: {項目名: テキスト} からプロンプトを作る関数
+        fields: 可変の項目（本文など、予算に合わせて切り詰める）
+        max_tokens: プロンプト全体の入力トークン数の予算
+        model: GenerativeModel（GEMINI_COUNT_TOKENS=true の場合に count_tokens で確認）
+    
+    Returns:
+        プロンプト
+    """
+    prompt = _fit(render, fields, max_tokens)
+    if GEMINI_COUNT_TOKENS and model is not None:
+        try:
+            counted = await run_async(model.count_tokens_async(prompt))
+            corrected = _corrected_budget(max_tokens, counted.total_tokens)
+        except Exception as e:
+            print(f"⚠️ count_tokensエラー（推定トークン数を使用）: {e}")
+            corrected = None
+        if corrected:
+            prompt = _fit(render, fields, corrected)
+    return prompt
@@ -0,0 +1,71 @@
+"""
+ホストごとのリクエスト間隔制御（トークンバケット）
+"""
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """ホストごとのトークンバケット（スレッドセーフ）"""
+    
+    def __init__(self, interval: float = 1.0, burst: int = 1):
+        """
+        初期化
+        
+        Args:
+            interval: 同一ホストへのリクエスト間隔（秒、トークンの補充間隔）
+            burst: 連続で送れるリクエスト数（バケット容量）
+        """
+        self.interval = interval
+        self.burst = max(1, burst)
+        self._intervals: Dict[str, float] = {}  # ホスト個別の間隔（Crawl-delayなど）
+        self._tokens: Dict[str, float] = {}
+        self._updated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def set_interval(self, host: str, interval: float):
+        """
+        ホスト個別のリクエスト間隔を設定
+        
+        Args:
+            host: ホスト名
+            interval: リクエスト間隔（秒）
+        """
+        with self._lock:
+            self._intervals[host] = interval
+    
+    def acquire(self, url_or_host: str, interval: Optional[float] = None) -> float:
+        """
+        トークンを1つ取得（不足している場合は補充されるまで待機）
+        
+        同時に呼ばれた場合も、待ち時間を予約してから眠るため順番に間隔が空く。
+        
+        Args:
+            url_or_host: URLまたはホスト名
+            interval: この呼び出しで使う間隔（Noneの場合は既定値、ホスト個別の設定より短い場合は無視）
+        
+        Returns:
+            待機した秒数
+        """
+        host = urlparse(url_or_host).netloc or url_or_host
+        with self._lock:
+            if interval is None:
+                interval = self.interval
+            interval = max(interval, self._intervals.get(host, 0.0))
+            now = time.monotonic()
+            tokens = self._tokens.get(host, float(self.burst))
+            if interval > 0:
+                elapsed = now - self._updated_at.get(host, now)
+                tokens = min(float(self.burst), tokens + elapsed / interval)
+            else:
+                tokens = float(self.burst)
+            
+            wait = (1.0 - tokens) * interval if tokens < 1.0 else 0.0
+            self._tokens[host] = tokens - 1.0
+            self._updated_at[host] = now
+        
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,241 @@
+"""
+robots.txt のキャッシュ
+
+記事ページを取得する前に、ホストごとのrobots.txtで取得が許可されているかを確認し、
+Crawl-delay（またはRequest-rate）をリクエスト間隔として返す。
+robots.txt はホストごとに1回だけ取得し、メモリとキャッシュ用SQLiteファイル（robots_txtテーブル）に
+有効期限付きで保存する。
+
+【取得結果の扱い（RFC 9309）】
+- 2xx: 内容に従う
+- 4xx（404など）: すべて許可
+- 5xx・429: すべて禁止（ROBOTS_ERROR_TTL_MINUTES後に再取得）
+- 接続エラー・タイムアウト: すべて許可（ROBOTS_ERROR_TTL_MINUTES後に再取得）
+
+【設定】
+- ROBOTS_USER_AGENT: robots.txtのルールの照合に使うUser-Agentトークン（デフォルト: kizashi）
+- ROBOTS_TTL_HOURS: robots.txtの有効期限（時間、デフォルト: 24）
+- ROBOTS_ERROR_TTL_MINUTES: 取得に失敗した場合の有効期限（分、デフォルト: 10）
+- ROBOTS_MAX_CRAWL_DELAY: Crawl-delayとして使う最大秒数（デフォルト: 60）
+- DISABLE_ROBOTS: true の場合はrobots.txtを確認しない
+"""
+import os
+import time
+import threading
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from cache_store import CacheStore, DISABLE_HTTP_CACHE
+from http_transport import get_http_session
+
+ROBOTS_USER_AGENT = os.getenv("ROBOTS_USER_AGENT", "kizashi")
+ROBOTS_TTL_HOURS = float(os.getenv("ROBOTS_TTL_HOURS", "24"))
+ROBOTS_ERROR_TTL_MINUTES = float(os.getenv("ROBOTS_ERROR_TTL_MINUTES", "10"))
+ROBOTS_MAX_CRAWL_DELAY = float(os.getenv("ROBOTS_MAX_CRAWL_DELAY", "60"))
+DISABLE_ROBOTS = os.getenv("DISABLE_ROBOTS", "").lower() == "true"
+
+ROBOTS_MAX_BYTES = 512 * 1024  # これを超える部分は読まない（RFC 9309では最低500KiB）
+ROBOTS_MAX_HOSTS = 1024
+
+
+class RobotsCache:
+    """ホストごとのrobots.txtのキャッシュ（スレッドセーフ）"""
+    
+    def __init__(self, store: CacheStore = None, user_agent: str = None, ttl_hours: float = None,
+                 error_ttl_minutes: float = None, max_crawl_delay: float = None, timeout: float = 10):
+        """
+        初期化
+        
+        Args:
+            store: robots.txtの保存先（Noneの場合はデフォルトのSQLiteファイル、
+                   DISABLE_HTTP_CACHE=trueの場合はメモリ上のみ）
+            user_agent: ルールの照合に使うUser-Agentトークン（Noneの場合はROBOTS_USER_AGENT）
+            ttl_hours: robots.txtの有効期限（時間、Noneの場合はROBOTS_TTL_HOURS）
+            error_ttl_minutes: 取得に失敗した場合の有効期限（分、Noneの場合はROBOTS_ERROR_TTL_MINUTES）
+            max_crawl_delay: Crawl-delayの上限（秒、Noneの場合はROBOTS_MAX_CRAWL_DELAY）
+            timeout: robots.txt取得のタイムアウト（秒）
+        """
+        self.store = store or CacheStore(
+            path=":memory:" if DISABLE_HTTP_CACHE else None,
+            table="robots_txt",
+            max_entries=ROBOTS_MAX_HOSTS
+        )
+        self.user_agent = user_agent or ROBOTS_USER_AGENT
+        self.ttl = (ttl_hours if ttl_hours is not None else ROBOTS_TTL_HOURS) * 3600
+        self.error_ttl = (error_ttl_minutes if error_ttl_minutes is not None else ROBOTS_ERROR_TTL_MINUTES) * 60
+        self.max_crawl_delay = max_crawl_delay if max_crawl_delay is not None else ROBOTS_MAX_CRAWL_DELAY
+        self.timeout = timeout
+        self.downloads = 0  # robots.txtをダウンロードした回数
+        self.blocked = 0  # 禁止されていたURLの数
+        self._parsers: Dict[str, Tuple[RobotFileParser, float]] = {}
+        self._host_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+    
+    def check(self, url: str, session: requests.Session = None) -> Tuple[bool, Optional[float]]:
+        """
+        URLの取得が許可されているかとCrawl-delayを確認（未取得のホストはrobots.txtを取得）
+        
+        Args:
+            url: 取得するURL
+            session: robots.txtの取得に使うセッション（Noneの場合は共通のセッション）
+        
+        Returns:
+            (許可されているか, リクエスト間隔（秒）またはNone)
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.netloc:
+            return True, None
+        
+        parser = self._get_parser(f"{parts.scheme}://{parts.netloc}", session)
+        allowed = parser.can_fetch(self.user_agent, url)
+        if not allowed:
+            with self._lock:
+                self.blocked += 1
+        return allowed, self._crawl_delay(parser)
+    
+    def allowed(self, url: str, session: requests.Session = None) -> bool:
+        """
+        URLの取得が許可されているか
+        
+        Args:
+            url: 取得するURL
+            session: robots.txtの取得に使うセッション
+        
+        Returns:
+            許可されている場合True
+        """
+        return self.check(url, session)[0]
+    
+    def crawl_delay(self, url: str, session: requests.Session = None) -> Optional[float]:
+        """
+        ホストのCrawl-delay（Request-rateのみ指定されている場合はその間隔）
+        
+        Args:
+            url: ホスト内のURL
+            session: robots.txtの取得に使うセッション
+        
+        Returns:
+            リクエスト間隔（秒、ROBOTS_MAX_CRAWL_DELAYまで）またはNone
+        """
+        return self.check(url, session)[1]
+    
+    def _crawl_delay(self, parser: RobotFileParser) -> Optional[float]:
+        """パーサーからリクエスト間隔を取得"""
+        delay = parser.crawl_delay(self.user_agent)
+        if delay is None:
+            rate = parser.request_rate(self.user_agent)
+            if rate and rate.requests:
+                delay = rate.seconds / rate.requests
+        if delay is None:
+            return None
+        return min(float(delay), self.max_crawl_delay)
+    
+    def _get_parser(self, origin: str, session: Optional[requests.Session]) -> RobotFileParser:
+        """ホストのパーサーを取得（同じホストのrobots.txtは同時に1回だけ取得）"""
+        cached = self._parsers.get(origin)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        
+        with self._lock:
+            host_lock = self._host_locks.setdefault(origin, threading.Lock())
+        
+        with host_lock:
+            now = time.time()
+            cached = self._parsers.get(origin)
+            if cached and cached[1] > now:
+                return cached[0]
+            
+            stored = self.store.get(origin)
+            if stored:
+                body, meta = stored
+                status, expires_at = meta['status'], meta['expires_at']
+            else:
+                status, body, ttl = self._download(origin, session)
+                expires_at = now + ttl
+                self.store.put(origin, body, {'status': status, 'expires_at': expires_at}, ttl=ttl)
+            
+            parser = _build_parser(status, body)
+            self._parsers[origin] = (parser, expires_at)
+            return parser
+    
+    def _download(self, origin: str, session: Optional[requests.Session]) -> Tuple[int, bytes, float]:
+        """
+        robots.txtをダウンロード
+        
+        Returns:
+            (ステータスコード（接続エラーは0）, 本文, 有効期限（秒）)
+        """
+        url = f"{origin}/robots.txt"
+        self.downloads += 1
+        try:
+            with (session or get_http_session()).get(url, timeout=self.timeout, stream=True) as response:
+                status = response.status_code
+                body = b''
+                if 200 <= status < 300:
+                    for chunk in response.iter_content(chunk_size=65536):
+                        body += chunk
+                        if len(body) >= ROBOTS_MAX_BYTES:
+                            body = body[:ROBOTS_MAX_BYTES]
+                            break
+        except requests.RequestException as e:
+            print(f"⚠️ robots.txt取得エラー ({url}): {e}")
+            return 0, b'', self.error_ttl
+        
+        print(f"🤖 robots.txtを取得: {url} ({status})")
+        if status >= 500 or status == 429:
+            return status, b'', self.error_ttl
+        return status, body, self.ttl
+    
+    def stats(self) -> Dict:
+        """
+        統計情報を取得
+        
+        Returns:
+            {"hosts", "downloads", "blocked"}
+        """
+        return {
+            'hosts': len(self._parsers),
+            'downloads': self.downloads,
+            'blocked': self.blocked
+        }
+
+
+def _build_parser(status: int, body: bytes) -> RobotFileParser:
+    """ステータスコードと本文からパーサーを作成"""
+    parser = RobotFileParser()
+    if 200 <= status < 300:
+        parser.parse(body.decode('utf-8', errors='replace').splitlines())
+    elif status >= 500 or status == 429:
+        parser.disallow_all = True
+    else:
+        # 4xx・接続エラーはrobots.txtがないものとして扱う
+        parser.allow_all = True
+    return parser
+
+
+_robots_cache: Optional[RobotsCache] = None
+_robots_cache_lock = threading.Lock()
+
+
+def get_robots_cache() -> Optional[RobotsCache]:
+    """
+    プロセス共通のrobots.txtキャッシュを取得
+    
+    Returns:
+        RobotsCache（DISABLE_ROBOTS=true、または初期化に失敗した場合はNone）
+    """
+    global _robots_cache
+    if DISABLE_ROBOTS:
+        return None
+    
+    with _robots_cache_lock:
+        if _robots_cache is None:
+            try:
+                _robots_cache = RobotsCache()
+            except Exception as e:
+                print(f"⚠️ robots.txtキャッシュ初期化エラー: {e}")
+                return None
+        return _robots_cache
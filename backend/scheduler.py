@@ -17,17 +17,22 @@ import os
 import schedule
 import time
 from datetime import datetime
-from typing import Callable, List, Dict
+from typing import Callable, Iterable, List, Dict, Tuple
 
 from database import SessionLocal, get_pending_posts
-from gemini_analyzer import GeminiAnalyzer
+from gemini_analyzer import GeminiAnalyzer, GEMINI_BATCH_MAX_ARTICLES
 from twitter_poster import SocialPoster
 from article_fetcher import RSSFeedManager, get_default_feed_manager
 from url_shortener import URLShortener
+from near_duplicate import simhash, get_near_duplicate_index
+from feed_scheduler import get_feed_poll_scheduler
 
 # スケジューラーの無効化フラグ
 DISABLE_SCHEDULER = os.getenv("DISABLE_SCHEDULER", "").lower() == "true"
 
+# RSSフィードの定期ポーリング（フィードごとの更新頻度に応じて間隔を調整）
+ENABLE_FEED_POLLING = os.getenv("ENABLE_FEED_POLLING", "").lower() == "true"
+
 
 class ArticleScheduler:
     """記事分析・投稿の定期実行スケジューラー"""
@@ -44,7 +49,9 @@ class ArticleScheduler:
         except Exception as e:
             print(f"⚠️ ソーシャルポスター初期化エラー: {e}")
             self.poster = None
-        self.feed_manager = feed_manager or get_default_feed_manager()
+        self.feed_manager = feed_manager or get_default_feed_manager(
+            incremental=True, poll_scheduler=get_feed_poll_scheduler()
+        )
         self.url_shortener = URLShortener()
         # 固定テーマ
         self.fixed_themes = "AI,生成AI,AIエージェント"
@@ -128,15 +135,15 @@ class ArticleScheduler:
             themes_list = [t.strip() for t in self.fixed_themes.split(',') if t.strip()]
             generated_items = []
             
-            for theme in themes_list:
-                try:
-                    result = self.analyzer.generate_future_signal(theme)
-                    generated_items.append(result)
-                    print(f"✅ テーマ '{theme}' の未来の兆しを生成")
-                except Exception as e:
-                    print(f"⚠️ テーマ '{theme}' の未来の兆し生成エラー: {e}")
+            # テーマごとの生成は並列に実行（1テーマとほぼ同じ時間で完了）
+            results = self.analyzer.generate_future_signals(themes_list)
+            for theme, result in zip(themes_list, results):
+                if isinstance(result, Exception):
+                    print(f"⚠️ テーマ '{theme}' の未来の兆し生成エラー: {result}")
                     # エラー時はスキップ（汎用テキストを保存しない）
                     continue
+                generated_items.append(result)
+                print(f"✅ テーマ '{theme}' の未来の兆しを生成")
             
             if not generated_items:
                 print("⚠️ 生成された未来の兆しがありません")
@@ -155,7 +162,8 @@ class ArticleScheduler:
         新しい記事を取得して分析
         
         Args:
-            article_fetcher: 記事を取得する関数（オプション、指定しない場合はRSSフィードを使用）
+            article_fetcher: 記事のリストまたはイテレータを返す関数（オプション、指定しない場合はRSSフィードを使用）
+                             イテレータの場合は取得できた記事から順に処理する
         """
         if article_fetcher:
             # カスタム取得関数を使用
@@ -165,18 +173,37 @@ class ArticleScheduler:
             # デフォルトのRSS取得を使用
             self.fetch_and_analyze_articles()
     
-    def _process_articles(self, articles: List[Dict]):
+    def analyze_feed_articles(self):
+        """
+        登録済みのRSSフィードから新着記事を取得して分析
+        
+        ポーリング時期になったフィードのみ取得し、全フィードの取得完了を待たずに
+        取得できたフィードの記事から順にDB保存・分析を行う。
+        """
+        print(f"\n[{datetime.now()}] RSSフィードの新着記事を取得・分析...")
+        self._process_articles(self.feed_manager.iter_due_feeds())
+    
+    def poll_due_feeds(self):
+        """ポーリング時期になったフィードがある場合のみ analyze_feed_articles を実行"""
+        poll_scheduler = self.feed_manager.poll_scheduler
+        if poll_scheduler and not poll_scheduler.due_feeds(self.feed_manager.feeds):
+            return
+        self.analyze_feed_articles()
+    
+    def _process_articles(self, articles: Iterable[Dict]):
         """
         記事リストを処理（作成・分析・キュー追加）
         
         Args:
-            articles: 記事のリスト
+            articles: 記事のリストまたはイテレータ（イテレータの場合は取得できた順に処理）
         """
         db = SessionLocal()
         
         try:
             processed_count = 0
             skipped_count = 0
+            duplicate_index = get_near_duplicate_index(db)
+            pending = []  # 分析待ちの (記事, タイトル, 本文, URL)
             
             for article_data in articles:
                 url = article_data.get("url")
@@ -185,7 +212,7 @@ class ArticleScheduler:
                 published_at = article_data.get("published_at")
                 
                 # 既に存在するかチェック
-                from database import get_article_by_url, create_article, update_article_analysis
+                from database import get_article_by_url, create_article
                 
                 existing = get_article_by_url(db, url)
                 if existing:
@@ -193,33 +220,28 @@ class ArticleScheduler:
                     skipped_count += 1
                     continue
                 
+                # 別URLの類似記事（複数フィードに掲載された同じ記事など）をチェック
+                fingerprint = simhash(title, content)
+                if duplicate_index:
+                    duplicate = duplicate_index.query(fingerprint)
+                    if duplicate:
+                        print(f"⏭️  スキップ: {title[:50]}... (類似記事あり: {duplicate[0]})")
+                        skipped_count += 1
+                        continue
+                
                 # 記事を作成
                 article = create_article(db, url, title, content, published_at)
                 print(f"📝 記事作成: {title[:50]}...")
+                if duplicate_index:
+                    duplicate_index.register(db, url, fingerprint, article.id)
                 
-                # Geminiで分析
-                try:
-                    analysis = self.analyzer.analyze_article(title, content or "", url)
-                    print(f"🔍 分析完了: テーマ={analysis.get('theme')}")
-                    
-                    # 分析結果を保存
-                    update_article_analysis(db, article.id, analysis)
-                    
-                    # 投稿候補の場合、キューに追加
-                    if analysis.get("should_post", False):
-                        tweet_text = self.analyzer.generate_tweet_text(
-                            title, analysis.get("summary"), analysis.get("theme"), url
-                        )
-                        from database import add_to_post_queue
-                        add_to_post_queue(db, article.id, tweet_text)
-                        print(f"📤 投稿キューに追加: {title[:50]}...")
-                    
-                    processed_count += 1
-                    
-                except Exception as e:
-                    print(f"⚠️ 分析エラー ({title[:50]}...): {e}")
-                    continue
+                # Geminiでまとめて分析（GEMINI_BATCH_MAX_ARTICLES件たまるごと）
+                pending.append((article, title, content, url))
+                if len(pending) >= GEMINI_BATCH_MAX_ARTICLES:
+                    processed_count += self._analyze_and_queue(db, pending)[0]
+                    pending = []
             
+            processed_count += self._analyze_and_queue(db, pending)[0]
             print(f"✅ 処理完了: {processed_count}件処理, {skipped_count}件スキップ")
             
         except Exception as e:
@@ -229,6 +251,55 @@ class ArticleScheduler:
         finally:
             db.close()
     
+    def _analyze_and_queue(self, db, pending: List[Tuple], post_all: bool = False) -> Tuple[int, int]:
+        """
+        作成済みの記事をまとめてGeminiで分析し、投稿候補を投稿キューに追加
+        
+        Args:
+            db: データベースセッション
+            pending: (記事, タイトル, 本文, URL) のリスト
+            post_all: Trueの場合は should_post に関わらずすべてキューに追加（短縮URLを使用）
+        
+        Returns:
+            (分析した件数, キューに追加した件数)
+        """
+        from database import update_article_analysis, add_to_post_queue
+        
+        if not pending:
+            return 0, 0
+        
+        analyses = self.analyzer.analyze_articles_batch([
+            {'title': title, 'content': content or "", 'url': url}
+            for _, title, content, url in pending
+        ])
+        
+        processed_count = 0
+        queued_count = 0
+        for (article, title, _, url), analysis in zip(pending, analyses):
+            try:
+                print(f"🔍 分析完了: テーマ={analysis.get('theme')} ({title[:50]}...)")
+                
+                # 分析結果を保存
+                update_article_analysis(db, article.id, analysis)
+                
+                # 投稿候補の場合、キューに追加
+                if post_all or analysis.get("should_post", False):
+                    link = self.url_shortener.shorten(url) if post_all else url
+                    tweet_text = self.analyzer.generate_tweet_text(
+                        title, analysis.get("summary"), analysis.get("theme"), link
+                    )
+                    add_to_post_queue(db, article.id, tweet_text)
+                    queued_count += 1
+                    print(f"📤 投稿キューに追加: {title[:50]}...")
+                
+                processed_count += 1
+                
+            except Exception as e:
+                print(f"⚠️ 分析エラー ({title[:50]}...): {e}")
+                continue
+        
+        return processed_count, queued_count
+    
     def _process_generated_signals(self, generated_items: List[Dict]):
         """
         生成された「未来の兆し」を処理（DB保存なし、直接自動投稿）
@@ -306,6 +377,8 @@ class ArticleScheduler:
             processed_count = 0
             skipped_count = 0
             queued_count = 0
+            duplicate_index = get_near_duplicate_index(db)
+            pending = []  # 分析待ちの (記事, タイトル, 本文, URL)
             
             from database import get_article_by_url, create_article, update_article_analysis, add_to_post_queue
             
@@ -325,9 +398,20 @@ class ArticleScheduler:
                     skipped_count += 1
                     continue
                 
+                # 別URLの類似記事をチェック
+                fingerprint = simhash(title, content)
+                if duplicate_index:
+                    duplicate = duplicate_index.query(fingerprint)
+                    if duplicate:
+                        print(f"⏭️  スキップ: {title[:50]}... (類似記事あり: {duplicate[0]})")
+                        skipped_count += 1
+                        continue
+                
                 # 記事を作成
                 article = create_article(db, url, title, content, published_at)
                 print(f"📝 記事作成: {title[:50]}...")
+                if duplicate_index:
+                    duplicate_index.register(db, url, fingerprint, article.id)
                 
                 # テーマが既に設定されている場合はそのまま使用
                 if theme:
@@ -389,24 +473,13 @@ class ArticleScheduler:
                     
                     processed_count += 1
                 else:
-                    # テーマが設定されていない場合は分析を実行
-                    try:
-                        analysis = self.analyzer.analyze_article(title, content, url)
-                        update_article_analysis(db, article.id, analysis)
-                        
-                        # スケジュール実行時はすべて投稿
-                        short_url = self.url_shortener.shorten(url)
-                        tweet_text = self.analyzer.generate_tweet_text(
-                            title, analysis.get("summary"), analysis.get("theme"), short_url
-                        )
-                        add_to_post_queue(db, article.id, tweet_text)
-                        queued_count += 1
-                        print(f"📤 投稿キューに追加: {title[:50]}...")
-                        
-                        processed_count += 1
-                    except Exception as e:
-                        print(f"⚠️ 分析エラー ({title[:50]}...): {e}")
-                        continue
+                    # テーマが設定されていない場合は、最後にまとめて分析
+                    pending.append((article, title, content, url))
+            
+            # スケジュール実行時はすべて投稿
+            analyzed, queued = self._analyze_and_queue(db, pending, post_all=True)
+            processed_count += analyzed
+            queued_count += queued
             
             print(f"✅ 処理完了: {processed_count}件処理, {skipped_count}件スキップ, {queued_count}件をキューに追加")
             
@@ -482,6 +555,10 @@ class ArticleScheduler:
         # スケジュール設定（ジョブIDを指定して重複防止）
         schedule.every(interval_minutes).minutes.do(self.fetch_and_analyze_articles).tag("fetch_articles")  # 15分ごとに記事取得
         schedule.every(5).minutes.do(self.post_approved_articles).tag("post_articles")  # 15分ごとに承認済みを投稿
+        if ENABLE_FEED_POLLING:
+            # フィードごとの間隔は更新頻度から決まるため、ここでは時期になったかを確認するだけ
+            schedule.every(1).minutes.do(self.poll_due_feeds).tag("poll_feeds")
+            print("🗓️ RSSフィードの適応ポーリングを有効化")
         
         # 初回実行
         print("🚀 初回実行を開始...")
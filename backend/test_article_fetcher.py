@@ -2,12 +2,18 @@
 記事取得機能のテストスクリプト
 """
 import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
 from dotenv import load_dotenv
 
 # 環境変数を読み込み
 load_dotenv()
 
 from article_fetcher import ArticleFetcher, RSSFeedManager, get_default_feed_manager
+from cache_store import CacheStore, FeedCache, PageCache
+from robots_cache import RobotsCache
 
 
 def test_rss_fetch():
@@ -114,6 +120,96 @@ def test_default_feeds():
         traceback.print_exc()
 
 
+class _FeedServer:
+    """テスト用のローカルRSSサーバー（ホスト名ごとの同時リクエスト数の最大値を記録）"""
+    
+    def __init__(self, delay: float = 0.3):
+        self.delay = delay
+        self.active: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                host = self.headers.get('Host', '').split(':')[0]
+                with server._lock:
+                    server.active[host] = server.active.get(host, 0) + 1
+                    server.peak[host] = max(server.peak.get(host, 0), server.active[host])
+                try:
+                    time.sleep(server.delay)
+                    body = _rss(host, self.path.strip('/')).encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/rss+xml; charset=utf-8')
+                    self.send_header('Content-Length', str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with server._lock:
+                        server.active[host] -= 1
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _rss(host: str, name: str) -> str:
+    """フィード1つ分のRSS 2.0（記事2件）"""
+    items = ''.join(
+        f"<item><title>{name} 記事{i}</title><link>http://{host}/{name}/{i}</link>"
+        f"<description>&lt;p&gt;{name}の記事{i}の概要&lt;/p&gt;</description>"
+        f"<pubDate>Mon, 0{i} Sep 2025 09:00:00 +0000</pubDate></item>"
+        for i in (1, 2)
+    )
+    return f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel><title>{name}</title>{items}</channel></rss>'
+
+
+def _offline_fetcher() -> ArticleFetcher:
+    """ファイルに書き込まないキャッシュを使う ArticleFetcher"""
+    return ArticleFetcher(
+        feed_cache=FeedCache(CacheStore(path=":memory:", table="feed_cache")),
+        page_cache=PageCache(CacheStore(path=":memory:", table="page_cache")),
+        robots=RobotsCache(CacheStore(path=":memory:", table="robots_txt"))
+    )
+
+
+def test_concurrent_feed_fetch():
+    """並行取得: すべてのフィードを登録順に返し、ホストごとの同時取得数の上限を守る"""
+    print("\n=== 並行フィード取得テスト ===")
+    
+    with _FeedServer(delay=0.3) as server:
+        manager = RSSFeedManager(max_concurrency=8, per_host_concurrency=2, fetcher=_offline_fetcher())
+        feed_urls = [
+            f"http://{host}:{server.port}/feed{i}"
+            for i in range(5) for host in ("127.0.0.1", "localhost")
+        ]
+        for url in feed_urls:
+            manager.add_feed(url, max_items=2)
+        
+        result = manager.fetch_all_feeds_with_stats()
+    
+    print(f"ホストごとの最大同時取得数: {server.peak}（全体: {result['elapsed']:.2f}秒）")
+    assert [feed['url'] for feed in result['feeds']] == feed_urls
+    assert all(feed['error'] is None and feed['count'] == 2 for feed in result['feeds'])
+    assert len(result['articles']) == 2 * len(feed_urls)
+    assert [a['title'] for a in result['articles'][:2]] == ["feed0 記事1", "feed0 記事2"]
+    assert set(server.peak) == {"127.0.0.1", "localhost"}
+    assert max(server.peak.values()) <= 2
+    # 上限までは並行に取得している（順番に取得した場合は 10 × 0.3秒 かかる）
+    assert result['elapsed'] < 0.3 * len(feed_urls) * 0.6
+
+
 if __name__ == "__main__":
     print("🚀 記事取得機能テスト開始\n")
     
@@ -122,6 +218,7 @@ if __name__ == "__main__":
     test_url_fetch()
     test_feed_manager()
     # test_default_feeds()  # 時間がかかるのでコメントアウト
+    test_concurrent_feed_fetch()
     
     print("\n✅ すべてのテスト完了")
 
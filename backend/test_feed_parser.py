@@ -0,0 +1,150 @@
+"""
+RSS/Atomフィードの高速パーサー（feed_parser）のテストスクリプト
+"""
+import feedparser
+
+from feed_parser import parse_feed
+
+RSS = """<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+  <channel>
+    <title>WIRED.jp</title>
+    <link>https://wired.jp/</link>
+    <item>
+      <title>AIが変える&lt;未来&gt;の働き方</title>
+      <link>https://wired.jp/article/ai-work/</link>
+      <guid isPermaLink="false">ai-work-1</guid>
+      <description>要約1</description>
+      <content:encoded><![CDATA[<p>本文1</p>]]></content:encoded>
+      <pubDate>Tue, 02 Sep 2025 09:30:00 +0900</pubDate>
+    </item>
+    <item>
+      <title> 宇宙ビジネスの最前線 </title>
+      <link> https://wired.jp/article/space/ </link>
+      <description>要約2</description>
+      <pubDate>Mon, 01 Sep 2025 23:00:00 GMT</pubDate>
+    </item>
+    <item>
+      <title>気候テックの現在地</title>
+      <link>https://wired.jp/article/climate/</link>
+      <pubDate>Sun, 31 Aug 2025 12:00:00 -0400</pubDate>
+    </item>
+  </channel>
+</rss>""".encode("utf-8")
+
+ATOM = """<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <title>Example Feed</title>
+  <id>urn:example:feed</id>
+  <updated>2025-09-02T10:00:00Z</updated>
+  <entry>
+    <title>Robots learn to cook</title>
+    <link rel="alternate" href="https://example.com/robots"/>
+    <link rel="enclosure" href="https://example.com/robots.mp3"/>
+    <id>urn:example:1</id>
+    <published>2025-09-02T09:00:00+09:00</published>
+    <updated>2025-09-02T10:00:00Z</updated>
+    <summary>Summary one</summary>
+  </entry>
+  <entry>
+    <title type="html">Chips &amp; batteries</title>
+    <link href="https://example.com/chips"/>
+    <id>urn:example:2</id>
+    <published>2025-09-01T08:00:00Z</published>
+    <content type="html">&lt;p&gt;Body two&lt;/p&gt;</content>
+  </entry>
+</feed>""".encode("utf-8")
+
+# RSS 1.0（RDF）は高速パーサーの対象外
+RDF = """<?xml version="1.0" encoding="UTF-8"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#" xmlns="http://purl.org/rss/1.0/">
+  <channel rdf:about="https://example.com/">
+    <title>RDF Feed</title>
+    <link>https://example.com/</link>
+  </channel>
+  <item rdf:about="https://example.com/rdf-item">
+    <title>RDF item</title>
+    <link>https://example.com/rdf-item</link>
+  </item>
+</rdf:RDF>""".encode("utf-8")
+
+
+def _fields(entries):
+    """比較する項目（タイトル・リンク・公開日時）"""
+    return [(entry.title, entry.link, tuple(entry.published_parsed)) for entry in entries]
+
+
+def test_rss_matches_feedparser():
+    """RSS 2.0 のタイトル・リンク・公開日時（UTC）が feedparser と一致する"""
+    print("\n=== RSS 2.0の解析テスト ===")
+    
+    fast = parse_feed(RSS, parser="fast")
+    expected = feedparser.parse(RSS)
+    
+    assert fast['parser'] == "fast" and not fast['bozo']
+    assert len(fast['entries']) == len(expected.entries) == 3
+    assert _fields(fast['entries']) == _fields(expected.entries)
+    assert fast['entries'][0].title == "AIが変える<未来>の働き方"
+    assert tuple(fast['entries'][0].published_parsed)[:6] == (2025, 9, 2, 0, 30, 0)
+    assert fast['entries'][0].content[0].value == expected.entries[0].content[0].value
+    assert [entry.summary for entry in fast['entries'][:2]] == [entry.summary for entry in expected.entries[:2]]
+
+
+def test_atom_matches_feedparser():
+    """Atom のタイトル・リンク（alternate）・公開日時（UTC）が feedparser と一致する"""
+    print("\n=== Atomの解析テスト ===")
+    
+    fast = parse_feed(ATOM, parser="fast")
+    expected = feedparser.parse(ATOM)
+    
+    assert fast['parser'] == "fast"
+    assert len(fast['entries']) == len(expected.entries) == 2
+    assert _fields(fast['entries']) == _fields(expected.entries)
+    assert fast['entries'][0].link == "https://example.com/robots"
+    assert [entry.id for entry in fast['entries']] == [entry.id for entry in expected.entries]
+
+
+def test_max_items_stops_early():
+    """max_items 件で解析を打ち切る"""
+    print("\n=== 件数上限のテスト ===")
+    
+    fast = parse_feed(RSS, max_items=2, parser="fast")
+    assert fast['parser'] == "fast"
+    assert _fields(fast['entries']) == _fields(feedparser.parse(RSS).entries[:2])
+
+
+def test_unexpected_feeds_fall_back_to_feedparser():
+    """想定外の形式・壊れたXMLは feedparser で解析する"""
+    print("\n=== feedparserへのフォールバックテスト ===")
+    
+    rdf = parse_feed(RDF, parser="fast")
+    assert rdf['parser'] == "feedparser"
+    assert [(entry.title, entry.link) for entry in rdf.entries] == [("RDF item", "https://example.com/rdf-item")]
+    
+    unparsable_date = RSS.replace(b"Sun, 31 Aug 2025 12:00:00 -0400", b"yesterday")
+    assert parse_feed(unparsable_date, parser="fast")['parser'] == "feedparser"
+    
+    xhtml = ATOM.replace(b'<summary>Summary one</summary>', b'<summary type="xhtml"><div>Summary</div></summary>')
+    assert parse_feed(xhtml, parser="fast")['parser'] == "feedparser"
+    
+    # 閉じタグのないXML: feedparser で解析し、読めたエントリと bozo を返す
+    truncated = RSS[:RSS.index(b"<item>", RSS.index(b"</item>"))] + b"<item><title>Broken"
+    broken = parse_feed(truncated, parser="fast")
+    expected = feedparser.parse(truncated)
+    assert broken['parser'] == "feedparser"
+    assert broken['bozo'] and broken['bozo'] == expected.bozo
+    assert [entry.get('link') for entry in broken.entries] == [entry.get('link') for entry in expected.entries]
+    assert broken.entries[0].link == "https://wired.jp/article/ai-work/"
+    
+    assert parse_feed(RSS, parser="feedparser")['parser'] == "feedparser"
+
+
+if __name__ == "__main__":
+    print("🚀 フィードの高速パーサーのテスト開始\n")
+    
+    test_rss_matches_feedparser()
+    test_atom_matches_feedparser()
+    test_max_items_stops_early()
+    test_unexpected_feeds_fall_back_to_feedparser()
+    
+    print("\n✅ すべてのテスト完了")
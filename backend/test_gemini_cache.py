@@ -0,0 +1,110 @@
+"""
+Gemini応答キャッシュ（gemini_cache）のテストスクリプト
+"""
+from types import SimpleNamespace
+
+import gemini_cache
+from cache_store import CacheStore
+from gemini_cache import GeminiResponseCache, generate_cached, response_key
+
+
+class FakeModel:
+    """generate_content の呼び出し回数を数える GenerativeModel の代わり"""
+    
+    def __init__(self, model_name: str = "models/gemini-test", system_instruction: str = None):
+        self.model_name = model_name
+        self._system_instruction = system_instruction
+        self.calls = 0
+    
+    def generate_content(self, prompt, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(text=f"応答{self.calls}: {prompt}", usage_metadata=None)
+
+
+def _memory_cache(memory_entries: int = 256) -> GeminiResponseCache:
+    return GeminiResponseCache(CacheStore(path=":memory:", table="gemini_cache"), memory_entries=memory_entries)
+
+
+def test_response_key():
+    """キーはモデル名・システム指示・生成設定・プロンプトで決まる"""
+    print("\n=== キャッシュキーのテスト ===")
+    
+    model = FakeModel()
+    key = response_key(model, "プロンプト")
+    
+    assert key == response_key(FakeModel(), "プロンプト")
+    assert len(key) == 64 and int(key, 16) >= 0
+    assert key != response_key(model, "別のプロンプト")
+    assert key != response_key(FakeModel("models/gemini-other"), "プロンプト")
+    assert key != response_key(FakeModel(system_instruction="日本語で答える"), "プロンプト")
+    
+    config = {"temperature": 0.2, "response_mime_type": "application/json"}
+    assert key != response_key(model, "プロンプト", config)
+    assert response_key(model, "プロンプト", config) == response_key(
+        model, "プロンプト", {"response_mime_type": "application/json", "temperature": 0.2, "top_p": None}
+    )
+
+
+def test_memory_lru_eviction():
+    """メモリ上は最近使った memory_entries 件のみ保持し、追い出した応答は2段目から返す"""
+    print("\n=== メモリLRUのテスト ===")
+    
+    cache = _memory_cache(memory_entries=2)
+    cache.put("a", "analysis", "A")
+    cache.put("b", "analysis", "B")
+    assert cache.get("a", "analysis") == "A"  # a を最近使ったものにする
+    cache.put("c", "analysis", "C")  # 最も古く使われた b を追い出す
+    
+    assert list(cache._memory) == ["a", "c"]
+    assert cache.get("b", "analysis") == "B"  # 2段目（SQLite）から取得し、メモリに戻す
+    assert list(cache._memory) == ["c", "b"]
+    assert cache.get("missing", "analysis") is None
+    
+    stats = cache.stats()
+    assert (stats['memory_hits'], stats['store_hits'], stats['misses']) == (1, 1, 1)
+    assert stats['memory_entries'] == 2
+
+
+def test_discard_and_uncached_kinds():
+    """discard() した応答・キャッシュしない種類の応答・空の応答は返さない"""
+    print("\n=== 削除・キャッシュしない種類のテスト ===")
+    
+    cache = _memory_cache()
+    cache.put("a", "analysis", "A")
+    cache.discard("a")
+    assert cache.get("a", "analysis") is None
+    
+    cache.put("b", "future_signal", "B")  # future_signal はキャッシュしない種類のため保存しない
+    assert cache.get("b", "future_signal") is None
+    cache.put("c", "analysis", "")
+    assert cache.get("c", "analysis") is None
+
+
+def test_generate_cached_skips_uncached_kinds():
+    """同じプロンプトでも analysis はキャッシュから返し、future_signal は毎回生成する"""
+    print("\n=== 種類ごとのキャッシュ利用のテスト ===")
+    
+    original = gemini_cache._gemini_cache
+    gemini_cache._gemini_cache = _memory_cache()
+    try:
+        model = FakeModel()
+        first = generate_cached(model, "記事を分析", "analysis")
+        assert generate_cached(model, "記事を分析", "analysis") == first
+        assert model.calls == 1
+        
+        signals = [generate_cached(model, "未来の兆し", "future_signal") for _ in range(2)]
+        assert model.calls == 3
+        assert signals[0] != signals[1]
+    finally:
+        gemini_cache._gemini_cache = original
+
+
+if __name__ == "__main__":
+    print("🚀 Gemini応答キャッシュのテスト開始\n")
+    
+    test_response_key()
+    test_memory_lru_eviction()
+    test_discard_and_uncached_kinds()
+    test_generate_cached_skips_uncached_kinds()
+    
+    print("\n✅ すべてのテスト完了")
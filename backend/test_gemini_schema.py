@@ -0,0 +1,114 @@
+"""
+Geminiの構造化出力（gemini_schema）の解析のテストスクリプト
+"""
+from gemini_schema import (
+    ANALYSIS, ANALYSIS_BATCH, DETAILED_SUMMARY, TOP5, StructuredOutputError, decode_json
+)
+
+ANALYSIS_JSON = (
+    '{"theme": "AI", "summary": "新しいモデルの発表", "key_points": ["推論", "価格"], '
+    '"sentiment_score": 0.8, "relevance_score": 0.9, "should_post": true}'
+)
+
+
+def _raises(func, *args) -> bool:
+    try:
+        func(*args)
+    except StructuredOutputError:
+        return True
+    return False
+
+
+def test_decode_plain_json():
+    """正しいJSONはそのまま解析する"""
+    print("\n=== JSONの解析テスト ===")
+    
+    assert decode_json('{"a": 1, "b": [1, 2]}') == {"a": 1, "b": [1, 2]}
+    assert decode_json('[{"a": "日本語"}]') == [{"a": "日本語"}]
+
+
+def test_decode_repairs_fenced_and_wrapped_json():
+    """コードブロック・前後の説明文・末尾のカンマを取り除いて解析し直す"""
+    print("\n=== JSONの修復テスト ===")
+    
+    expected = {"summary": "要約", "items": [1, 2]}
+    assert decode_json('```json\n{"summary": "要約", "items": [1, 2]}\n```') == expected
+    assert decode_json('```\n{"summary": "要約", "items": [1, 2]}\n```') == expected
+    assert decode_json('結果は次のとおりです。\n{"summary": "要約", "items": [1, 2]}\n以上です。') == expected
+    assert decode_json('{"summary": "要約", "items": [1, 2,],}') == expected
+    assert decode_json('```json\n[{"rank": 1,},]\n```') == [{"rank": 1}]
+
+
+def test_decode_rejects_truncated_json():
+    """途中で切れた応答・JSONでない応答は StructuredOutputError"""
+    print("\n=== 解析できない応答のテスト ===")
+    
+    for text in (
+        '{"summary": "途中で切れ',
+        '```json\n{"summary": "要約", "items": [1, 2\n```',
+        '{"summary": "要約", "items": [1, 2]',
+        "JSONではない応答",
+        "",
+    ):
+        assert _raises(decode_json, text), text
+    
+    try:
+        decode_json('{"summary": ')
+    except StructuredOutputError as e:
+        assert isinstance(e, ValueError)
+        assert str(e).startswith("JSONとして解析できません")
+    else:
+        raise AssertionError("StructuredOutputError が発生しませんでした")
+
+
+def test_parse_builds_typed_results():
+    """parse() は修復したJSONを種類ごとの結果オブジェクトに変換する"""
+    print("\n=== 結果オブジェクトへの変換テスト ===")
+    
+    analysis = ANALYSIS.parse(f"```json\n{ANALYSIS_JSON}\n```")
+    assert (analysis.theme, analysis.summary, analysis.key_points) == ("AI", "新しいモデルの発表", ["推論", "価格"])
+    assert (analysis.sentiment_score, analysis.relevance_score, analysis.should_post) == (0.8, 0.9, True)
+    assert analysis.index is None
+    
+    loose = ANALYSIS.parse(
+        '{"theme": " AI ", "summary": "要約", "key_points": "1点のみ", '
+        '"sentiment_score": 3, "relevance_score": "不明", "should_post": "yes"}'
+    )
+    assert (loose.theme, loose.key_points) == ("AI", ["1点のみ"])
+    assert (loose.sentiment_score, loose.relevance_score, loose.should_post) == (1.0, 0.5, True)
+    
+    picks = TOP5.parse(
+        '{"top5": [{"rank": 2, "article_number": 7, "reason": "b"}, {"rank": "1", "article_number": 3}]}'
+    )
+    assert [(pick.rank, pick.article_number, pick.reason) for pick in picks] == [(1, 3, ""), (2, 7, "b")]
+    
+    summary = DETAILED_SUMMARY.parse('{"summary": "詳細な要約",}')
+    assert (summary.summary, summary.key_point) == ("詳細な要約", "")
+
+
+def test_parse_rejects_missing_fields():
+    """必須の項目がない・空の場合は StructuredOutputError（まとめて分析した場合はその記事だけ除く）"""
+    print("\n=== 必須の項目のテスト ===")
+    
+    assert _raises(ANALYSIS.parse, '{"theme": "AI", "summary": "  "}')
+    assert _raises(ANALYSIS.parse, '["配列"]')
+    assert _raises(TOP5.parse, '{"top5": []}')
+    assert _raises(TOP5.parse, '{"top5": [{"rank": 1}]}')
+    assert _raises(DETAILED_SUMMARY.parse, '{"key_point": "要点"}')
+    
+    batch = ANALYSIS_BATCH.parse(
+        f'[{ANALYSIS_JSON[:-1]}, "index": 1}}, {{"theme": "AI", "index": 2}}, {ANALYSIS_JSON}]'
+    )
+    assert [analysis.index for analysis in batch] == [1]
+
+
+if __name__ == "__main__":
+    print("🚀 Geminiの構造化出力の解析テスト開始\n")
+    
+    test_decode_plain_json()
+    test_decode_repairs_fenced_and_wrapped_json()
+    test_decode_rejects_truncated_json()
+    test_parse_builds_typed_results()
+    test_parse_rejects_missing_fields()
+    
+    print("\n✅ すべてのテスト完了")
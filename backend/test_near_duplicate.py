@@ -0,0 +1,180 @@
+"""
+類似記事の検出（SimHash・NearDuplicateIndex）のテストスクリプト
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import near_duplicate
+from near_duplicate import NearDuplicateIndex, simhash
+
+TITLE = "OpenAI unveils new reasoning model"
+ARTICLE = " ".join([
+    "OpenAI announced a new reasoning model on Tuesday that the company says can solve complex math and coding "
+    "problems more reliably than its predecessors, while costing less to run.",
+    "The model will be available to paying subscribers first and to developers through the API later this month, "
+    "according to a post on the company blog.",
+    "In internal benchmarks the system scored higher on competition mathematics and graduate level science questions, "
+    "although the company cautioned that the results have not been independently verified.",
+    "Researchers outside the company said the approach of spending more computation at inference time is becoming "
+    "common across the industry, and that rivals are expected to respond quickly.",
+    "The launch comes as regulators in Europe and the United States examine how large language models are trained "
+    "and whether their outputs can be audited by third parties.",
+    "Executives said the new model was trained with additional safety measures intended to reduce harmful answers, "
+    "and that it would refuse a wider range of dangerous requests than earlier versions.",
+])
+UNRELATED_TITLE = "City hit by overnight floods"
+UNRELATED = " ".join([
+    "Heavy rain caused flooding across several districts of the city overnight, forcing schools to close and "
+    "disrupting train services during the morning commute, according to local officials.",
+    "Emergency crews rescued dozens of residents from cars stranded on submerged roads, and the weather agency "
+    "warned that more storms could arrive over the weekend.",
+    "Farmers in the surrounding region said the downpour had destroyed crops that were weeks away from harvest, and "
+    "local officials requested disaster relief funds from the national government.",
+    "Insurance companies estimated that damage claims could reach record levels for the season, while engineers "
+    "began inspecting bridges and levees for structural problems.",
+])
+
+
+class _Clock(datetime):
+    """near_duplicate の現在時刻（datetime.utcnow）を差し替えるためのクラス"""
+    
+    current = None
+    
+    @classmethod
+    def utcnow(cls):
+        return cls.current
+
+
+@contextmanager
+def _frozen_clock(start: datetime):
+    _Clock.current = start
+    near_duplicate.datetime = _Clock
+    try:
+        yield _Clock
+    finally:
+        near_duplicate.datetime = datetime
+
+
+def test_simhash_is_deterministic():
+    """同じタイトル・本文からは常に同じフィンガープリント"""
+    print("\n=== SimHashの再現性テスト ===")
+    
+    assert simhash(TITLE, ARTICLE) == simhash(TITLE, ARTICLE)
+    assert 0 < simhash(TITLE, ARTICLE) < 1 << 64
+    assert simhash("", "") == 0
+
+
+def test_near_identical_articles_collide():
+    """別URLへの転載・軽微な修正はしきい値以内、無関係な記事は対象外"""
+    print("\n=== 類似記事の検出テスト ===")
+    
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("https://a.example/original", simhash(TITLE, ARTICLE))
+    
+    variants = {
+        "reposted": (TITLE, ARTICLE),
+        "one word changed": (TITLE, ARTICLE.replace("on Tuesday", "on Wednesday")),
+        "sentence appended": (TITLE, ARTICLE + " Pricing details were not disclosed."),
+        "title edited": ("OpenAI unveils a new reasoning model", ARTICLE),
+    }
+    for name, (title, content) in variants.items():
+        match = index.query(simhash(title, content))
+        print(f"  {name}: {match}")
+        assert match is not None and match[0] == "https://a.example/original", name
+        assert match[1] <= index.max_distance
+    
+    assert index.query(simhash(TITLE, ARTICLE))[1] == 0
+    assert index.query(simhash(UNRELATED_TITLE, UNRELATED)) is None
+    assert index.query(simhash(TITLE, ARTICLE), exclude_url="https://a.example/original") is None
+
+
+def test_matches_returns_every_match_within_threshold():
+    """しきい値以内の記事をすべて、距離の近い順に返す"""
+    print("\n=== しきい値以内の全件検索テスト ===")
+    
+    index = NearDuplicateIndex(threshold=0.9)
+    index.add("https://a.example/edited", simhash(TITLE, ARTICLE.replace("on Tuesday", "on Wednesday")))
+    index.add("https://b.example/copy", simhash(TITLE, ARTICLE))
+    index.add("https://c.example/floods", simhash(UNRELATED_TITLE, UNRELATED))
+    
+    found = index.matches(simhash(TITLE, ARTICLE))
+    assert [url for url, _ in found] == ["https://b.example/copy", "https://a.example/edited"]
+    assert found[0][1] == 0 < found[1][1] <= index.max_distance
+
+
+def test_posted_match_behind_closer_unposted_match_is_excluded():
+    """最も近い記事が未投稿でも、しきい値以内に投稿済みの記事があれば候補から除外する"""
+    print("\n=== 投稿済みの類似記事の除外テスト ===")
+    
+    import wired_bluesky_bot_advanced as bot_module
+    
+    posted_index = NearDuplicateIndex(threshold=0.9)
+    posted_index.add("https://b.example/unposted-copy", simhash(TITLE, ARTICLE))
+    posted_index.add("https://a.example/posted", simhash(TITLE, ARTICLE.replace("on Tuesday", "on Wednesday")))
+    articles = [
+        {"url": "https://c.example/candidate", "title": TITLE, "content": ARTICLE},
+        {"url": "https://c.example/floods", "title": UNRELATED_TITLE, "content": UNRELATED},
+    ]
+    
+    original = bot_module.get_near_duplicate_index
+    bot_module.get_near_duplicate_index = lambda db: posted_index
+    try:
+        kept = bot_module.WiredBlueskyBotAdvanced._exclude_near_duplicates(
+            None, None, articles, {"https://a.example/posted"}
+        )
+    finally:
+        bot_module.get_near_duplicate_index = original
+    
+    assert [a["url"] for a in kept] == ["https://c.example/floods"]
+
+
+def test_index_evicts_entries_outside_window():
+    """期間（window_days）より古い記事は照会の対象外になり、prune() でメモリからも取り除かれる"""
+    print("\n=== 期間外の記事の除去テスト ===")
+    
+    start = datetime(2025, 9, 1, 12, 0)
+    with _frozen_clock(start) as clock:
+        index = NearDuplicateIndex(threshold=0.9, window_days=7)
+        index.add("https://a.example/too-old", simhash(TITLE, ARTICLE), start - timedelta(days=8))
+        index.add("https://a.example/old", simhash(TITLE, ARTICLE), start - timedelta(days=6))
+        index.add("https://a.example/new", simhash(TITLE, ARTICLE), start)
+        assert len(index) == 2  # 登録時点で期間外の記事は登録しない
+        assert {url for url, _ in index.matches(simhash(TITLE, ARTICLE))} == {
+            "https://a.example/old", "https://a.example/new"
+        }
+        
+        # 2日後: "old" は期間外になり、prune() で取り除かれる
+        clock.current = start + timedelta(days=2)
+        assert index.prune(force=True) == 1
+        assert len(index) == 1
+        bucket_urls = {url for buckets in index._buckets for entries in buckets.values() for url, _ in entries}
+        assert bucket_urls == {"https://a.example/new"}
+        
+        # 前回の prune() から PRUNE_INTERVAL が経つまでは、期間外になった記事も照会の対象外にする
+        index.add("https://a.example/edge", simhash(TITLE, ARTICLE), clock.current - timedelta(days=7, minutes=-10))
+        clock.current += timedelta(minutes=20)
+        assert [url for url, _ in index.matches(simhash(TITLE, ARTICLE))] == ["https://a.example/new"]
+        assert len(index) == 2
+        
+        # PRUNE_INTERVAL が経つと、照会のついでに取り除かれる
+        clock.current += near_duplicate.PRUNE_INTERVAL
+        assert [url for url, _ in index.matches(simhash(TITLE, ARTICLE))] == ["https://a.example/new"]
+        assert len(index) == 1
+        
+        # 無期限（window_days=0）の場合は取り除かない
+        unbounded = NearDuplicateIndex(threshold=0.9, window_days=0)
+        unbounded.add("https://a.example/ancient", simhash(TITLE, ARTICLE), start - timedelta(days=365))
+        assert unbounded.prune(force=True) == 0
+        assert unbounded.query(simhash(TITLE, ARTICLE)) == ("https://a.example/ancient", 0)
+
+
+if __name__ == "__main__":
+    print("🚀 類似記事の検出テスト開始\n")
+    
+    test_simhash_is_deterministic()
+    test_near_identical_articles_collide()
+    test_matches_returns_every_match_within_threshold()
+    test_posted_match_behind_closer_unposted_match_is_excluded()
+    test_index_evicts_entries_outside_window()
+    
+    print("\n✅ すべてのテスト完了")
@@ -0,0 +1,90 @@
+"""
+記事本文の先読み（ArticlePrefetcher）のテストスクリプト
+"""
+import threading
+
+from prefetcher import ArticlePrefetcher
+from deadline import Deadline
+
+
+class FakeFetcher:
+    """ネットワークを使わずに記事を返す ArticleFetcher の代わり"""
+    
+    timeout = 10
+    
+    def __init__(self):
+        self.urls = []
+        self._lock = threading.Lock()
+    
+    def fetch_from_url(self, url, timeout=None):
+        with self._lock:
+            self.urls.append(url)
+        return {'url': url, 'title': url, 'content': f"{url} の本文"}
+
+
+def _articles(count):
+    return [{'url': f"https://example.com/{i}"} for i in range(count)]
+
+
+def test_prefetch_limits_candidates():
+    """先頭 max_articles 件のみ先読みし、残りはスキップとして数える"""
+    print("\n=== 先読みの件数上限テスト ===")
+    
+    fetcher = FakeFetcher()
+    prefetcher = ArticlePrefetcher(fetcher, max_workers=2, max_articles=3).start(_articles(5))
+    try:
+        article = prefetcher.get("https://example.com/0", timeout=5)
+        for i in (1, 2):
+            prefetcher.get(f"https://example.com/{i}", timeout=5)
+    finally:
+        prefetcher.close()
+    
+    assert article['content'] == "https://example.com/0 の本文"
+    assert prefetcher.get("https://example.com/4") is None
+    assert sorted(fetcher.urls) == [f"https://example.com/{i}" for i in range(3)]
+    assert prefetcher.stats() == {'submitted': 3, 'hits': 3, 'skipped': 2}
+    print("✅ 先頭3件のみ先読み")
+
+
+def test_prefetch_skips_after_deadline():
+    """期限切れの後は取得しない"""
+    print("\n=== 先読みの期限テスト ===")
+    
+    fetcher = FakeFetcher()
+    prefetcher = ArticlePrefetcher(fetcher, max_workers=1).start(_articles(2), deadline=Deadline(0.001))
+    try:
+        results = [prefetcher.get(article['url'], timeout=5) for article in _articles(2)]
+    finally:
+        prefetcher.close()
+    
+    assert results == [None, None]
+    assert fetcher.urls == []
+    assert prefetcher.stats()['skipped'] == 2
+    print("✅ 期限切れの記事は取得しない")
+
+
+def test_prefetch_summary():
+    """実行ログのサマリー（WiredBlueskyBotAdvanced._run で表示）が stats() から作れる"""
+    print("\n=== 先読みのサマリーテスト ===")
+    
+    fetcher = FakeFetcher()
+    prefetcher = ArticlePrefetcher(fetcher, max_workers=1, max_articles=2).start(_articles(3))
+    try:
+        prefetcher.get("https://example.com/0", timeout=5)
+        prefetcher.get("https://example.com/1", timeout=5)
+    finally:
+        prefetcher.close()
+    
+    summary = prefetcher.summary()
+    print(f"📊 {summary}")
+    assert summary == "先読み: 2/2件を利用（スキップ: 1件）"
+
+
+if __name__ == "__main__":
+    print("🚀 記事本文の先読みテスト開始\n")
+    
+    test_prefetch_limits_candidates()
+    test_prefetch_skips_after_deadline()
+    test_prefetch_summary()
+    
+    print("\n✅ すべてのテスト完了")
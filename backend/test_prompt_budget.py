@@ -0,0 +1,114 @@
+"""
+トークン数の予算に合わせたプロンプトの組み立て（prompt_budget）のテストスクリプト
+"""
+from types import SimpleNamespace
+
+import prompt_budget
+from gemini_quota import estimate_tokens
+from prompt_budget import allocate_tokens, fit_prompt, trim_to_tokens
+
+JA = "これは最初の文です。これは二番目の文です。これは三番目の文です。"
+EN = "The first sentence is here. The second one follows it. A third sentence ends the text."
+
+
+def test_estimate_tokens():
+    """日本語は1文字1トークン、それ以外は4文字で1トークン"""
+    print("\n=== 推定トークン数のテスト ===")
+    
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("日本語") == 3
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("日本語abcd") == 4
+
+
+def test_trim_to_tokens_keeps_text_within_budget():
+    """予算内のテキストはそのまま、超える場合は文の区切りで予算以内に切り詰める"""
+    print("\n=== 予算での切り詰めのテスト ===")
+    
+    assert trim_to_tokens(JA, 100) == JA
+    assert trim_to_tokens(EN, estimate_tokens(EN)) == EN
+    assert trim_to_tokens(JA, 15) == "これは最初の文です。"
+    assert trim_to_tokens(JA, 20) == "これは最初の文です。これは二番目の文です。"
+    assert trim_to_tokens(EN, 15) == "The first sentence is here. The second one follows it."
+    assert trim_to_tokens(None, 10) == ""
+    assert trim_to_tokens(JA, 0) == ""
+    
+    for text in (JA, EN, JA + EN, "x" * 200):
+        for budget in range(1, estimate_tokens(text) + 1):
+            trimmed = trim_to_tokens(text, budget)
+            assert estimate_tokens(trimmed) <= budget, (text, budget)
+            assert text.startswith(trimmed)
+
+
+def test_allocate_tokens_shares_leftover_budget():
+    """短い項目は全文を使い、余った予算を長い項目で分け合う"""
+    print("\n=== 予算の配分のテスト ===")
+    
+    fields = {'short': "短い。", 'long1': JA * 10, 'long2': JA * 10}
+    allocated = allocate_tokens(fields, 60)
+    
+    assert allocated['short'] == "短い。"
+    assert allocated['long1'] == allocated['long2'] == "これは最初の文です。これは二番目の文です。"
+    assert sum(estimate_tokens(text) for text in allocated.values()) <= 60
+    assert allocate_tokens(fields, 1000) == fields
+    assert allocate_tokens(fields, 0) == {'short': "", 'long1': "", 'long2': ""}
+
+
+def _render(fields):
+    return f"次の記事を要約してください。\n\nタイトル: {fields['title']}\n本文: {fields['content']}"
+
+
+def test_fit_prompt_stays_within_budget():
+    """固定の指示文は残し、項目を切り詰めてプロンプト全体を予算以内にする"""
+    print("\n=== プロンプトの組み立てのテスト ===")
+    
+    fields = {'title': "新しいモデルの発表", 'content': JA * 50}
+    prompt = fit_prompt(_render, fields, 120)
+    
+    assert estimate_tokens(prompt) <= 120
+    assert prompt.startswith("次の記事を要約してください。\n\nタイトル: 新しいモデルの発表\n本文: これは最初の文です。")
+    assert prompt.endswith("。")
+    assert fit_prompt(_render, {'title': "短い", 'content': "本文。"}, 120) == _render(
+        {'title': "短い", 'content': "本文。"}
+    )
+
+
+def test_fit_prompt_count_tokens_correction():
+    """count_tokens の結果が予算を超えた場合は、1回だけ縮めた予算で組み立て直す"""
+    print("\n=== count_tokensでの補正のテスト ===")
+    
+    class DoubleCountModel:
+        """推定の2倍のトークン数を返すモデル"""
+        
+        def __init__(self):
+            self.calls = 0
+        
+        def count_tokens(self, prompt):
+            self.calls += 1
+            return SimpleNamespace(total_tokens=estimate_tokens(prompt) * 2)
+    
+    fields = {'title': "新しいモデルの発表", 'content': JA * 50}
+    model = DoubleCountModel()
+    original = prompt_budget.GEMINI_COUNT_TOKENS
+    prompt_budget.GEMINI_COUNT_TOKENS = True
+    try:
+        prompt = fit_prompt(_render, fields, 120, model=model)
+    finally:
+        prompt_budget.GEMINI_COUNT_TOKENS = original
+    
+    # 推定では予算ちょうど（120）→ 実際は240トークン → 予算を 120 × 120 / 240 = 60 に縮めて組み立て直す
+    assert estimate_tokens(fit_prompt(_render, fields, 120)) == 120
+    assert model.calls == 1
+    assert 0 < estimate_tokens(prompt) <= 60
+
+
+if __name__ == "__main__":
+    print("🚀 プロンプトの予算のテスト開始\n")
+    
+    test_estimate_tokens()
+    test_trim_to_tokens_keeps_text_within_budget()
+    test_allocate_tokens_shares_leftover_budget()
+    test_fit_prompt_stays_within_budget()
+    test_fit_prompt_count_tokens_correction()
+    
+    print("\n✅ すべてのテスト完了")
@@ -2,9 +2,10 @@
 URL短縮機能モジュール
 """
 import os
-import requests
 from typing import Optional
 
+from http_transport import get_http_session
+
 
 class URLShortener:
     """URL短縮クラス"""
@@ -13,13 +14,15 @@ class URLShortener:
         """初期化"""
         # TinyURL APIを使用（無料、APIキー不要）
         self.tinyurl_api = "https://tinyurl.com/api-create.php"
+        self.session = get_http_session()  # 接続を再利用（呼び出しごとのTLSハンドシェイクを省く）
     
-    def shorten(self, url: str) -> Optional[str]:
+    def shorten(self, url: str, timeout: float = 10) -> Optional[str]:
         """
         URLを短縮
         
         Args:
             url: 短縮するURL
+            timeout: TinyURL APIのタイムアウト（秒）
         
         Returns:
             短縮されたURL、または元のURL（エラー時）
@@ -29,10 +32,10 @@ class URLShortener:
         
         try:
             # TinyURL APIを使用
-            response = requests.get(
+            response = self.session.get(
                 self.tinyurl_api,
                 params={"url": url},
-                timeout=10
+                timeout=timeout
             )
             
             if response.status_code == 200:
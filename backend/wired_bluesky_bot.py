@@ -10,6 +10,8 @@ from gemini_analyzer import GeminiAnalyzer
 from twitter_poster import SocialPoster
 from url_shortener import URLShortener
 from database import SessionLocal, get_recently_posted_urls, mark_article_as_posted
+from gemini_schema import TOP5, DETAILED_SUMMARY
+from prompt_budget import fit_prompt, prompt_tokens
 
 
 class WiredBlueskyBot:
@@ -74,16 +76,16 @@ class WiredBlueskyBot:
         
         print(f"\n🤖 Geminiで重要度TOP5を選定中... (候補: {len(articles)}件)")
         
-        # 記事リストを整形
-        articles_text = ""
-        for i, article in enumerate(articles, 1):
-            title = article.get('title', '無題')
-            content = article.get('content', '')[:200]  # 最初の200文字
-            url = article.get('url', '')
-            articles_text += f"{i}. タイトル: {title}\n   URL: {url}\n   概要: {content}\n\n"
-        
-        # Geminiに依頼
-        prompt = f"""以下の{len(articles)}件のWIRED記事の中から、技術トレンド・イノベーション・未来への影響度を基準に重要度TOP5を選んでください。
+        # 記事リストを整形（候補記事の概要で入力トークン数の予算を分け合う）
+        def render(contents):
+            articles_text = ""
+            for i, article in enumerate(articles, 1):
+                title = article.get('title', '無題')
+                url = article.get('url', '')
+                articles_text += f"{i}. タイトル: {title}\n   URL: {url}\n   概要: {contents[i]}\n\n"
+            
+            # Geminiに依頼
+            return f"""以下の{len(articles)}件のWIRED記事の中から、技術トレンド・イノベーション・未来への影響度を基準に重要度TOP5を選んでください。
 
 {articles_text}
 
@@ -100,26 +102,22 @@ class WiredBlueskyBot:
 }}
 """
         
+        prompt = fit_prompt(
+            render,
+            {i: article.get('content') or '' for i, article in enumerate(articles, 1)},
+            prompt_tokens('top5'), self.analyzer.model
+        )
+        
         try:
-            import json
-            response = self.analyzer.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # JSONを抽出
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
-            top5_indices = [item['article_number'] - 1 for item in result['top5']]
+            picks = self.analyzer.generate_structured(prompt, TOP5)
             
             top5_articles = []
-            for i, idx in enumerate(top5_indices, 1):
+            for i, pick in enumerate(picks[:5], 1):
+                idx = pick.article_number - 1
                 if 0 <= idx < len(articles):
                     article = articles[idx].copy()
                     article['rank'] = i
-                    article['reason'] = result['top5'][i-1].get('reason', '')
+                    article['reason'] = pick.reason
                     top5_articles.append(article)
                     print(f"  {i}位: {article['title'][:50]}...")
             
@@ -145,33 +143,26 @@ class WiredBlueskyBot:
         title = article.get('title', '')
         content = article.get('content', '')
         
-        prompt = f"""以下のWIRED記事を日本語で要約してください。
+        prompt = fit_prompt(
+            lambda fields: f"""以下のWIRED記事を日本語で要約してください。
 
 タイトル: {title}
-本文: {content[:1000]}
+本文: {fields['content']}
 
 以下のJSON形式で回答してください（余計な説明は不要、JSONのみ）:
 {{
     "summary": "記事の要旨（150文字以内、できるだけ詳しく）",
     "key_point": "最も重要なポイント（100文字以内）"
 }}
-"""
+""",
+            {'content': content or ''}, prompt_tokens('summary'), self.analyzer.model
+        )
         
         try:
-            import json
-            response = self.analyzer.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # JSONを抽出
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
+            result = self.analyzer.generate_structured(prompt, DETAILED_SUMMARY)
             return {
-                'summary': result.get('summary', ''),
-                'key_point': result.get('key_point', '')
+                'summary': result.summary,
+                'key_point': result.key_point
             }
             
         except Exception as e:
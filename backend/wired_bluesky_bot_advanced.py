@@ -12,12 +12,25 @@ from gemini_analyzer import GeminiAnalyzer
 from twitter_poster import SocialPoster
 from url_shortener import URLShortener
 from database import SessionLocal, get_recently_posted_urls, mark_article_as_posted
+from near_duplicate import NearDuplicateIndex, simhash, get_near_duplicate_index
+from feed_scheduler import get_feed_poll_scheduler
+from prefetcher import ArticlePrefetcher, DISABLE_PREFETCH
+from http_transport import get_transport_stats
+from deadline import Deadline, BOT_POST_RESERVE_SECONDS, MIN_CALL_SECONDS
+from gemini_cache import get_gemini_cache
+from gemini_async import run_sync, gather_bounded
+from gemini_quota import gemini_priority, get_quota_governor
+from gemini_schema import TOP5, DETAILED_SUMMARY
+from prompt_budget import fit_prompt, fit_prompt_async, prompt_tokens
+
+# Gemini APIの1回の呼び出しのタイムアウト（秒、実行の残り時間が少ない場合はさらに短くする）
+GEMINI_TIMEOUT_SECONDS = float(os.getenv("GEMINI_TIMEOUT_SECONDS", "60"))
 
 
 class WiredBlueskyBotAdvanced:
     """WIRED記事をBlueskyに投稿するボット（改良版）"""
     
-    # WIREDのRSSフィード（質重視型、3時間ごとに切り替え、8カテゴリ対応）
+    # WIREDのRSSフィード（質重視型、更新頻度に応じて切り替え、8カテゴリ対応）
     WIRED_RSS_FEEDS = [
         {
             "url": "https://www.wired.com/feed/category/business/rss",
@@ -59,6 +72,8 @@ class WiredBlueskyBotAdvanced:
         self.analyzer = GeminiAnalyzer()
         self.poster = SocialPoster()
         self.url_shortener = URLShortener()
+        self.poll_scheduler = get_feed_poll_scheduler()
+        self.prefetcher = None  # run() 中の記事本文の先読み
         print("✅ WiredBlueskyBotAdvanced初期化完了")
     
     def _get_current_feed_index(self) -> int:
@@ -78,18 +93,45 @@ class WiredBlueskyBotAdvanced:
         feed_index = (current_hour // 3) % len(self.WIRED_RSS_FEEDS)
         return feed_index
     
-    def fetch_wired_articles(self, max_items: int = 30) -> List[Dict]:
+    def _select_feed_index(self) -> int:
+        """
+        更新頻度に基づいて使用するフィードを決定
+        
+        前回の取得からの経過時間が推定更新間隔を最も超えているフィードを選ぶ
+        （更新の多いフィードほど頻繁に選ばれる）。同率の場合や初回は時刻ベースの順番を優先。
+        
+        Returns:
+            使用するフィードのインデックス（0-7）
         """
-        WIREDのRSSフィードから記事を取得（3時間ごとに分野を切り替え、日本時間基準）
+        start = self._get_current_feed_index()
+        if self.poll_scheduler is None:
+            return start
+        
+        count = len(self.WIRED_RSS_FEEDS)
+        order = [(start + i) % count for i in range(count)]
+        try:
+            ratios = {
+                i: self.poll_scheduler.overdue_ratio(self.WIRED_RSS_FEEDS[i]['url'])
+                for i in order
+            }
+        except Exception as e:
+            print(f"⚠️ フィードの更新頻度の取得エラー: {e}")
+            return start
+        return max(order, key=lambda i: ratios[i])
+    
+    def fetch_wired_articles(self, max_items: int = 30, deadline: Deadline = None) -> List[Dict]:
+        """
+        WIREDのRSSフィードから記事を取得（更新頻度に応じて分野を切り替え）
         
         Args:
             max_items: 取得する最大記事数
+            deadline: この段階の期限（Noneの場合は無制限）
         
         Returns:
             記事のリスト
         """
-        # 現在使用するフィードを決定
-        feed_index = self._get_current_feed_index()
+        # 現在使用するフィードを決定（更新頻度の高いフィードを優先）
+        feed_index = self._select_feed_index()
         selected_feed = self.WIRED_RSS_FEEDS[feed_index]
         
         print(f"\n📡 WIREDから記事を取得中... (最大{max_items}件)")
@@ -97,21 +139,34 @@ class WiredBlueskyBotAdvanced:
         print(f"🔗 RSSフィード: {selected_feed['url']}")
         
         # 選択されたフィードから記事を取得
-        articles = self.fetcher.fetch_from_rss(selected_feed['url'], max_items)
+        deadline = deadline or Deadline()
+        articles = self.fetcher.fetch_from_rss(
+            selected_feed['url'], max_items, timeout=deadline.timeout(self.fetcher.timeout)
+        )
         
         if not articles:
             print("⚠️ 記事の取得に失敗しました")
             return []
         
+        # 新着の到着間隔を記録（次回以降のフィード選択に使用）
+        if self.poll_scheduler:
+            try:
+                self.poll_scheduler.record_poll(
+                    selected_feed['url'], [a.get('published_at') for a in articles]
+                )
+            except Exception as e:
+                print(f"⚠️ ポーリング間隔の更新エラー: {e}")
+        
         print(f"✅ {len(articles)}件の記事を取得しました")
         return articles
     
-    def fetch_article_content(self, article: Dict) -> Dict:
+    def fetch_article_content(self, article: Dict, deadline: Deadline = None) -> Dict:
         """
-        記事のURLから本文を取得
+        記事のURLから本文を取得（期限までに取得できない場合はRSSの概要のまま）
         
         Args:
             article: 記事の辞書
+            deadline: この記事の本文取得の期限（Noneの場合は無制限）
         
         Returns:
             本文を含む記事の辞書
@@ -120,8 +175,17 @@ class WiredBlueskyBotAdvanced:
         if not url:
             return article
         
+        deadline = deadline or Deadline()
         try:
-            full_article = self.fetcher.fetch_from_url(url)
+            # 先読み済み（または先読み中）の本文があれば使用（期限まで待つ）
+            full_article = None
+            if self.prefetcher:
+                full_article = self.prefetcher.get(url, timeout=deadline.remaining() if deadline.bounded else None)
+            if full_article is None:
+                if deadline.expired(MIN_CALL_SECONDS):
+                    print(f"  ⏱️ 時間切れのため本文取得を省略（RSSの概要で要約）")
+                    return article
+                full_article = self.fetcher.fetch_from_url(url, timeout=deadline.timeout(self.fetcher.timeout))
             if full_article and full_article.get('content'):
                 article['full_content'] = full_article['content']
                 print(f"  ✓ 本文取得成功: {len(full_article['content'])}文字")
@@ -132,12 +196,13 @@ class WiredBlueskyBotAdvanced:
         
         return article
     
-    def select_top5_with_gemini(self, articles: List[Dict]) -> List[Dict]:
+    def select_top5_with_gemini(self, articles: List[Dict], deadline: Deadline = None) -> List[Dict]:
         """
         GeminiにTOP5を選定してもらう（過去24時間以内に投稿した記事を除外）
         
         Args:
             articles: 記事のリスト
+            deadline: この段階の期限（Noneの場合は無制限、時間切れの場合は先頭の5件）
         
         Returns:
             TOP5の記事リスト
@@ -168,21 +233,33 @@ class WiredBlueskyBotAdvanced:
                     return []
             else:
                 print(f"\n📊 過去24時間以内の投稿履歴: なし")
+            
+            # 類似記事を除外（同じ記事の別URL、過去24時間以内に投稿した記事の別URL）
+            articles = self._exclude_near_duplicates(db, articles, recent_urls)
+            if not articles:
+                print("⚠️ すべての記事が投稿済みの記事と類似しています")
+                return []
         finally:
             db.close()
         
-        print(f"\n🤖 Geminiで重要度TOP5を選定中... (候補: {len(articles)}件)")
+        deadline = deadline or Deadline()
+        timeout = deadline.timeout(GEMINI_TIMEOUT_SECONDS)
+        if timeout < MIN_CALL_SECONDS:
+            print("⏱️ 時間切れのためGeminiでの選定を省略: 最初の5件を使用します")
+            return articles[:5]
         
-        # 記事リストを整形
-        articles_text = ""
-        for i, article in enumerate(articles, 1):
-            title = article.get('title', '無題')
-            content = article.get('content', '')[:300]  # 最初の300文字
-            url = article.get('url', '')
-            articles_text += f"{i}. タイトル: {title}\n   URL: {url}\n   概要: {content}\n\n"
+        print(f"\n🤖 Geminiで重要度TOP5を選定中... (候補: {len(articles)}件)")
         
-        # Geminiに依頼
-        prompt = f"""以下の{len(articles)}件のWIRED記事の中から、技術トレンド・イノベーション・未来への影響度を基準に重要度TOP5を選んでください。
+        # 記事リストを整形（候補記事の概要で入力トークン数の予算を分け合う）
+        def render(contents):
+            articles_text = ""
+            for i, article in enumerate(articles, 1):
+                title = article.get('title', '無題')
+                url = article.get('url', '')
+                articles_text += f"{i}. タイトル: {title}\n   URL: {url}\n   概要: {contents[i]}\n\n"
+            
+            # Geminiに依頼
+            return f"""以下の{len(articles)}件のWIRED記事の中から、技術トレンド・イノベーション・未来への影響度を基準に重要度TOP5を選んでください。
 
 {articles_text}
 
@@ -199,26 +276,24 @@ class WiredBlueskyBotAdvanced:
 }}
 """
         
+        prompt = fit_prompt(
+            render,
+            {i: article.get('content') or '' for i, article in enumerate(articles, 1)},
+            prompt_tokens('top5'), self.analyzer.model
+        )
+        
         try:
-            import json
-            response = self.analyzer.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # JSONを抽出
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
-            top5_indices = [item['article_number'] - 1 for item in result['top5']]
+            picks = self.analyzer.generate_structured(
+                prompt, TOP5, request_options={'timeout': timeout}
+            )
             
             top5_articles = []
-            for i, idx in enumerate(top5_indices, 1):
+            for i, pick in enumerate(picks[:5], 1):
+                idx = pick.article_number - 1
                 if 0 <= idx < len(articles):
                     article = articles[idx].copy()
                     article['rank'] = i
-                    article['reason'] = result['top5'][i-1].get('reason', '')
+                    article['reason'] = pick.reason
                     top5_articles.append(article)
                     print(f"  {i}位: {article['title'][:50]}...")
             
@@ -231,12 +306,75 @@ class WiredBlueskyBotAdvanced:
             print("⚠️ フォールバック: 最初の5件を使用します")
             return articles[:5]
     
-    def create_detailed_summary(self, article: Dict) -> Dict:
+    def _exclude_near_duplicates(self, db, articles: List[Dict], recent_urls: set) -> List[Dict]:
+        """
+        類似記事を除外（候補内で重複するもの、過去24時間以内に投稿した記事と類似するもの）
+        
+        Args:
+            db: データベースセッション
+            articles: 記事のリスト
+            recent_urls: 過去24時間以内に投稿した記事のURL
+        
+        Returns:
+            類似記事を除いた記事のリスト
+        """
+        posted_index = get_near_duplicate_index(db)
+        if posted_index is None:
+            return articles
+        
+        candidates = NearDuplicateIndex()
+        kept = []
+        for article in articles:
+            url = article.get('url', '')
+            fingerprint = simhash(article.get('title', ''), article.get('content', ''))
+            duplicate = candidates.query(fingerprint)
+            if not duplicate:
+                # 最も近い記事が未投稿でも、しきい値以内に投稿済みの記事があれば除外
+                duplicate = next(
+                    (match for match in posted_index.matches(fingerprint, exclude_url=url) if match[0] in recent_urls),
+                    None
+                )
+            
+            if duplicate:
+                print(f"   類似記事を除外: {article.get('title', 'N/A')[:50]}... ({duplicate[0]})")
+                continue
+            candidates.add(url, fingerprint)
+            kept.append(article)
+        return kept
+    
+    def create_detailed_summary(self, article: Dict, deadline: Deadline = None) -> Dict:
+        """create_detailed_summary_async の同期版（記事本文から詳細な要約を生成）"""
+        return run_sync(self.create_detailed_summary_async(article, deadline))
+    
+    def create_detailed_summaries(self, articles: List[Dict], deadline: Deadline = None) -> List[Dict]:
+        """
+        複数の記事の詳細な要約を並列に生成（同時実行数はGEMINI_MAX_CONCURRENCY）
+        
+        Args:
+            articles: 記事の辞書のリスト
+            deadline: すべての要約の期限（Noneの場合は無制限）
+        
+        Returns:
+            要約を含む辞書のリスト（入力と同じ順序）
+        """
+        results = run_sync(gather_bounded(
+            self.create_detailed_summary_async(article, deadline) for article in articles
+        ))
+        return [
+            result if isinstance(result, dict) else {
+                'summary': '記事の要約を生成できませんでした。詳細はリンクからご確認ください。',
+                'key_point': ''
+            }
+            for result in results
+        ]
+    
+    async def create_detailed_summary_async(self, article: Dict, deadline: Deadline = None) -> Dict:
         """
         記事本文から詳細な要約を生成
         
         Args:
             article: 記事の辞書
+            deadline: この記事の要約の期限（Noneの場合は無制限）
         
         Returns:
             要約を含む辞書
@@ -247,32 +385,36 @@ class WiredBlueskyBotAdvanced:
         if not content:
             return {'summary': '', 'key_point': ''}
         
-        prompt = f"""以下のWIRED記事を日本語で要約してください。
+        deadline = deadline or Deadline()
+        timeout = deadline.timeout(GEMINI_TIMEOUT_SECONDS)
+        if timeout < MIN_CALL_SECONDS:
+            print(f"⏱️ 時間切れのため要約を省略")
+            return {
+                'summary': '記事の要約を生成できませんでした。詳細はリンクからご確認ください。',
+                'key_point': ''
+            }
+        
+        prompt = await fit_prompt_async(
+            lambda fields: f"""以下のWIRED記事を日本語で要約してください。
 
 タイトル: {title}
-本文: {content[:2000]}
+本文: {fields['content']}
 
 以下のJSON形式で回答してください（余計な説明は不要、JSONのみ）:
 {{
     "summary": "記事の要旨（150文字以内、できるだけ詳しく）",
     "key_point": "最も重要なポイント（100文字以内）"
 }}
-"""
+""",
+            {'content': content}, prompt_tokens('summary'), self.analyzer.model
+        )
         
         try:
-            import json
-            response = self.analyzer.model.generate_content(prompt)
-            response_text = response.text.strip()
-            
-            # JSONを抽出
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            result = json.loads(response_text)
-            summary = result.get('summary', '')
-            key_point = result.get('key_point', '')
+            result = await self.analyzer.generate_structured_async(
+                prompt, DETAILED_SUMMARY, request_options={'timeout': timeout}
+            )
+            summary = result.summary
+            key_point = result.key_point
             
             # 要約が英語のままの場合（日本語が含まれていない場合）のチェック
             import re
@@ -345,13 +487,14 @@ class WiredBlueskyBotAdvanced:
         
         return post_text.strip()
     
-    def create_detail_post(self, article: Dict, rank: int) -> str:
+    def create_detail_post(self, article: Dict, rank: int, deadline: Deadline = None) -> str:
         """
         各記事の詳細要約投稿を作成（250文字の要約）
         
         Args:
             article: 記事の辞書（要約付き）
             rank: ランキング順位
+            deadline: URL短縮の期限（Noneの場合は無制限、時間切れの場合は元のURL）
         
         Returns:
             投稿テキスト（280文字以内、要約は250文字）
@@ -364,10 +507,14 @@ class WiredBlueskyBotAdvanced:
         header = "AI選定 WIRED注目記事5選"
         
         # URL短縮
+        deadline = deadline or Deadline()
         short_url = ""
-        if url:
+        if url and deadline.expired(MIN_CALL_SECONDS):
+            print(f"⏱️ 時間切れのためURL短縮を省略")
+            short_url = url
+        elif url:
             try:
-                short_url = self.url_shortener.shorten(url)
+                short_url = self.url_shortener.shorten(url, timeout=deadline.timeout(10))
                 if not short_url:
                     short_url = url
             except Exception as e:
@@ -581,7 +728,7 @@ class WiredBlueskyBotAdvanced:
         
         return post_text
     
-    def post_articles_to_bluesky(self, top5_articles: List[Dict]) -> Dict[str, int]:
+    def post_articles_to_bluesky(self, top5_articles: List[Dict], deadline: Deadline = None) -> Dict[str, int]:
         """
         TOP5の記事を投稿（新しい構造）
         
@@ -591,10 +738,12 @@ class WiredBlueskyBotAdvanced:
         
         Args:
             top5_articles: TOP5の記事リスト（要約付き）
+            deadline: 実行全体の期限（Noneの場合は無制限、迫っている場合は投稿間隔を短縮）
         
         Returns:
             {"success": 成功数, "failed": 失敗数}
         """
+        deadline = deadline or Deadline()
         success_count = 0
         failed_count = 0
         
@@ -618,8 +767,7 @@ class WiredBlueskyBotAdvanced:
             failed_count += 1
         
         # 投稿間隔
-        print(f"⏳ 次の投稿まで5秒待機...")
-        time.sleep(5)
+        self._wait_between_posts(deadline, len(top5_articles))
         
         # データベースセッションを準備（投稿記録用）
         db = SessionLocal()
@@ -635,7 +783,9 @@ class WiredBlueskyBotAdvanced:
                 print(f"\n[{i}/5] 詳細要約投稿準備中: {title[:50]}...")
                 
                 # 投稿テキストを作成（250文字の要約）
-                post_text = self.create_detail_post(article, rank)
+                post_text = self.create_detail_post(
+                    article, rank, deadline.stage(1 / (len(top5_articles) - i + 1))
+                )
                 
                 print(f"投稿内容:\n{'-'*60}\n{post_text}\n{'-'*60}")
                 print(f"文字数: {len(post_text)}/280")
@@ -655,15 +805,22 @@ class WiredBlueskyBotAdvanced:
                 
                 # 連続投稿の間隔を空ける（スパム判定回避）
                 if i < len(top5_articles):
-                    print(f"⏳ 次の投稿まで5秒待機...")
-                    time.sleep(5)
+                    self._wait_between_posts(deadline, len(top5_articles) - i)
             
             # 投稿成功した記事をデータベースに記録
             if posted_urls:
                 print(f"\n💾 投稿履歴をデータベースに記録中...")
-                for url in posted_urls:
+                duplicate_index = get_near_duplicate_index(db)
+                for article in top5_articles:
+                    url = article.get('url', '')
+                    if url not in posted_urls:
+                        continue
                     try:
                         mark_article_as_posted(db, url)
+                        # 候補と同じくRSSの概要からフィンガープリントを作成
+                        if duplicate_index:
+                            fingerprint = simhash(article.get('title', ''), article.get('content', ''))
+                            duplicate_index.register(db, url, fingerprint)
                     except Exception as e:
                         print(f"⚠️ 投稿履歴の記録エラー ({url[:50]}...): {e}")
                 print(f"✅ {len(posted_urls)}件の投稿履歴を記録しました")
@@ -678,7 +835,24 @@ class WiredBlueskyBotAdvanced:
         
         return {"success": success_count, "failed": failed_count}
     
+    def _wait_between_posts(self, deadline: Deadline, posts_left: int):
+        """
+        投稿の間隔を空ける（期限が迫っている場合は残りの投稿数に応じて短縮、最低1秒）
+        
+        Args:
+            deadline: 実行全体の期限
+            posts_left: 残りの投稿数
+        """
+        wait = min(5.0, deadline.remaining() / (posts_left + 1))
+        print(f"⏳ 次の投稿まで{max(1.0, wait):.0f}秒待機...")
+        deadline.sleep(wait, minimum=1.0)
+    
     def run(self):
+        """メイン処理（投稿のためのGemini呼び出しは、手動実行のリサーチなどより優先してクォータを使う）"""
+        with gemini_priority('high'):
+            self._run()
+    
+    def _run(self):
         """メイン処理（重複チェック強化版）"""
         print(f"\n{'='*60}")
         print(f"🚀 WIRED記事TOP5投稿Bot（改良版）開始")
@@ -706,37 +880,53 @@ class WiredBlueskyBotAdvanced:
         finally:
             db.close()
         
+        # 実行全体の期限（投稿の時間を残し、それまでの各段階に残り時間を配分）
+        deadline = Deadline.for_run()
+        work = deadline.stage(reserve=BOT_POST_RESERVE_SECONDS)
+        if deadline.bounded:
+            print(f"⏱️ 実行時間の上限: {deadline.remaining():.0f}秒")
+        
         try:
             # 1. WIRED記事を取得
-            articles = self.fetch_wired_articles(max_items=30)  # 20→30に増加
+            articles = self.fetch_wired_articles(max_items=30, deadline=work.stage(0.2))  # 20→30に増加
             if not articles:
                 print("⚠️ 記事がありません。終了します。")
                 return
             
+            # 候補記事の本文をバックグラウンドで先読み（TOP5選定と並行）
+            if not DISABLE_PREFETCH:
+                self.prefetcher = ArticlePrefetcher(self.fetcher).start(articles, deadline=work)
+            
             # 2. GeminiでTOP5を選定（24時間フィルター適用）
-            top5_articles = self.select_top5_with_gemini(articles)
+            top5_articles = self.select_top5_with_gemini(articles, deadline=work.stage(0.4))
+            if self.prefetcher:
+                self.prefetcher.retain([a.get('url') for a in top5_articles])
             if not top5_articles:
                 print("⚠️ 投稿可能な新規記事がありません。")
                 print("💡 ヒント: RSSフィードの切り替えタイミングを待つか、")
                 print("          異なるカテゴリのフィードを追加してください。")
                 return
             
-            # 3. TOP5の記事本文を取得
+            # 3. TOP5の記事本文を取得（残りの持ち時間を記事数で分割）
             print(f"\n📖 TOP5の記事本文を取得中...")
+            content_deadline = work.stage(0.4)
             for i, article in enumerate(top5_articles, 1):
                 print(f"  {i}/5: {article['title'][:50]}...")
-                self.fetch_article_content(article)
-                time.sleep(1)  # サーバー負荷軽減のため
+                self.fetch_article_content(  # 同一ホストへの間隔はArticleFetcherが制御
+                    article, content_deadline.stage(1 / (len(top5_articles) - i + 1))
+                )
+            if self.prefetcher:
+                print(f"📊 {self.prefetcher.summary()}")
             
-            # 4. TOP5の詳細要約を生成
+            # 4. TOP5の詳細要約を生成（並列に生成するため、各記事が残りの持ち時間をすべて使える）
             print(f"\n📝 TOP5の詳細要約を生成中...")
-            for i, article in enumerate(top5_articles, 1):
-                print(f"  {i}/5: 要約生成中...")
-                summary_data = self.create_detailed_summary(article)
+            started = time.monotonic()
+            for article, summary_data in zip(top5_articles, self.create_detailed_summaries(top5_articles, work)):
                 article.update(summary_data)
+            print(f"✅ {len(top5_articles)}件の要約を生成しました ({time.monotonic() - started:.1f}秒)")
             
             # 5. TOP5を個別にBlueskyに投稿
-            result = self.post_articles_to_bluesky(top5_articles)
+            result = self.post_articles_to_bluesky(top5_articles, deadline)
             
             # 6. 結果表示
             if result['success'] > 0:
@@ -758,6 +948,26 @@ class WiredBlueskyBotAdvanced:
             print(f"\n⚠️ エラーが発生しました: {e}")
             import traceback
             traceback.print_exc()
+        finally:
+            if self.prefetcher:
+                self.prefetcher.close()
+                self.prefetcher = None
+            
+            transport = get_transport_stats()
+            if transport['requests']:
+                print(f"🔌 HTTP接続: {transport['requests']}リクエスト / 新規接続{transport['connections']}件 "
+                      f"(再利用率 {transport['reuse_ratio']:.0%})")
+            gemini_cache = get_gemini_cache()
+            if gemini_cache:
+                cache_stats = gemini_cache.stats()
+                if cache_stats['hits'] + cache_stats['misses']:
+                    print(f"🧠 Gemini応答キャッシュ: ヒット{cache_stats['hits']}件 / ミス{cache_stats['misses']}件 "
+                          f"(ヒット率 {cache_stats['hit_ratio']:.0%})")
+            quota = get_quota_governor().stats()['by_priority']['high']
+            if quota['waited_seconds'] >= 1 or quota['shed']:
+                print(f"🚦 Geminiクォータ待ち: {quota['waited_seconds']:.0f}秒 / 見送り{quota['shed']}件")
+            if deadline.bounded:
+                print(f"⏱️ 実行時間の残り: {deadline.remaining():.0f}秒")
 
 
 def main():